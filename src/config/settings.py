@@ -7,8 +7,10 @@ Use get_settings() to access a cached singleton across the app.
 
 from __future__ import annotations
 
+import json
 from functools import lru_cache
-from typing import Optional
+from pathlib import Path
+from typing import Any, Dict, Optional
 
 from pydantic import BaseModel
 from pydantic.env_settings import BaseSettings
@@ -79,6 +81,60 @@ class PowerBISettings(BaseModel):
     powerbi_report_id: Optional[str] = None
 
 
+class KellyCriterionSettings(BaseModel):
+    enabled: bool = True
+    lookback_period_days: int = 252
+    min_trades_required: int = 50
+    max_kelly_fraction: float = 0.25
+    conservative_multiplier: float = 0.5
+    min_edge_threshold: float = 0.02
+    min_win_rate: float = 0.52
+
+
+class ExpectedValueSettings(BaseModel):
+    enabled: bool = True
+    confidence_threshold: float = 0.6
+    time_horizon_days: int = 30
+    use_ml_predictions: bool = False
+    benchmark_symbol: str = "SPY"  # Market the betas are taken against
+    scenario_weights: Dict[str, float] = {
+        "bull_market": 0.25,
+        "normal_up": 0.35,
+        "sideways": 0.2,
+        "normal_down": 0.15,
+        "bear_market": 0.05,
+    }
+
+
+class TargetPositions(BaseModel):
+    min: int = 5
+    optimal: int = 8
+    max: int = 12
+
+
+class PortfolioScoringSettings(BaseModel):
+    performance_weight: float = 0.4
+    ev_analysis_weight: float = 0.3
+    diversification_weight: float = 0.3
+    target_positions: TargetPositions = TargetPositions()
+
+
+class RiskLimitSettings(BaseModel):
+    max_position_size: float = 0.05
+    max_portfolio_exposure: float = 0.8
+    max_daily_trades: int = 10
+    max_correlation: float = 0.7
+    stop_loss_percent: float = 0.08
+    take_profit_percent: float = 0.15
+    cooling_period_hours: int = 4
+
+
+class DynamicRiskSettings(BaseModel):
+    enabled: bool = True
+    lookback_days: int = 30
+    base_limits: RiskLimitSettings = RiskLimitSettings()
+
+
 class AppSettings(BaseSettings):
     # App
     environment: str = "development"
@@ -286,3 +342,38 @@ class AppSettings(BaseSettings):
 def get_settings() -> AppSettings:
     """Return a cached settings instance built from environment variables."""
     return AppSettings.from_env()
+
+
+CONFIG_JSON_PATH = Path(__file__).with_name("config.json")
+
+
+@lru_cache(maxsize=1)
+def get_config() -> Dict[str, Any]:
+    """Return the cached strategy configuration from config.json."""
+    with open(CONFIG_JSON_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_enhanced_config(section: str) -> Dict[str, Any]:
+    """Return one section of config.json's enhanced_system block (empty if absent)."""
+    return get_config().get("enhanced_system", {}).get(section, {})
+
+
+def get_kelly_settings() -> KellyCriterionSettings:
+    """Return Kelly sizing parameters from enhanced_system.kelly_criterion."""
+    return KellyCriterionSettings(**get_enhanced_config("kelly_criterion"))
+
+
+def get_expected_value_settings() -> ExpectedValueSettings:
+    """Return scenario parameters from enhanced_system.expected_value."""
+    return ExpectedValueSettings(**get_enhanced_config("expected_value"))
+
+
+def get_portfolio_scoring_settings() -> PortfolioScoringSettings:
+    """Return portfolio scoring weights from enhanced_system.portfolio_scoring."""
+    return PortfolioScoringSettings(**get_enhanced_config("portfolio_scoring"))
+
+
+def get_risk_settings() -> DynamicRiskSettings:
+    """Return risk limits from enhanced_system.dynamic_risk_management."""
+    return DynamicRiskSettings(**get_enhanced_config("dynamic_risk_management"))
@@ -3,6 +3,7 @@ FastAPI application with authentication, rate limiting, and billing.
 This is the main entry point for the revenue-generating API.
 """
 
+import asyncio
 import uuid
 from datetime import datetime, timedelta
 from typing import Optional, List
@@ -23,7 +24,9 @@ from investment_system.core.contracts import (
     MarketDataRequest, MarketDataResponse,
     ErrorCode, ErrorResponse, RateLimitStatus
 )
+from investment_system.core import serialization
 from investment_system.services.signal_service import get_signal_service
+from investment_system.services.usage_service import get_usage_meter
 from investment_system.dependency_graph import yaml
 import io
 import csv
@@ -88,6 +91,15 @@ class SubscribeRequest(BaseModel):
     payment_method_id: Optional[str] = None  # Stripe payment method
 
 
+class ContractJSONResponse(JSONResponse):
+    """JSONResponse that encodes contract models with their precomputed encoders"""
+
+    def render(self, content) -> bytes:
+        if isinstance(content, BaseModel):
+            return serialization.dumps(content)
+        return super().render(content)
+
+
 # Authentication functions
 def create_access_token(user_id: str) -> str:
     """Create JWT access token"""
@@ -268,7 +280,7 @@ async def subscribe(
 
 
 # Trading signal endpoints
-@app.post("/signals", response_model=SignalResponse)
+@app.post("/signals", response_model=SignalResponse, response_class=ContractJSONResponse)
 async def get_signals(
     request: Request,
     signal_req: SignalRequest,
@@ -291,7 +303,9 @@ async def get_signals(
     try:
         # Generate signals
         response = await signal_service.generate_signals(signal_req, user)
-        return response
+        # Returning the response directly skips FastAPI's re-validation and
+        # jsonable_encoder pass; the bytes are the same
+        return ContractJSONResponse(response)
     except ValueError as e:
         if str(e) == ErrorCode.SUBSCRIPTION_REQUIRED:
             raise HTTPException(
@@ -357,7 +371,7 @@ async def export_csv(
     signal_req = SignalRequest(symbols=symbol_list)
     
     try:
-        response = await signal_service.generate_signals(signal_req, user)
+        response = await signal_service.generate_signals(signal_req, user, endpoint="/export/csv", method="GET")
         
         # Create CSV
         output = io.StringIO()
@@ -402,22 +416,24 @@ async def get_usage(
     user: User = Depends(get_current_user)
 ):
     """Get current usage statistics"""
-    # In production, query from database
-    # For MVP, return mock data
+    # Flushes queued usage events and aggregates the billing period in the store
+    stats = await asyncio.to_thread(get_usage_meter().usage_stats, user.id)
     limits = user.tier_limits
     
     return {
         "user_id": user.id,
         "tier": user.tier,
         "current_usage": {
-            "api_calls": 42,
-            "symbols_queried": 15,
-            "signals_generated": 30
+            "api_calls": stats.api_calls,
+            "symbols_queried": stats.unique_symbols,
+            "signals_generated": stats.signals_generated,
+            "data_points_fetched": stats.data_points_fetched
         },
         "limits": limits,
+        "overage": stats.calculate_overage(user.tier),
         "billing_period": {
-            "start": datetime.utcnow().replace(day=1).isoformat(),
-            "end": (datetime.utcnow().replace(day=1) + timedelta(days=31)).isoformat()
+            "start": stats.period_start.isoformat(),
+            "end": stats.period_end.isoformat()
         }
     }
 
@@ -506,6 +522,12 @@ async def startup_event():
         print("Demo user created for development: demo@example.com")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write queued usage events before exiting"""
+    await asyncio.to_thread(get_usage_meter().close)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
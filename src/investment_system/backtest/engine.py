@@ -0,0 +1,331 @@
+"""
+Vectorized backtesting engine.
+
+Prices and signals are held as (dates x symbols) matrices and every step --
+positions, returns, equity, drawdown and trade statistics -- is computed for
+all symbols at once with NumPy, without per-bar Python loops.
+"""
+
+import logging
+import warnings
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Signal values in the signal matrix
+BUY, HOLD, SELL = 1, 0, -1
+SIGNAL_CODES = {'buy': BUY, 'hold': HOLD, 'sell': SELL}
+
+
+@dataclass
+class PricePanel:
+    """Close prices as a (dates x symbols) matrix; NaN where a symbol has no bar"""
+    dates: np.ndarray
+    symbols: List[str]
+    close: np.ndarray
+
+    @property
+    def returns(self) -> np.ndarray:
+        """Bar-to-bar simple returns (first bar and gaps are NaN)"""
+        returns = np.full_like(self.close, np.nan)
+        returns[1:] = self.close[1:] / self.close[:-1] - 1
+        return returns
+
+
+@dataclass
+class BacktestResult:
+    """Per-bar matrices and per-symbol metrics of a backtest"""
+    dates: np.ndarray
+    symbols: List[str]
+    positions: np.ndarray
+    returns: np.ndarray
+    equity: np.ndarray
+    metrics: pd.DataFrame
+
+    @property
+    def portfolio_returns(self) -> np.ndarray:
+        """Equal-weight portfolio returns across symbols"""
+        with warnings.catch_warnings():
+            # Bars where no symbol trades (e.g. the first) are all NaN
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            return np.nan_to_num(np.nanmean(self.returns, axis=1))
+
+
+def price_panel(df: pd.DataFrame, column: str = 'close') -> PricePanel:
+    """
+    Pivot long price data into a PricePanel.
+
+    Args:
+        df: DataFrame with columns date (or ts/timestamp), symbol and close
+        column: Price column to use
+
+    Returns:
+        PricePanel with dates sorted ascending and symbols in order of first appearance
+    """
+    time_col = next(col for col in ('date', 'ts', 'timestamp') if col in df.columns)
+    symbols = list(pd.unique(df['symbol']))
+    wide = df.pivot_table(index=time_col, columns='symbol', values=column, aggfunc='last')
+    wide.index = pd.to_datetime(wide.index)
+    wide = wide.sort_index().reindex(columns=symbols)
+    return PricePanel(
+        dates=wide.index.values,
+        symbols=symbols,
+        close=wide.to_numpy(dtype=np.float64)
+    )
+
+
+def load_price_panel(
+    symbols: Optional[List[str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    source: str = "store"
+) -> PricePanel:
+    """
+    Load a PricePanel from the prices table or the ingest price cache.
+
+    Args:
+        symbols: Symbols to load (required for the cache source)
+        start: First date to include
+        end: Last date to include
+        source: "store" (prices table) or "cache" (ingest parquet cache)
+    """
+    if source == "store":
+        from investment_system.db.store import get_store
+        df = get_store().get_prices(symbols, start, end)
+    elif source == "cache":
+        from investment_system.pipeline.ingest import load_from_cache
+        if not symbols:
+            raise ValueError("symbols are required when loading from the price cache")
+        frames = [load_from_cache(symbol) for symbol in symbols]
+        frames = [frame for frame in frames if frame is not None]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['date', 'symbol', 'close'])
+        dates = pd.to_datetime(df['date'])
+        if start is not None:
+            df = df[dates >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[dates <= pd.Timestamp(end)]
+    else:
+        raise ValueError(f"Unknown price source: {source}")
+
+    if df.empty:
+        raise ValueError("No price data available for backtest")
+    return price_panel(df)
+
+
+def signal_matrix(history: pd.DataFrame, panel: PricePanel) -> np.ndarray:
+    """
+    Align a signal history frame to a PricePanel.
+
+    Args:
+        history: Frame with symbol, date/timestamp and signal columns, as returned
+            by pipeline.analyze.generate_signal_history or BaseAnalyzer.analyze_history
+        panel: PricePanel to align to
+
+    Returns:
+        int8 matrix (dates x symbols) of BUY/HOLD/SELL codes; HOLD where no signal
+    """
+    time_col = 'timestamp' if 'timestamp' in history.columns else 'date'
+    codes = history['signal'].map(SIGNAL_CODES).fillna(HOLD).to_numpy(dtype=np.int8)
+
+    times = pd.to_datetime(history[time_col]).values
+    rows = np.searchsorted(panel.dates, times)
+    cols = pd.Index(panel.symbols).get_indexer(history['symbol'])
+    valid = (cols >= 0) & (rows < len(panel.dates))
+    valid[valid] &= panel.dates[rows[valid]] == times[valid]
+
+    matrix = np.zeros(panel.close.shape, dtype=np.int8)
+    matrix[rows[valid], cols[valid]] = codes[valid]
+    return matrix
+
+
+def _forward_fill(values: np.ndarray, fill: float = 0.0) -> np.ndarray:
+    """Forward-fill NaNs down each column; leading NaNs become `fill`"""
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(values.shape[0])[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    filled = values[index, np.arange(values.shape[1])]
+    filled[~np.maximum.accumulate(valid, axis=0)] = fill
+    return filled
+
+
+def positions_from_signals(signals: np.ndarray, allow_short: bool = False) -> np.ndarray:
+    """
+    Target positions implied by a signal matrix.
+
+    BUY goes long, SELL goes flat (or short when allow_short) and HOLD keeps
+    the previous position.
+    """
+    targets = np.where(signals == BUY, 1.0, np.nan)
+    targets[signals == SELL] = -1.0 if allow_short else 0.0
+    return _forward_fill(targets)
+
+
+def _trade_segments(held: np.ndarray, strategy_returns: np.ndarray) -> tuple:
+    """
+    Every trade as (symbol column, first held bar, last held bar, log return).
+
+    Works column by column in one flat array: a trade starts wherever the
+    held position changes to a new non-zero value.
+    """
+    n_dates = held.shape[0]
+    held_t = held.T
+    starts = np.zeros_like(held_t, dtype=bool)
+    starts[:, 0] = held_t[:, 0] != 0
+    starts[:, 1:] = (held_t[:, 1:] != 0) & (held_t[:, 1:] != held_t[:, :-1])
+
+    flat_starts = np.flatnonzero(starts.ravel())
+    if len(flat_starts) == 0:
+        empty = np.zeros(0, dtype=int)
+        return empty, empty, empty, np.zeros(0)
+
+    trade_ids = np.cumsum(starts.ravel()) - 1
+    in_trade = np.flatnonzero(held_t.ravel() != 0)
+    ids = trade_ids[in_trade]
+
+    log_returns = np.log1p(np.nan_to_num(strategy_returns.T.ravel()))
+    trade_returns = np.bincount(ids, weights=log_returns[in_trade], minlength=len(flat_starts))
+
+    # In-trade bars are contiguous per trade, so the last one closes it
+    flat_ends = in_trade[np.r_[np.flatnonzero(np.diff(ids)), len(ids) - 1]]
+    return flat_starts // n_dates, flat_starts % n_dates, flat_ends % n_dates, trade_returns
+
+
+def _trade_statistics(held: np.ndarray, strategy_returns: np.ndarray) -> tuple:
+    """Trade count and winning trades per symbol, without per-bar loops"""
+    n_symbols = held.shape[1]
+    symbols, _, _, trade_returns = _trade_segments(held, strategy_returns)
+    trades = np.bincount(symbols, minlength=n_symbols)
+    wins = np.bincount(symbols, weights=trade_returns > 0, minlength=n_symbols)
+    return trades, wins
+
+
+def run_backtest(
+    panel: PricePanel,
+    signals: np.ndarray,
+    allow_short: bool = False,
+    cost_bps: float = 0.0,
+    periods_per_year: int = TRADING_DAYS_PER_YEAR
+) -> BacktestResult:
+    """
+    Backtest a signal matrix against a price panel for all symbols at once.
+
+    Positions are taken at the close of the signal bar and earn the next
+    bar's return. Transaction costs are charged on every change in position.
+
+    Args:
+        panel: PricePanel with close prices
+        signals: Matrix (dates x symbols) of BUY/HOLD/SELL codes
+        allow_short: Treat SELL as going short instead of flat
+        cost_bps: Cost per unit of position change, in basis points
+        periods_per_year: Bars per year for annualizing Sharpe
+
+    Returns:
+        BacktestResult with positions, returns, equity and a metrics frame
+        (total_return, sharpe, max_drawdown, win_rate, trades, exposure)
+    """
+    if signals.shape != panel.close.shape:
+        raise ValueError(f"Signal matrix shape {signals.shape} does not match prices {panel.close.shape}")
+
+    positions = positions_from_signals(signals, allow_short)
+
+    # Position held during each bar is the one set at the previous close
+    held = np.zeros_like(positions)
+    held[1:] = positions[:-1]
+
+    asset_returns = panel.returns
+    traded = ~np.isnan(asset_returns)
+    strategy_returns = held * np.nan_to_num(asset_returns)
+    if cost_bps:
+        turnover = np.abs(np.diff(positions, axis=0, prepend=0.0))
+        strategy_returns[1:] -= turnover[:-1] * cost_bps / 10_000
+    strategy_returns = np.where(traded, strategy_returns, np.nan)
+
+    equity = np.cumprod(1 + np.nan_to_num(strategy_returns), axis=0)
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nanmean(strategy_returns, axis=0)
+        std = np.nanstd(strategy_returns, axis=0, ddof=1)
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+        exposure = (held != 0).sum(axis=0) / np.maximum(traded.sum(axis=0), 1)
+
+    trades, wins = _trade_statistics(held, strategy_returns)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        win_rate = np.where(trades > 0, wins / np.maximum(trades, 1), np.nan)
+
+    metrics = pd.DataFrame({
+        'total_return': equity[-1] - 1 if len(equity) else np.zeros(len(panel.symbols)),
+        'sharpe': sharpe,
+        'max_drawdown': drawdown.min(axis=0) if len(drawdown) else np.zeros(len(panel.symbols)),
+        'win_rate': win_rate,
+        'trades': trades,
+        'exposure': exposure,
+    }, index=pd.Index(panel.symbols, name='symbol'))
+
+    logger.info(f"Backtested {len(panel.symbols)} symbols over {len(panel.dates)} bars")
+
+    return BacktestResult(
+        dates=panel.dates,
+        symbols=panel.symbols,
+        positions=positions,
+        returns=strategy_returns,
+        equity=equity,
+        metrics=metrics
+    )
+
+
+def trade_log(result: BacktestResult, include_open: bool = False) -> pd.DataFrame:
+    """
+    Individual trades of a backtest.
+
+    Args:
+        result: BacktestResult from run_backtest
+        include_open: Also list trades still open at the last bar
+
+    Returns:
+        DataFrame with columns symbol, entry, exit, side and return, where
+        entry/exit are the closes the position was opened and closed at
+    """
+    held = np.zeros_like(result.positions)
+    held[1:] = result.positions[:-1]
+    columns, first, last, log_returns = _trade_segments(held, result.returns)
+
+    keep = np.ones(len(columns), dtype=bool) if include_open else last < len(result.dates) - 1
+    columns, first, last, log_returns = columns[keep], first[keep], last[keep], log_returns[keep]
+
+    return pd.DataFrame({
+        'symbol': np.asarray(result.symbols, dtype=object)[columns],
+        'entry': result.dates[first - 1],
+        'exit': result.dates[last],
+        'side': held[first, columns].astype(np.int8),
+        'return': np.expm1(log_returns),
+    })
+
+
+def backtest(df: pd.DataFrame, analyzer=None, **kwargs) -> BacktestResult:
+    """
+    Backtest the pipeline rules (or an analyzer's rules) over long price data.
+
+    Args:
+        df: DataFrame with columns date, open, high, low, close, volume, symbol
+        analyzer: Optional BaseAnalyzer; defaults to pipeline.analyze rules
+        **kwargs: Passed to run_backtest
+
+    Returns:
+        BacktestResult
+    """
+    if analyzer is None:
+        from investment_system.pipeline.analyze import generate_signal_history
+        history = generate_signal_history(df)
+    else:
+        history = analyzer.analyze_history(df)
+
+    panel = price_panel(df)
+    return run_backtest(panel, signal_matrix(history, panel), **kwargs)
@@ -0,0 +1,261 @@
+"""
+Parallel parameter sweep over analyzer settings.
+
+Every combination in a parameter grid is backtested with the vectorized
+engine. Close and volume matrices are placed in shared memory once and
+attached read-only by the pool workers; configurations sharing the same
+indicator windows are evaluated back to back so each worker computes those
+indicators only once.
+"""
+
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from investment_system.backtest.engine import (
+    BUY, HOLD, SELL, TRADING_DAYS_PER_YEAR, BacktestResult, PricePanel, price_panel, run_backtest
+)
+from investment_system.core.indicators import round_indicator
+from investment_system.infrastructure.shared_memory import SharedArrays
+
+logger = logging.getLogger(__name__)
+
+CHUNKS_PER_WORKER = 4  # Smaller chunks even out slow configurations
+MIN_CONFIGS_FOR_POOL = 8  # Below this a process pool costs more than it saves
+
+# Columns of the results table besides the parameters
+SWEEP_METRICS = ['total_return', 'sharpe', 'max_drawdown', 'win_rate', 'exposure', 'portfolio_sharpe']
+
+
+def parameter_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the values in grid, as analyzer keyword arguments"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def _long_frame(arrays: Dict[str, np.ndarray]) -> tuple:
+    """Symbol-major long frame of the bars present in the (dates x symbols) matrices"""
+    close = arrays['close']
+    n_dates, n_symbols = close.shape
+
+    flat_close = close.T.ravel()
+    present = ~np.isnan(flat_close)
+    frame = pd.DataFrame({
+        'close': flat_close[present],
+        'volume': arrays['volume'].T.ravel()[present],
+    })
+    groups = pd.Series(np.repeat(np.arange(n_symbols), n_dates)[present])
+    return frame, groups, present
+
+
+def _indicator_values(analyzer, frame: pd.DataFrame, groups: pd.Series, memo: Dict[str, Any]) -> Dict:
+    """Rounded indicator arrays for every present bar, reused across thresholds"""
+    key = json.dumps(analyzer.indicator_params(), sort_keys=True, default=str)
+    # Configs arrive grouped by indicator params, so only the last set is kept
+    if memo.get('key') != key:
+        history = analyzer.indicator_history(frame, groups)
+        memo.clear()
+        memo['key'] = key
+        memo['values'] = {k: round_indicator(np.asarray(v, dtype=float)) for k, v in history.items()}
+    return memo['values']
+
+
+def _signal_codes(analyzer, values: Dict, bar_index: np.ndarray, present: np.ndarray, shape: tuple) -> np.ndarray:
+    """Analyzer signals as a (dates x symbols) BUY/HOLD/SELL matrix"""
+    signals = analyzer.generate_signal_array(values)
+    codes = np.select(
+        [signals == 'buy', signals == 'sell'], [BUY, SELL], default=HOLD
+    ).astype(np.int8)
+    # Bars the single-bar analyzer could not handle yet stay HOLD
+    codes[bar_index < analyzer.min_history - 1] = HOLD
+
+    n_dates, n_symbols = shape
+    flat = np.full(n_dates * n_symbols, HOLD, dtype=np.int8)
+    flat[present] = codes
+    return flat.reshape(n_symbols, n_dates).T
+
+
+def config_signals(
+    arrays: Dict[str, np.ndarray],
+    analyzer_type: str,
+    configs: List[Dict[str, Any]]
+) -> Iterator[Tuple[PricePanel, np.ndarray]]:
+    """Yield (panel, signal matrix) for each configuration over the full history"""
+    from investment_system.core.analyzers import AnalyzerFactory
+
+    frame, groups, present = _long_frame(arrays)
+    bar_index = groups.groupby(groups, sort=False).cumcount().to_numpy()
+    n_dates, n_symbols = arrays['close'].shape
+    panel = PricePanel(dates=np.arange(n_dates), symbols=list(range(n_symbols)), close=arrays['close'])
+
+    memo: Dict[str, Any] = {}
+    for config in configs:
+        analyzer = AnalyzerFactory.create(analyzer_type, **config)
+        values = _indicator_values(analyzer, frame, groups, memo)
+        yield panel, _signal_codes(analyzer, values, bar_index, present, panel.close.shape)
+
+
+def summarize_backtest(result: BacktestResult, periods_per_year: int = TRADING_DAYS_PER_YEAR) -> Dict[str, float]:
+    """Cross-symbol summary of a backtest (one sweep results row)"""
+    metrics = result.metrics
+    portfolio = result.portfolio_returns
+    std = portfolio.std(ddof=1) if len(portfolio) > 1 else 0.0
+    with np.errstate(invalid='ignore'):
+        return {
+            'total_return': metrics['total_return'].mean(),
+            'sharpe': metrics['sharpe'].mean(),
+            'max_drawdown': metrics['max_drawdown'].mean(),
+            'win_rate': np.nanmean(metrics['win_rate']) if metrics['win_rate'].notna().any() else np.nan,
+            'trades': int(metrics['trades'].sum()),
+            'exposure': metrics['exposure'].mean(),
+            'portfolio_sharpe': portfolio.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0,
+        }
+
+
+def _evaluate_configs(
+    arrays: Dict[str, np.ndarray],
+    analyzer_type: str,
+    configs: List[Dict[str, Any]],
+    backtest_kwargs: Dict[str, Any]
+) -> List[Dict[str, float]]:
+    """Backtest each configuration; returns one metrics row per configuration"""
+    periods = backtest_kwargs.get('periods_per_year', TRADING_DAYS_PER_YEAR)
+    return [
+        summarize_backtest(run_backtest(panel, signals, **backtest_kwargs), periods)
+        for panel, signals in config_signals(arrays, analyzer_type, configs)
+    ]
+
+
+def _evaluate_chunk(spec: Dict[str, Any], evaluate: Callable, analyzer_type: str, configs: list, *args) -> list:
+    """Worker: evaluate one chunk on read-only views of the shared price matrices"""
+    shared = SharedArrays.attach(spec)
+    try:
+        return evaluate(shared.arrays, analyzer_type, configs, *args)
+    finally:
+        try:
+            shared.close()
+        except BufferError:
+            # A failed evaluation's traceback still references the views; the
+            # mapping is released with it
+            pass
+
+
+def _chunks(configs: List[Dict[str, Any]], n_chunks: int) -> List[List[Dict[str, Any]]]:
+    """Split configs into contiguous chunks of roughly equal size"""
+    size = max(1, -(-len(configs) // max(1, n_chunks)))
+    return [configs[i:i + size] for i in range(0, len(configs), size)]
+
+
+def panel_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Close and volume (dates x symbols) matrices of long price data"""
+    return {
+        'close': price_panel(df, 'close').close,
+        'volume': price_panel(df, 'volume').close.astype(np.float64),
+    }
+
+
+def evaluate_grid(
+    arrays: Dict[str, np.ndarray],
+    evaluate: Callable,
+    analyzer_type: str,
+    configs: List[Dict[str, Any]],
+    workers: Optional[int],
+    *args
+) -> list:
+    """
+    Map evaluate over configs, in a process pool for larger grids.
+
+    Args:
+        arrays: Price matrices from panel_arrays (shared with the workers)
+        evaluate: Module-level function (arrays, analyzer_type, configs, *args)
+            returning one result per config
+        analyzer_type: Name registered in AnalyzerFactory
+        configs: Analyzer keyword arguments
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        Results in the order of configs
+    """
+    from investment_system.core.analyzers import AnalyzerFactory
+
+    if configs and not AnalyzerFactory.create(analyzer_type, **configs[0]).supports_history:
+        raise ValueError(f"Analyzer {analyzer_type} does not support full-history analysis")
+
+    # Group configs sharing indicator windows so workers reuse their indicators
+    def indicator_key(config):
+        params = AnalyzerFactory.create(analyzer_type, **config).indicator_params()
+        return json.dumps(params, sort_keys=True, default=str)
+    order = sorted(range(len(configs)), key=lambda i: indicator_key(configs[i]))
+    ordered = [configs[i] for i in order]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(configs) < MIN_CONFIGS_FOR_POOL:
+        rows = evaluate(arrays, analyzer_type, ordered, *args)
+    else:
+        rows = []
+        chunks = _chunks(ordered, workers * CHUNKS_PER_WORKER)
+        with SharedArrays.create(arrays) as shared:
+            spec = shared.spec
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_evaluate_chunk, spec, evaluate, analyzer_type, chunk, *args)
+                    for chunk in chunks
+                ]
+                for future in futures:
+                    rows.extend(future.result())
+
+    # Back to config order
+    results = [None] * len(configs)
+    for position, row in zip(order, rows):
+        results[position] = row
+    return results
+
+
+def run_sweep(
+    df: pd.DataFrame,
+    grid: Dict[str, Sequence[Any]],
+    analyzer_type: str = "technical",
+    workers: Optional[int] = None,
+    output: Optional[str] = None,
+    **backtest_kwargs
+) -> pd.DataFrame:
+    """
+    Backtest every combination of analyzer parameters in grid.
+
+    Args:
+        df: Long price data with columns date, symbol, close and volume
+        grid: Analyzer constructor argument -> values to try, e.g.
+            {'rsi_oversold': [20, 30], 'sma_fast': [10, 20]}
+        analyzer_type: Name registered in AnalyzerFactory; the analyzer must
+            implement indicator_history
+        workers: Number of worker processes (default: CPU count)
+        output: Optional parquet path for the results table
+        **backtest_kwargs: Passed to run_backtest (allow_short, cost_bps, ...)
+
+    Returns:
+        One row per configuration with the parameter columns and the
+        cross-symbol metrics (float32, trades as int32)
+    """
+    configs = parameter_grid(grid)
+    if not configs:
+        raise ValueError("Parameter grid is empty")
+
+    arrays = panel_arrays(df)
+    rows = evaluate_grid(arrays, _evaluate_configs, analyzer_type, configs, workers, backtest_kwargs)
+
+    table = pd.DataFrame([{**config, **row} for config, row in zip(configs, rows)])
+    table[SWEEP_METRICS] = table[SWEEP_METRICS].astype(np.float32)
+    table['trades'] = table['trades'].astype(np.int32)
+
+    n_dates, n_symbols = arrays['close'].shape
+    logger.info(f"Swept {len(configs)} configurations over {n_symbols} symbols and {n_dates} bars")
+
+    if output:
+        table.to_parquet(output, index=False)
+    return table
@@ -0,0 +1,170 @@
+"""
+Walk-forward validation of analyzer configurations.
+
+The price history is split into rolling train/test folds. For each fold the
+configuration with the best training score is selected and scored on the
+following test window, giving an out-of-sample estimate of the grid.
+
+Indicators are causal, so they are computed once per indicator-window set
+over the full history and sliced per fold; the fold slices equal indicators
+computed over each window with its preceding warm-up bars. Configurations
+are evaluated on all folds in one pass, across a process pool.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from investment_system.backtest.engine import TRADING_DAYS_PER_YEAR, PricePanel, run_backtest
+from investment_system.backtest.sweep import (
+    SWEEP_METRICS, config_signals, evaluate_grid, panel_arrays, parameter_grid, summarize_backtest
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Fold:
+    """Bar positions of one fold: train is [train_start, train_end), test is [train_end, test_end)"""
+    train_start: int
+    train_end: int
+    test_end: int
+
+
+@dataclass
+class WalkForwardResult:
+    """Per fold x config scores and the configuration selected in each fold"""
+    folds: List[Fold]
+    evaluations: pd.DataFrame
+    selected: pd.DataFrame
+
+    @property
+    def test_sharpe(self) -> float:
+        """Mean out-of-sample portfolio Sharpe of the selected configurations"""
+        return float(self.selected['test_portfolio_sharpe'].mean())
+
+
+def walk_forward_folds(
+    n_dates: int,
+    train_size: int,
+    test_size: int,
+    step: Optional[int] = None
+) -> List[Fold]:
+    """
+    Rolling train/test folds over n_dates bars.
+
+    Args:
+        n_dates: Number of bars in the history
+        train_size: Bars in each training window
+        test_size: Bars in each test window
+        step: Bars between fold starts (default: test_size, so test windows tile)
+
+    Returns:
+        List of Fold
+    """
+    if train_size < 2 or test_size < 2:
+        raise ValueError("train_size and test_size must be at least 2 bars")
+    step = step or test_size
+
+    folds = [
+        Fold(start, start + train_size, start + train_size + test_size)
+        for start in range(0, n_dates - train_size - test_size + 1, step)
+    ]
+    if not folds:
+        raise ValueError(f"History of {n_dates} bars is too short for a {train_size}+{test_size} bar fold")
+    return folds
+
+
+def _window(panel: PricePanel, signals: np.ndarray, start: int, stop: int) -> tuple:
+    """Panel and signals restricted to bars [start, stop)"""
+    window = PricePanel(dates=panel.dates[start:stop], symbols=panel.symbols, close=panel.close[start:stop])
+    return window, signals[start:stop]
+
+
+def _evaluate_folds(
+    arrays: Dict[str, np.ndarray],
+    analyzer_type: str,
+    configs: List[Dict[str, Any]],
+    folds: List[Fold],
+    backtest_kwargs: Dict[str, Any]
+) -> List[List[Dict[str, float]]]:
+    """Train and test scores of every fold for each configuration"""
+    periods = backtest_kwargs.get('periods_per_year', TRADING_DAYS_PER_YEAR)
+
+    results = []
+    for panel, signals in config_signals(arrays, analyzer_type, configs):
+        rows = []
+        for fold in folds:
+            train = run_backtest(*_window(panel, signals, fold.train_start, fold.train_end), **backtest_kwargs)
+            test = run_backtest(*_window(panel, signals, fold.train_end, fold.test_end), **backtest_kwargs)
+            row = {f"train_{k}": v for k, v in summarize_backtest(train, periods).items()}
+            row.update({f"test_{k}": v for k, v in summarize_backtest(test, periods).items()})
+            rows.append(row)
+        results.append(rows)
+    return results
+
+
+def walk_forward(
+    df: pd.DataFrame,
+    grid: Dict[str, Sequence[Any]],
+    train_size: int,
+    test_size: int,
+    step: Optional[int] = None,
+    analyzer_type: str = "technical",
+    select_by: str = "portfolio_sharpe",
+    workers: Optional[int] = None,
+    **backtest_kwargs
+) -> WalkForwardResult:
+    """
+    Walk-forward evaluation of an analyzer parameter grid.
+
+    Each fold is backtested independently (positions start flat at the
+    start of every train and test window).
+
+    Args:
+        df: Long price data with columns date, symbol, close and volume
+        grid: Analyzer constructor argument -> values to try
+        train_size: Bars in each training window
+        test_size: Bars in each test window
+        step: Bars between fold starts (default: test_size)
+        analyzer_type: Name registered in AnalyzerFactory
+        select_by: Sweep metric maximized on the training window
+        workers: Number of worker processes (default: CPU count)
+        **backtest_kwargs: Passed to run_backtest
+
+    Returns:
+        WalkForwardResult
+    """
+    if select_by not in SWEEP_METRICS:
+        raise ValueError(f"Unknown selection metric: {select_by}")
+    configs = parameter_grid(grid)
+    if not configs:
+        raise ValueError("Parameter grid is empty")
+
+    arrays = panel_arrays(df)
+    dates = np.unique(pd.to_datetime(df['date']).values)
+    folds = walk_forward_folds(len(dates), train_size, test_size, step)
+
+    scores = evaluate_grid(arrays, _evaluate_folds, analyzer_type, configs, workers, folds, backtest_kwargs)
+
+    evaluations = pd.DataFrame([
+        {'fold': i, **config, **row}
+        for config, rows in zip(configs, scores)
+        for i, row in enumerate(rows)
+    ])
+    metric_columns = [f"{part}_{metric}" for part in ('train', 'test') for metric in SWEEP_METRICS]
+    evaluations[metric_columns] = evaluations[metric_columns].astype(np.float32)
+    evaluations[['train_trades', 'test_trades']] = evaluations[['train_trades', 'test_trades']].astype(np.int32)
+
+    score = evaluations[f"train_{select_by}"].fillna(-np.inf)
+    selected = evaluations.loc[score.groupby(evaluations['fold']).idxmax()].reset_index(drop=True)
+    selected.insert(1, 'train_start', dates[[fold.train_start for fold in folds]])
+    selected.insert(2, 'test_start', dates[[fold.train_end for fold in folds]])
+    selected.insert(3, 'test_end', dates[[fold.test_end - 1 for fold in folds]])
+
+    logger.info(f"Walk-forward: {len(configs)} configurations x {len(folds)} folds")
+
+    return WalkForwardResult(folds=folds, evaluations=evaluations, selected=selected)
@@ -3,51 +3,243 @@ Modular analyzer system with AI hooks.
 Each analyzer is independent and can be enhanced by AI without breaking others.
 """
 
+import asyncio
+import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, Callable
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Any, Callable, Tuple, Union
 import numpy as np
 import pandas as pd
 from decimal import Decimal
 
 from investment_system.core.contracts import (
-    MarketData, TradingSignal, SignalType, IndicatorType,
-    AIHookRequest, AIHookResponse
+    ColumnarMarketData, MarketData, TradingSignal, SignalType, IndicatorType,
+    AIHookRequest, AIHookResponse, trusted
 )
+from investment_system.core import indicators
+from investment_system.core.indicators import latest_mean, latest_rsi, round_indicator
+from investment_system.infrastructure.cache import get_cache, data_checksum
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+DEFAULT_HOOK_TIMEOUT = 2.0  # Seconds an async hook handler may take per call
+BREAKER_THRESHOLD = 3  # Consecutive timeouts/failures before a handler is skipped
+BREAKER_COOLDOWN = 30.0  # Seconds a tripped handler is skipped before it is retried
+
+# Event loop (in a daemon thread) running async and timeout-bounded hook calls
+_hook_loop: Optional[asyncio.AbstractEventLoop] = None
+_hook_loop_lock = threading.Lock()
+
+
+def get_hook_loop() -> asyncio.AbstractEventLoop:
+    """Get the shared hook event loop, starting it on first use"""
+    global _hook_loop
+    with _hook_loop_lock:
+        if _hook_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="analyzer-hooks", daemon=True).start()
+            _hook_loop = loop
+    return _hook_loop
+
+
+@dataclass
+class HookStats:
+    """Latency and outcome counters of one hook handler"""
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    timeouts: int = 0
+    failures: int = 0
+    skipped: int = 0
+    
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+@dataclass
+class _HookHandler:
+    """A registered handler with its execution options and circuit breaker"""
+    handler: Callable
+    batch: bool
+    timeout: Optional[float]
+    is_async: bool
+    stats: HookStats = field(default_factory=HookStats)
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    # Guards stats and the breaker state (handlers run from many request threads)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    
+    @property
+    def name(self) -> str:
+        return getattr(self.handler, '__qualname__', repr(self.handler))
+    
+    @property
+    def inline(self) -> bool:
+        """Sync handlers without a timeout run in the calling thread"""
+        return not self.is_async and self.timeout is None
 
 
 class AnalyzerHooks:
-    """Registry for AI hooks in analyzers"""
+    """Registry for AI hooks in analyzers
+    
+    Handlers may be plain or async functions. Async handlers (and sync ones
+    registered with a timeout) run on a shared event loop with a per-call
+    timeout, concurrently across the symbols of a batch. A handler that
+    times out or fails BREAKER_THRESHOLD times in a row is skipped for
+    BREAKER_COOLDOWN seconds.
+    """
     
     def __init__(self):
-        self._hooks: Dict[str, List[Callable]] = {}
+        self._handlers: Dict[str, List[_HookHandler]] = {}
+    
+    def register(
+        self,
+        hook_name: str,
+        handler: Callable,
+        batch: bool = False,
+        timeout: Optional[float] = None
+    ):
+        """Register an AI hook handler
+        
+        Batch handlers receive data={"inputs": [...]} with the values of many
+        symbols and return processed_data={"outputs": [...]} in the same order.
+        timeout defaults to DEFAULT_HOOK_TIMEOUT for async handlers and to
+        none (run inline) for sync handlers.
+        """
+        is_async = asyncio.iscoroutinefunction(handler)
+        if timeout is None and is_async:
+            timeout = DEFAULT_HOOK_TIMEOUT
+        
+        self._handlers.setdefault(hook_name, []).append(_HookHandler(handler, batch, timeout, is_async))
+    
+    def has(self, hook_name: str) -> bool:
+        """Check if any handler is registered for a hook"""
+        return bool(self._handlers.get(hook_name))
     
-    def register(self, hook_name: str, handler: Callable):
-        """Register an AI hook handler"""
-        if hook_name not in self._hooks:
-            self._hooks[hook_name] = []
-        self._hooks[hook_name].append(handler)
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Latency and outcome counters per hook handler ("hook:handler")"""
+        metrics = {}
+        for hook_name, entries in self._handlers.items():
+            for entry in entries:
+                with entry.lock:
+                    stats = HookStats(**asdict(entry.stats))
+                metrics[f"{hook_name}:{entry.name}"] = {**asdict(stats), 'mean_ms': round(stats.mean_ms, 3)}
+        return metrics
     
     def execute(self, hook_name: str, data: Any) -> Any:
         """Execute all handlers for a hook"""
-        if hook_name not in self._hooks:
-            return data
-            
-        result = data
-        for handler in self._hooks[hook_name]:
-            try:
-                hook_request = AIHookRequest(
-                    hook_id=hook_name,
-                    data={"input": result}
-                )
-                hook_response = handler(hook_request)
-                if hook_response.modifications_made:
-                    result = hook_response.processed_data.get("output", result)
-            except Exception as e:
-                # Log error but don't break the flow
-                print(f"Hook {hook_name} failed: {e}")
+        return self.execute_many(hook_name, [data])[0]
+    
+    def execute_many(self, hook_name: str, items: List[Any]) -> List[Any]:
+        """Execute all handlers for a hook over the values of many symbols
+        
+        Handlers run in registration order, each on the previous one's
+        output. Batch handlers are called once for all items; other handlers
+        once per item.
+        """
+        if not self.has(hook_name):
+            return items
+        
+        results = list(items)
+        for entry in self._handlers[hook_name]:
+            with entry.lock:
+                skip = entry.open_until > time.monotonic()
+                if skip:
+                    entry.stats.skipped += 1
+            if skip:
                 continue
+            if entry.batch:
+                results = self._run(hook_name, entry, "inputs", "outputs", [results])[0]
+            else:
+                results = self._run(hook_name, entry, "input", "output", results)
+        
+        return results
+    
+    def _run(
+        self,
+        hook_name: str,
+        entry: _HookHandler,
+        input_key: str,
+        output_key: str,
+        payloads: List[Any]
+    ) -> List[Any]:
+        """Call a handler once per payload, keeping a payload whose call fails or times out"""
+        requests = [AIHookRequest.construct(hook_id=hook_name, data={input_key: p}, context=None) for p in payloads]
+        
+        if entry.inline:
+            outcomes = []
+            for request in requests:
+                started = time.perf_counter()
+                try:
+                    outcomes.append((entry.handler(request), None, time.perf_counter() - started))
+                except Exception as e:
+                    outcomes.append((None, e, time.perf_counter() - started))
+        else:
+            calls = self._gather(entry, requests)
+            outcomes = asyncio.run_coroutine_threadsafe(calls, get_hook_loop()).result()
         
-        return result
+        results = []
+        for payload, (response, error, elapsed) in zip(payloads, outcomes):
+            if error is None and not isinstance(response, AIHookResponse):
+                error = TypeError(f"expected AIHookResponse, got {type(response).__name__}")
+            self._record(hook_name, entry, error, elapsed)
+            if error is None and response.modifications_made:
+                results.append(response.processed_data.get(output_key, payload))
+            else:
+                results.append(payload)
+        return results
+    
+    async def _gather(self, entry: _HookHandler, requests: List[AIHookRequest]) -> List[tuple]:
+        """Concurrent timeout-bounded calls"""
+        return await asyncio.gather(*[self._call_async(entry, request) for request in requests])
+    
+    async def _call_async(self, entry: _HookHandler, request: AIHookRequest) -> tuple:
+        """(response, error, seconds) of one timeout-bounded call"""
+        started = time.perf_counter()
+        try:
+            if entry.is_async:
+                call = entry.handler(request)
+            else:
+                call = asyncio.get_running_loop().run_in_executor(None, entry.handler, request)
+            return await asyncio.wait_for(call, entry.timeout), None, time.perf_counter() - started
+        except Exception as e:
+            return None, e, time.perf_counter() - started
+    
+    def _record(self, hook_name: str, entry: _HookHandler, error: Optional[Exception], elapsed: float):
+        """Update the handler's metrics and circuit breaker"""
+        timed_out = isinstance(error, asyncio.TimeoutError)
+        with entry.lock:
+            stats = entry.stats
+            stats.calls += 1
+            stats.total_ms += elapsed * 1000
+            stats.max_ms = max(stats.max_ms, elapsed * 1000)
+            
+            if error is None:
+                entry.consecutive_failures = 0
+                return
+            
+            if timed_out:
+                stats.timeouts += 1
+            else:
+                stats.failures += 1
+            entry.consecutive_failures += 1
+            tripped = entry.consecutive_failures >= BREAKER_THRESHOLD
+            if tripped:
+                entry.open_until = time.monotonic() + BREAKER_COOLDOWN
+                entry.consecutive_failures = 0
+        
+        if timed_out:
+            logger.warning(f"Hook {hook_name} ({entry.name}) timed out after {entry.timeout}s")
+        else:
+            # Log error but don't break the flow
+            logger.warning(f"Hook {hook_name} ({entry.name}) failed: {error}")
+        if tripped:
+            logger.warning(f"Hook {hook_name} ({entry.name}) skipped for {BREAKER_COOLDOWN}s after repeated errors")
 
 
 class BaseAnalyzer(ABC):
@@ -67,6 +259,24 @@ class BaseAnalyzer(ABC):
         """Calculate technical indicators from price data"""
         pass
     
+    def indicator_params(self) -> Dict[str, Any]:
+        """Parameters that determine calculate_indicators output (part of the cache key)
+        
+        Defaults to every public attribute holding a plain value, so differently
+        configured instances never share indicators; subclasses that know which
+        attributes their indicators read narrow it down.
+        """
+        params = self._analyzer_params()
+        params.update({
+            name: value for name, value in vars(self).items()
+            if not name.startswith('_') and isinstance(value, (bool, int, float, str, type(None)))
+        })
+        return params
+    
+    def _analyzer_params(self) -> Dict[str, Any]:
+        """Analyzer class part of indicator_params"""
+        return {"analyzer": f"{type(self).__module__}.{type(self).__qualname__}"}
+    
     @abstractmethod
     def generate_signal(self, indicators: Dict[IndicatorType, float]) -> SignalType:
         """Generate trading signal from indicators"""
@@ -77,17 +287,205 @@ class BaseAnalyzer(ABC):
         """Calculate confidence score for the signal"""
         pass
     
-    def analyze(self, market_data: MarketData) -> TradingSignal:
+    # Bars needed before the analyzer produces a signal (for full-history mode)
+    min_history = 1
+    
+    def indicator_window(self) -> Optional[int]:
+        """Trailing bars the latest indicator values depend on (None: the whole history)"""
+        return None
+    
+    def reported_indicators(self, values: Dict) -> Dict[IndicatorType, float]:
+        """Indicator values put on the TradingSignal (by default the IndicatorType keys)"""
+        return {k: v for k, v in values.items() if isinstance(k, IndicatorType)}
+    
+    # Analyzers that compute their indicators for every bar at once define
+    #   indicator_history(data, groups=None) -> Dict[IndicatorType, pd.Series]
+    # with data ordered by date within each group (see supports_history)
+    
+    @property
+    def supports_history(self) -> bool:
+        """Whether the analyzer defines indicator_history (full-history and batch analysis)"""
+        return callable(getattr(self, 'indicator_history', None))
+    
+    def generate_signal_array(self, indicators: Dict[IndicatorType, np.ndarray]) -> np.ndarray:
+        """Vectorized generate_signal returning signal values (default evaluates it element by element)"""
+        size = len(next(iter(indicators.values()), []))
+        return np.array([
+            SignalType(self.generate_signal({k: v[i] for k, v in indicators.items()})).value
+            for i in range(size)
+        ], dtype=object)
+    
+    def calculate_confidence_array(
+        self,
+        indicators: Dict[IndicatorType, np.ndarray],
+        signals: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized calculate_confidence (default evaluates it element by element)"""
+        return np.array([
+            self.calculate_confidence({k: v[i] for k, v in indicators.items()}, SignalType(signal))
+            for i, signal in enumerate(signals)
+        ], dtype=float)
+    
+    def analyze_history(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Signals for every bar in the history, vectorized (AI hooks are not applied).
+        
+        Args:
+            df: Price data with a timestamp (or date) column and optionally a
+                symbol column to analyze many symbols at once
+        
+        Returns:
+            Columnar DataFrame ordered by symbol and time with the indicator
+            values, signal and confidence of every bar
+        """
+        if not self.supports_history:
+            raise ValueError(f"{type(self).__name__} does not support full-history analysis")
+        ordered, groups, time_col = _order_panel(df)
+        
+        indicator_series = self.indicator_history(ordered, groups)
+        
+        # Drop bars the single-bar analyzer could not handle yet
+        keep = indicators.bar_index(ordered['close'], groups) >= self.min_history - 1
+        values = {k: round_indicator(np.asarray(v, dtype=float)[keep]) for k, v in indicator_series.items()}
+        
+        signals = self.generate_signal_array(values)
+        confidence = self.calculate_confidence_array(values, signals)
+        
+        frame = {}
+        if groups is not None:
+            frame['symbol'] = ordered['symbol'].to_numpy()[keep]
+        frame['timestamp'] = ordered[time_col].to_numpy()[keep]
+        frame['close'] = ordered['close'].to_numpy()[keep]
+        for indicator, array in values.items():
+            frame[indicator.value] = array
+        frame['signal'] = signals
+        frame['confidence'] = np.round(confidence, 4)
+        
+        return pd.DataFrame(frame)
+    
+    def analyze_many(
+        self,
+        panel: Union[pd.DataFrame, List[Union[MarketData, ColumnarMarketData]]]
+    ) -> List[TradingSignal]:
+        """
+        Latest signal of every symbol in a panel, vectorized across symbols.
+        
+        Gives the same signals as analyze() per symbol: indicators come from
+        indicator_history over each symbol's trailing indicator_window bars
+        and AI hooks run batched over all symbols. Analyzers without
+        indicator_history fall back to analyzing symbol by symbol.
+        
+        Two differences from calling analyze() per symbol: symbols with fewer
+        than min_history bars get no signal (analyze() evaluates whatever
+        history there is), and the per-symbol indicator cache is not
+        consulted, since one vectorized pass over the panel costs less than
+        checksumming every symbol's history (SignalService caches the
+        resulting signals per symbol instead).
+        
+        Args:
+            panel: Long price data with symbol, timestamp (or date) and
+                open/high/low/close/volume columns, or a list of (columnar) MarketData
+        
+        Returns:
+            One TradingSignal per symbol with at least min_history bars, in
+            order of first appearance
+        """
+        ordered, bars = prepare_panel(panel, self.indicator_window(), self.hooks)
+        return self.analyze_prepared(ordered, bars)
+    
+    def analyze_prepared(self, ordered: pd.DataFrame, bars: np.ndarray) -> List[TradingSignal]:
+        """
+        Latest signal of every symbol in a panel from prepare_panel.
+        
+        Args:
+            ordered: Panel ordered by symbol and time, holding at least the
+                trailing indicator_window bars of each symbol
+            bars: Full history length of each row's symbol
+        
+        Returns:
+            Signals as returned by analyze_many (pre_analysis hooks are not run)
+        """
+        if ordered.empty:
+            return []
+        groups = ordered['symbol']
+        
+        if not self.supports_history:
+            return [
+                self.analyze_frame(symbol, frame.reset_index(drop=True))
+                for symbol, frame in ordered.groupby('symbol', sort=False)
+                if len(frame) >= self.min_history
+            ]
+        indicator_series = self.indicator_history(ordered, groups)
+        
+        # Last bar of each symbol that has enough history
+        codes = pd.factorize(groups)[0]
+        last = np.flatnonzero(np.append(codes[1:] != codes[:-1], True))
+        enough = bars[last] >= self.min_history
+        if not enough.all():
+            logger.debug(
+                f"{type(self).__name__}: no signal for {int((~enough).sum())} symbols "
+                f"with fewer than {self.min_history} bars"
+            )
+        last = last[enough]
+        if not len(last):
+            return []
+        
+        symbols = groups.to_numpy()[last]
+        closes = ordered['close'].to_numpy()[last]
+        values = {k: round_indicator(np.asarray(v, dtype=float)[last]) for k, v in indicator_series.items()}
+        
+        # Hook: post_indicators - AI can modify indicators
+        if self.hooks.has("post_indicators"):
+            rows = self.hooks.execute_many("post_indicators", _indicator_rows(values))
+            values = {k: np.array([row[k] for row in rows], dtype=float) for k in rows[0]}
+        
+        signals = self.generate_signal_array(values)
+        
+        # Hook: signal_override - AI can override signal
+        if self.hooks.has("signal_override"):
+            overrides = self.hooks.execute_many("signal_override", [SignalType(s) for s in signals])
+            signals = np.array([SignalType(s).value for s in overrides], dtype=object)
+        
+        confidence = self.calculate_confidence_array(values, signals).tolist()
+        
+        # Hook: confidence_adjustment - AI can adjust confidence
+        confidence = self.hooks.execute_many("confidence_adjustment", confidence)
+        
+        ai_enhanced = self._has_ai_hooks()
+        make_signal = self._signal_factory()
+        trading_signals = [
+            make_signal(
+                symbol=symbol,
+                signal=SignalType(signal),
+                confidence=round(float(conf), 4),
+                price=Decimal(str(close)),
+                indicators=self.reported_indicators(row),
+                ai_enhanced=ai_enhanced
+            )
+            for symbol, signal, conf, close, row in zip(
+                symbols, signals, confidence, closes.tolist(), _indicator_rows(values)
+            )
+        ]
+        
+        # Hook: post_analysis - AI can modify final signals
+        return self.hooks.execute_many("post_analysis", trading_signals)
+    
+    def analyze(self, market_data: Union[MarketData, ColumnarMarketData]) -> TradingSignal:
         """Main analysis pipeline with AI hooks"""
         
         # Convert to DataFrame for analysis
         df = self._market_data_to_df(market_data)
         
+        return self.analyze_frame(market_data.symbol, df)
+    
+    def analyze_frame(self, symbol: str, df: pd.DataFrame) -> TradingSignal:
+        """Analysis pipeline for a price DataFrame (open/high/low/close/volume)"""
+        
         # Hook: pre_analysis - AI can modify input data
         df = self.hooks.execute("pre_analysis", df)
         
         # Calculate indicators
-        indicators = self.calculate_indicators(df)
+        indicators = self._cached_indicators(symbol, df)
         
         # Hook: post_indicators - AI can modify indicators
         indicators = self.hooks.execute("post_indicators", indicators)
@@ -105,12 +503,12 @@ class BaseAnalyzer(ABC):
         confidence = self.hooks.execute("confidence_adjustment", confidence)
         
         # Create trading signal
-        trading_signal = TradingSignal(
-            symbol=market_data.symbol,
-            signal=signal,
-            confidence=confidence,
+        trading_signal = self._signal_factory()(
+            symbol=symbol,
+            signal=SignalType(signal),
+            confidence=round(float(confidence), 4),
             price=Decimal(str(df['close'].iloc[-1])),
-            indicators=indicators,
+            indicators=self.reported_indicators(indicators),
             ai_enhanced=self._has_ai_hooks()
         )
         
@@ -119,8 +517,35 @@ class BaseAnalyzer(ABC):
         
         return trading_signal
     
-    def _market_data_to_df(self, market_data: MarketData) -> pd.DataFrame:
+    def _signal_factory(self) -> Callable[..., TradingSignal]:
+        """Trusted TradingSignal construction, unless hooks can change the values it is built from"""
+        if any(self.hooks.has(name) for name in ('post_indicators', 'signal_override', 'confidence_adjustment')):
+            return TradingSignal
+        return lambda **values: trusted(TradingSignal, **values)
+    
+    def _cached_indicators(self, symbol: str, df: pd.DataFrame) -> Dict[IndicatorType, float]:
+        """calculate_indicators with a content-addressed cache in front of it"""
+        if df.empty:
+            return self.calculate_indicators(df)
+        
+        cache = get_cache()
+        last_bar = df['timestamp'].iloc[-1] if 'timestamp' in df.columns else len(df)
+        checksum = data_checksum(*[df[col].to_numpy() for col in PRICE_COLUMNS if col in df.columns])
+        params = self.indicator_params()
+        
+        cached = cache.get_indicators(symbol, last_bar, checksum, params)
+        if cached is not None:
+            return dict(cached)
+        
+        indicators = self.calculate_indicators(df)
+        cache.set_indicators(symbol, last_bar, checksum, params, dict(indicators))
+        return indicators
+    
+    def _market_data_to_df(self, market_data: Union[MarketData, ColumnarMarketData]) -> pd.DataFrame:
         """Convert MarketData to DataFrame"""
+        if isinstance(market_data, ColumnarMarketData):
+            return market_data.frame()
+        
         data = []
         for price in market_data.prices:
             data.append({
@@ -135,28 +560,130 @@ class BaseAnalyzer(ABC):
     
     def _has_ai_hooks(self) -> bool:
         """Check if any AI hooks are registered"""
-        return len(self.hooks._hooks) > 0
+        return bool(self.hooks._handlers)
+
+
+def _indicator_rows(values: Dict[IndicatorType, np.ndarray]) -> List[Dict[IndicatorType, float]]:
+    """Per-symbol indicator dicts from indicator arrays"""
+    columns = {k: v.tolist() for k, v in values.items()}
+    size = len(next(iter(columns.values()), []))
+    return [{k: column[i] for k, column in columns.items()} for i in range(size)]
+
+
+def _order_panel(df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[pd.Series], str]:
+    """Rows ordered by symbol (in order of first appearance) and time, the symbol groups and time column"""
+    time_col = 'timestamp' if 'timestamp' in df.columns else 'date'
+    times = df[time_col]
+    times = times.values if pd.api.types.is_datetime64_any_dtype(times) else pd.to_datetime(times).values
+    if 'symbol' in df.columns:
+        codes, _ = pd.factorize(df['symbol'])
+        ordered = df.iloc[np.lexsort((times, codes))].reset_index(drop=True)
+        groups = ordered['symbol']
+    else:
+        ordered = df.iloc[np.argsort(times, kind='stable')].reset_index(drop=True)
+        groups = None
+    return ordered, groups, time_col
+
+
+def prepare_panel(
+    panel: Union[pd.DataFrame, List[Union[MarketData, ColumnarMarketData]]],
+    window: Optional[int] = None,
+    hooks: Optional[AnalyzerHooks] = None
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Order a multi-symbol panel for latest-signal analysis.
+    
+    Args:
+        panel: Long price data with symbol, timestamp (or date) and
+            open/high/low/close/volume columns, or a list of (columnar) MarketData
+        window: Trailing bars to keep per symbol (None keeps the whole history)
+        hooks: Hooks whose pre_analysis handlers are applied to each symbol's frame
+    
+    Returns:
+        (panel ordered by symbol and time, full history length of each row's symbol)
+    """
+    if not isinstance(panel, pd.DataFrame):
+        panel = market_data_panel(panel)
+    if panel.empty:
+        return panel, np.zeros(0, dtype=int)
+    
+    ordered, _, _ = _order_panel(panel)
+    if hooks is not None and hooks.has("pre_analysis"):
+        frames = [frame.reset_index(drop=True) for _, frame in ordered.groupby('symbol', sort=False)]
+        frames = hooks.execute_many("pre_analysis", frames)
+        ordered = pd.concat(frames, ignore_index=True)
+    
+    # Bars per symbol, then only the trailing bars the latest indicators read
+    bars = ordered.groupby('symbol', sort=False)['close'].transform('size').to_numpy()
+    if window is not None:
+        from_end = ordered.groupby('symbol', sort=False).cumcount(ascending=False).to_numpy()
+        tail = from_end < window
+        ordered = ordered[tail].reset_index(drop=True)
+        bars = bars[tail]
+    return ordered, bars
+
+
+def market_data_panel(market_data_list: List[Union[MarketData, ColumnarMarketData]]) -> pd.DataFrame:
+    """Long price panel (symbol, timestamp, OHLCV columns) of many MarketData"""
+    columns = [
+        md if isinstance(md, ColumnarMarketData) else ColumnarMarketData.from_market_data(md)
+        for md in market_data_list
+    ]
+    if not columns:
+        return pd.DataFrame(columns=['symbol', 'timestamp'] + PRICE_COLUMNS)
+    panel = {
+        'symbol': np.repeat(np.array([md.symbol for md in columns], dtype=object), [len(md) for md in columns]),
+        'timestamp': np.concatenate([md.timestamp for md in columns]),
+    }
+    for col in PRICE_COLUMNS:
+        panel[col] = np.concatenate([getattr(md, col) for md in columns])
+    return pd.DataFrame(panel)
 
 
 class TechnicalAnalyzer(BaseAnalyzer):
     """Technical analysis using standard indicators"""
     
+    def __init__(
+        self,
+        rsi_period: int = 14,
+        sma_fast: int = 20,
+        sma_slow: int = 50,
+        rsi_oversold: float = 30,
+        rsi_overbought: float = 70
+    ):
+        super().__init__()
+        self.rsi_period = rsi_period
+        self.sma_fast = sma_fast
+        self.sma_slow = sma_slow
+        self.rsi_oversold = rsi_oversold
+        self.rsi_overbought = rsi_overbought
+    
+    def indicator_params(self) -> Dict[str, Any]:
+        """Indicator windows are part of the cache key; signal thresholds are not"""
+        params = self._analyzer_params()
+        params.update(rsi_period=self.rsi_period, sma_fast=self.sma_fast, sma_slow=self.sma_slow)
+        return params
+    
+    def indicator_window(self) -> Optional[int]:
+        """Slowest SMA or the RSI changes"""
+        return max(self.sma_fast, self.sma_slow, self.rsi_period + 1)
+    
     def calculate_indicators(self, data: pd.DataFrame) -> Dict[IndicatorType, float]:
         """Calculate technical indicators"""
         indicators = {}
         
         # RSI
-        indicators[IndicatorType.RSI] = self._calculate_rsi(data['close'])
+        indicators[IndicatorType.RSI] = self._calculate_rsi(data['close'], self.rsi_period)
         
-        # Simple Moving Averages
-        indicators[IndicatorType.SMA_20] = data['close'].rolling(window=20).mean().iloc[-1]
-        indicators[IndicatorType.SMA_50] = data['close'].rolling(window=50).mean().iloc[-1]
+        # Simple Moving Averages (fast/slow windows are reported as SMA_20/SMA_50)
+        indicators[IndicatorType.SMA_20] = latest_mean(data['close'], self.sma_fast)
+        indicators[IndicatorType.SMA_50] = latest_mean(data['close'], self.sma_slow)
         
         # Volume indicator
         indicators[IndicatorType.VOLUME] = data['volume'].iloc[-1]
         
         # Round all values
-        indicators = {k: round(v, 2) for k, v in indicators.items()}
+        indicators = {k: float(round_indicator(v)) for k, v in indicators.items()}
         
         return indicators
     
@@ -168,16 +695,16 @@ class TechnicalAnalyzer(BaseAnalyzer):
         
         # Golden cross / Death cross
         if sma_20 > sma_50:
-            if rsi < 30:  # Oversold in uptrend
+            if rsi < self.rsi_oversold:  # Oversold in uptrend
                 return SignalType.BUY
-            elif rsi > 70:  # Overbought in uptrend
+            elif rsi > self.rsi_overbought:  # Overbought in uptrend
                 return SignalType.SELL
             else:
                 return SignalType.BUY  # Uptrend
         else:
-            if rsi < 30:  # Oversold in downtrend
+            if rsi < self.rsi_oversold:  # Oversold in downtrend
                 return SignalType.HOLD
-            elif rsi > 70:  # Overbought in downtrend
+            elif rsi > self.rsi_overbought:  # Overbought in downtrend
                 return SignalType.SELL
             else:
                 return SignalType.SELL  # Downtrend
@@ -191,9 +718,9 @@ class TechnicalAnalyzer(BaseAnalyzer):
         sma_50 = indicators.get(IndicatorType.SMA_50, 0)
         
         # RSI contribution
-        if signal == SignalType.BUY and rsi < 30:
+        if signal == SignalType.BUY and rsi < self.rsi_oversold:
             confidence += 0.2
-        elif signal == SignalType.SELL and rsi > 70:
+        elif signal == SignalType.SELL and rsi > self.rsi_overbought:
             confidence += 0.2
         
         # SMA contribution
@@ -203,28 +730,108 @@ class TechnicalAnalyzer(BaseAnalyzer):
         
         return min(0.95, confidence)  # Cap at 95%
     
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
-        """Calculate RSI"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    def indicator_history(
+        self,
+        data: pd.DataFrame,
+        groups: Optional[pd.Series] = None
+    ) -> Dict[IndicatorType, pd.Series]:
+        """Technical indicators for every bar"""
+        close = data['close']
+        return {
+            IndicatorType.RSI: indicators.rsi(close, self.rsi_period, groups).fillna(50.0),
+            IndicatorType.SMA_20: indicators.rolling_mean(close, self.sma_fast, groups),
+            IndicatorType.SMA_50: indicators.rolling_mean(close, self.sma_slow, groups),
+            IndicatorType.VOLUME: data['volume'].astype(float),
+        }
+    
+    def generate_signal_array(self, indicators: Dict[IndicatorType, np.ndarray]) -> np.ndarray:
+        """Vectorized generate_signal"""
+        rsi = indicators[IndicatorType.RSI]
+        uptrend = indicators[IndicatorType.SMA_20] > indicators[IndicatorType.SMA_50]
         
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+        conditions = [
+            uptrend & (rsi > self.rsi_overbought),  # Overbought in uptrend
+            uptrend,                                # Uptrend (or oversold in uptrend)
+            rsi < self.rsi_oversold,                # Oversold in downtrend
+        ]
+        choices = [SignalType.SELL.value, SignalType.BUY.value, SignalType.HOLD.value]
+        return np.select(conditions, choices, default=SignalType.SELL.value).astype(object)
+    
+    def calculate_confidence_array(
+        self,
+        indicators: Dict[IndicatorType, np.ndarray],
+        signals: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized calculate_confidence"""
+        rsi = indicators[IndicatorType.RSI]
+        sma_20 = indicators[IndicatorType.SMA_20]
+        sma_50 = indicators[IndicatorType.SMA_50]
         
-        return rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50.0
+        confidence = np.full(len(signals), 0.5)
+        
+        # RSI contribution
+        buy = signals == SignalType.BUY.value
+        sell = signals == SignalType.SELL.value
+        rsi_confirms = (buy & (rsi < self.rsi_oversold)) | (sell & (rsi > self.rsi_overbought))
+        confidence += np.where(rsi_confirms, 0.2, 0.0)
+        
+        # SMA contribution
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sma_diff_pct = np.where(sma_50 > 0, np.abs(sma_20 - sma_50) / sma_50, 0.0)
+        confidence += np.where(sma_diff_pct > 0.02, np.minimum(0.3, sma_diff_pct * 10), 0.0)
+        
+        return np.minimum(0.95, confidence)
+    
+    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
+        """Calculate RSI (from the trailing period + 1 closes)"""
+        rsi = latest_rsi(prices, period)
+        return rsi if not pd.isna(rsi) else 50.0
 
 
 class MomentumAnalyzer(BaseAnalyzer):
     """Momentum-based analysis"""
     
+    @property
+    def min_history(self) -> int:
+        """long_window-day momentum needs long_window bars"""
+        return self.long_window
+    
+    def __init__(
+        self,
+        short_window: int = 5,
+        long_window: int = 10,
+        short_threshold: float = 0.03,
+        long_threshold: float = 0.05,
+        volume_surge: float = 1.2,
+        rsi_period: int = 7
+    ):
+        super().__init__()
+        self.short_window = short_window
+        self.long_window = long_window
+        self.short_threshold = short_threshold
+        self.long_threshold = long_threshold
+        self.volume_surge = volume_surge
+        self.rsi_period = rsi_period
+    
+    def indicator_params(self) -> Dict[str, Any]:
+        """Momentum windows are part of the cache key; signal thresholds are not"""
+        params = self._analyzer_params()
+        params.update(short_window=self.short_window, long_window=self.long_window, rsi_period=self.rsi_period)
+        return params
+    
+    def indicator_window(self) -> Optional[int]:
+        """Momentum lookbacks, the 20-bar volume average or the RSI changes"""
+        return max(self.short_window, self.long_window, 20, self.rsi_period + 1)
+    
     def calculate_indicators(self, data: pd.DataFrame) -> Dict[IndicatorType, float]:
         """Calculate momentum indicators"""
         indicators = {}
         
         # Price momentum
-        momentum_5 = (data['close'].iloc[-1] - data['close'].iloc[-5]) / data['close'].iloc[-5]
-        momentum_10 = (data['close'].iloc[-1] - data['close'].iloc[-10]) / data['close'].iloc[-10]
+        close_short = data['close'].iloc[-self.short_window]
+        close_long = data['close'].iloc[-self.long_window]
+        momentum_5 = (data['close'].iloc[-1] - close_short) / close_short
+        momentum_10 = (data['close'].iloc[-1] - close_long) / close_long
         
         # Volume momentum
         vol_avg_5 = data['volume'].tail(5).mean()
@@ -239,7 +846,7 @@ class MomentumAnalyzer(BaseAnalyzer):
         indicators[IndicatorType.SMA_20] = momentum_5 * 100
         indicators[IndicatorType.SMA_50] = momentum_10 * 100
         
-        return {k: round(v, 2) for k, v in indicators.items()}
+        return {k: float(round_indicator(v)) for k, v in indicators.items()}
     
     def generate_signal(self, indicators: Dict[IndicatorType, float]) -> SignalType:
         """Generate signal based on momentum"""
@@ -248,10 +855,11 @@ class MomentumAnalyzer(BaseAnalyzer):
         vol_momentum = indicators.get(IndicatorType.VOLUME, 1)
         
         # Strong upward momentum
-        if momentum_5 > 0.03 and momentum_10 > 0.05 and vol_momentum > 1.2:
+        if (momentum_5 > self.short_threshold and momentum_10 > self.long_threshold
+                and vol_momentum > self.volume_surge):
             return SignalType.BUY
         # Strong downward momentum
-        elif momentum_5 < -0.03 and momentum_10 < -0.05:
+        elif momentum_5 < -self.short_threshold and momentum_10 < -self.long_threshold:
             return SignalType.SELL
         # Mixed or weak momentum
         else:
@@ -274,17 +882,65 @@ class MomentumAnalyzer(BaseAnalyzer):
         
         return min(0.95, confidence)
     
+    def indicator_history(
+        self,
+        data: pd.DataFrame,
+        groups: Optional[pd.Series] = None
+    ) -> Dict[IndicatorType, pd.Series]:
+        """Momentum indicators for every bar"""
+        close = data['close']
+        volume = data['volume'].astype(float)
+        
+        close_5 = indicators.shift(close, self.short_window - 1, groups)
+        close_10 = indicators.shift(close, self.long_window - 1, groups)
+        momentum_5 = (close - close_5) / close_5
+        momentum_10 = (close - close_10) / close_10
+        
+        vol_avg_5 = indicators.rolling_mean(volume, 5, groups, min_periods=1)
+        vol_avg_20 = indicators.rolling_mean(volume, 20, groups, min_periods=1)
+        vol_momentum = (vol_avg_5 / vol_avg_20).where(vol_avg_20 > 0, 1.0)
+        
+        return {
+            IndicatorType.RSI: indicators.rsi(close, self.rsi_period, groups).fillna(50.0),
+            IndicatorType.VOLUME: vol_momentum,
+            IndicatorType.SMA_20: momentum_5 * 100,
+            IndicatorType.SMA_50: momentum_10 * 100,
+        }
+    
+    def generate_signal_array(self, indicators: Dict[IndicatorType, np.ndarray]) -> np.ndarray:
+        """Vectorized generate_signal"""
+        momentum_5 = indicators[IndicatorType.SMA_20] / 100
+        momentum_10 = indicators[IndicatorType.SMA_50] / 100
+        vol_momentum = indicators[IndicatorType.VOLUME]
+        
+        conditions = [
+            (momentum_5 > self.short_threshold) & (momentum_10 > self.long_threshold)
+            & (vol_momentum > self.volume_surge),
+            (momentum_5 < -self.short_threshold) & (momentum_10 < -self.long_threshold),
+        ]
+        choices = [SignalType.BUY.value, SignalType.SELL.value]
+        return np.select(conditions, choices, default=SignalType.HOLD.value).astype(object)
+    
+    def calculate_confidence_array(
+        self,
+        indicators: Dict[IndicatorType, np.ndarray],
+        signals: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized calculate_confidence"""
+        momentum_5 = np.abs(indicators[IndicatorType.SMA_20] / 100)
+        momentum_10 = np.abs(indicators[IndicatorType.SMA_50] / 100)
+        vol_momentum = indicators[IndicatorType.VOLUME]
+        
+        confidence = 0.4 + np.minimum(0.3, momentum_5 * 5) + np.minimum(0.2, momentum_10 * 3)
+        confidence += np.where(vol_momentum > 1.5, 0.1, 0.0)
+        
+        return np.minimum(0.95, confidence)
+    
     def _calculate_momentum_rsi(self, prices: pd.Series) -> float:
         """Calculate momentum-adjusted RSI"""
         # Standard RSI with shorter period for momentum
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=7).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=7).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50.0
+        rsi = latest_rsi(prices, self.rsi_period)
+        return rsi if not pd.isna(rsi) else 50.0
 
 
 class AIEnhancedAnalyzer(BaseAnalyzer):
@@ -294,6 +950,10 @@ class AIEnhancedAnalyzer(BaseAnalyzer):
         super().__init__()
         self.fallback = fallback_analyzer or TechnicalAnalyzer()
     
+    def indicator_window(self) -> Optional[int]:
+        """Trailing SMA windows"""
+        return 50
+    
     def calculate_indicators(self, data: pd.DataFrame) -> Dict[IndicatorType, float]:
         """Minimal indicators - let AI enhance"""
         # Calculate basic indicators as input for AI
@@ -303,7 +963,35 @@ class AIEnhancedAnalyzer(BaseAnalyzer):
             IndicatorType.SMA_50: data['close'].tail(50).mean(),
             IndicatorType.VOLUME: data['volume'].iloc[-1]
         }
-        return {k: round(v, 2) for k, v in indicators.items()}
+        return {k: float(round_indicator(v)) for k, v in indicators.items()}
+    
+    def indicator_history(
+        self,
+        data: pd.DataFrame,
+        groups: Optional[pd.Series] = None
+    ) -> Dict[IndicatorType, pd.Series]:
+        """Basic indicators for every bar"""
+        close = data['close']
+        return {
+            IndicatorType.RSI: pd.Series(50.0, index=close.index),
+            IndicatorType.SMA_20: indicators.rolling_mean(close, 20, groups, min_periods=1),
+            IndicatorType.SMA_50: indicators.rolling_mean(close, 50, groups, min_periods=1),
+            IndicatorType.VOLUME: data['volume'].astype(float),
+        }
+    
+    def generate_signal_array(self, indicators: Dict[IndicatorType, np.ndarray]) -> np.ndarray:
+        """Vectorized generate_signal"""
+        rsi = indicators[IndicatorType.RSI]
+        choices = [SignalType.BUY.value, SignalType.SELL.value]
+        return np.select([rsi < 30, rsi > 70], choices, default=SignalType.HOLD.value).astype(object)
+    
+    def calculate_confidence_array(
+        self,
+        indicators: Dict[IndicatorType, np.ndarray],
+        signals: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized calculate_confidence"""
+        return np.full(len(signals), 0.5)
     
     def generate_signal(self, indicators: Dict[IndicatorType, float]) -> SignalType:
         """Simple signal - AI will override"""
@@ -331,10 +1019,10 @@ class AnalyzerFactory:
     }
     
     @classmethod
-    def create(cls, analyzer_type: str = "technical") -> BaseAnalyzer:
-        """Create an analyzer instance"""
+    def create(cls, analyzer_type: str = "technical", **params) -> BaseAnalyzer:
+        """Create an analyzer instance (params are passed to the analyzer constructor)"""
         analyzer_class = cls._analyzers.get(analyzer_type, TechnicalAnalyzer)
-        return analyzer_class()
+        return analyzer_class(**params)
     
     @classmethod
     def register(cls, name: str, analyzer_class: type):
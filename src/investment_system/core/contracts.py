@@ -4,11 +4,15 @@ All data models and interfaces are defined here.
 This ensures type safety and clear boundaries between modules.
 """
 
+import os
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Dict, List, Optional, Any
-from pydantic import BaseModel, Field, validator
+from typing import Dict, List, Optional, Any, Type, TypeVar
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field, root_validator, validator
 
 
 # Enums
@@ -44,6 +48,44 @@ class TimestampedModel(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+# Trusted construction
+M = TypeVar('M', bound=BaseModel)
+
+# Debug switch: validate trusted() models too (STRICT_CONTRACT_VALIDATION=1, on in tests)
+_strict_validation = os.getenv("STRICT_CONTRACT_VALIDATION", "").lower() in {"1", "true", "yes", "on"}
+
+
+def set_strict_validation(enabled: bool):
+    """Turn full validation of trusted() models on or off"""
+    global _strict_validation
+    _strict_validation = enabled
+
+
+def trusted(model: Type[M], **values) -> M:
+    """
+    Build a model from values our own code produced, without validation.
+    
+    Validators do not run, so values must already be what validation would
+    give (field types, rounding). With strict validation on the model is
+    validated as well and a difference from the unvalidated build raises.
+    
+    Args:
+        model: Contract model class
+        **values: Field values
+    
+    Returns:
+        Model instance
+    """
+    if not _strict_validation:
+        return model.construct(**values)
+    
+    validated = model(**values)
+    fields = set(values)
+    if validated.dict(include=fields) != model.construct(**values).dict(include=fields):
+        raise ValueError(f"Unvalidated {model.__name__} differs from its validated form: {values}")
+    return validated
+
+
 # Market Data Models
 class PricePoint(BaseModel):
     """Single price point"""
@@ -85,6 +127,132 @@ class MarketData(TimestampedModel):
         }
 
 
+class ColumnarMarketData(TimestampedModel):
+    """Market data for a symbol stored as NumPy columns
+
+    Columns are validated once as arrays; per-row PricePoints are only built
+    when needed (see to_market_data).
+    """
+    symbol: str = Field(..., regex=r'^[A-Z]{1,5}$')
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    is_stale: bool = False
+    source: str = "yfinance"
+    
+    class Config:
+        arbitrary_types_allowed = True
+    
+    @validator('timestamp', pre=True)
+    def validate_timestamp(cls, v):
+        return pd.to_datetime(np.asarray(v)).values
+    
+    @validator('open', 'high', 'low', 'close', pre=True)
+    def validate_prices(cls, v):
+        v = np.asarray(v, dtype=float)
+        if v.ndim != 1:
+            raise ValueError('Price column must be one-dimensional')
+        if not np.all(v > 0):
+            raise ValueError('Price must be positive')
+        return v
+    
+    @validator('volume', pre=True)
+    def validate_volume(cls, v):
+        return np.asarray(v, dtype=np.int64)
+    
+    @root_validator(skip_on_failure=True)
+    def validate_lengths(cls, values):
+        lengths = {len(values[col]) for col in ('timestamp', 'open', 'high', 'low', 'close', 'volume')}
+        if len(lengths) > 1:
+            raise ValueError('Price columns must have the same length')
+        return values
+    
+    @classmethod
+    def from_frame(cls, symbol: str, df: pd.DataFrame, **kwargs) -> 'ColumnarMarketData':
+        """Columns of a price DataFrame with a timestamp (or date) column"""
+        time_col = 'timestamp' if 'timestamp' in df.columns else 'date'
+        return cls(
+            symbol=symbol,
+            timestamp=df[time_col].to_numpy(),
+            open=df['open'].to_numpy(),
+            high=df['high'].to_numpy(),
+            low=df['low'].to_numpy(),
+            close=df['close'].to_numpy(),
+            volume=df['volume'].to_numpy(),
+            **kwargs
+        )
+    
+    @classmethod
+    def from_market_data(cls, market_data: MarketData) -> 'ColumnarMarketData':
+        """Columns of a per-row MarketData"""
+        prices = market_data.prices
+        return cls(
+            symbol=market_data.symbol,
+            timestamp=[p.timestamp for p in prices],
+            open=[float(p.open) for p in prices],
+            high=[float(p.high) for p in prices],
+            low=[float(p.low) for p in prices],
+            close=[float(p.close) for p in prices],
+            volume=[p.volume for p in prices],
+            is_stale=market_data.is_stale,
+            source=market_data.source
+        )
+    
+    def __len__(self) -> int:
+        return len(self.close)
+    
+    @property
+    def latest_price(self) -> Optional[Decimal]:
+        """Get the most recent price"""
+        if len(self.close):
+            return Decimal(str(self.close[-1]))
+        return None
+    
+    @property
+    def prices(self) -> List[PricePoint]:
+        """Per-row price points (built on access)"""
+        return [
+            trusted(
+                PricePoint,
+                timestamp=pd.Timestamp(ts).to_pydatetime(),
+                open=Decimal(str(o)),
+                high=Decimal(str(h)),
+                low=Decimal(str(l)),
+                close=Decimal(str(c)),
+                volume=v
+            )
+            for ts, o, h, l, c, v in zip(
+                self.timestamp, self.open.tolist(), self.high.tolist(),
+                self.low.tolist(), self.close.tolist(), self.volume.tolist()
+            )
+        ]
+    
+    def frame(self) -> pd.DataFrame:
+        """Price DataFrame (timestamp/open/high/low/close/volume) sharing the columns"""
+        return pd.DataFrame({
+            'timestamp': self.timestamp,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+        }, copy=False)
+    
+    def to_market_data(self) -> MarketData:
+        """Per-row MarketData for serialization"""
+        return trusted(
+            MarketData,
+            symbol=self.symbol,
+            prices=self.prices,
+            is_stale=self.is_stale,
+            source=self.source,
+            created_at=self.created_at
+        )
+
+
 # Signal Models
 class Indicator(BaseModel):
     """Technical indicator value"""
@@ -102,6 +270,7 @@ class TradingSignal(TimestampedModel):
     indicators: Dict[IndicatorType, float]
     reasoning: Optional[str] = None
     ai_enhanced: bool = False
+    expected_value: Optional[float] = None  # Expected return over the EV horizon
     
     @validator('confidence')
     def validate_confidence(cls, v):
@@ -0,0 +1,220 @@
+"""
+Vectorized indicator kernels shared by analyzers and the pipeline.
+Every series function takes an optional groups series (usually the symbol
+column of a frame ordered by symbol and date) so one call covers a whole
+universe. The latest_* functions give the last value of the matching series
+function from the trailing window only, for single-bar analysis.
+
+Inside a shared_kernels() block, series kernels called again with the same
+input objects and parameters return the first result, so several analyzers
+evaluating one frame compute each indicator once.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Values this close to a rounding tie count as the tie
+TIE_TOLERANCE = 1e-9
+
+
+class _KernelMemo:
+    """Kernel results keyed by the identity of their inputs and their parameters"""
+
+    def __init__(self):
+        self._results = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, inputs: Tuple, params: Tuple, compute: Callable):
+        key = (name, tuple(id(x) for x in inputs), params)
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        # Per-key lock: concurrent callers wait for the first computation
+        with lock:
+            entry = self._results.get(key)
+            if entry is None:
+                # Inputs are kept alive so their ids are not reused while the memo exists
+                entry = (inputs, compute())
+                self._results[key] = entry
+            return entry[1]
+
+
+_memo: ContextVar[Optional[_KernelMemo]] = ContextVar('indicator_kernel_memo', default=None)
+
+
+@contextmanager
+def shared_kernels() -> Iterator[None]:
+    """Share kernel results for identical inputs within the block (results must not be modified in place)"""
+    if _memo.get() is not None:
+        yield
+        return
+    token = _memo.set(_KernelMemo())
+    try:
+        yield
+    finally:
+        _memo.reset(token)
+
+
+def _shared(name: str, inputs: Tuple, params: Tuple, compute: Callable):
+    """compute(), memoized when a shared_kernels() block is active"""
+    memo = _memo.get()
+    if memo is None:
+        return compute()
+    return memo.get(name, inputs, params, compute)
+
+
+def _group_ids(groups: pd.Series) -> Optional[np.ndarray]:
+    """Group number of each row when every group is one contiguous block, else None"""
+    codes = pd.factorize(groups)[0]
+    ids = np.concatenate([[0], np.cumsum(codes[1:] != codes[:-1])])
+    return ids if len(codes) == 0 or ids[-1] == codes.max() else None
+
+
+def _rolling_mean(
+    series: pd.Series,
+    window: int,
+    groups: Optional[pd.Series],
+    min_periods: Optional[int]
+) -> pd.Series:
+    if groups is None:
+        return series.rolling(window=window, min_periods=min_periods).mean()
+
+    ids = _shared('group_ids', (groups,), (), lambda: _group_ids(groups))
+    if ids is None:
+        result = series.groupby(groups, sort=False).rolling(window=window, min_periods=min_periods).mean()
+        return result.reset_index(level=0, drop=True).reindex(series.index)
+
+    # One ungrouped pass instead of one per group: window - 1 NaN rows between
+    # groups keep every window inside its group (NaN is not counted)
+    positions = np.arange(len(series)) + (window - 1) * ids
+    padded = np.full(len(series) + (window - 1) * (ids[-1] if len(ids) else 0), np.nan)
+    padded[positions] = series.to_numpy(dtype=float)
+    result = pd.Series(padded).rolling(window=window, min_periods=min_periods).mean().to_numpy()
+    return pd.Series(result[positions], index=series.index, name=series.name)
+
+
+def _rolling_count(series: pd.Series, window: int, groups: Optional[pd.Series]) -> np.ndarray:
+    """Non-NaN values in each window"""
+    if not series.hasnans:
+        return np.minimum(bar_index(series, groups) + 1, window)
+    counts = series.notna().astype(float)
+    return np.rint(_rolling_mean(counts, window, groups, 1) * np.minimum(bar_index(series, groups) + 1, window))
+
+
+def rolling_mean(
+    series: pd.Series,
+    window: int,
+    groups: Optional[pd.Series] = None,
+    min_periods: Optional[int] = None
+) -> pd.Series:
+    """Rolling mean, restarted at every group boundary"""
+    if _memo.get() is None:
+        return _rolling_mean(series, window, groups, min_periods)
+
+    # Shared: one min_periods=1 mean per window, masked to the requested min_periods
+    # (pandas computes the same sums whatever min_periods is)
+    base = _shared('rolling_mean', (series, groups), (window, 1), lambda: _rolling_mean(series, window, groups, 1))
+    min_periods = window if min_periods is None else min_periods
+    if min_periods <= 1:
+        return base
+
+    def masked() -> pd.Series:
+        counts = _shared('rolling_count', (series, groups), (window,), lambda: _rolling_count(series, window, groups))
+        return base.where(counts >= min_periods)
+
+    return _shared('rolling_mean', (series, groups), (window, min_periods), masked)
+
+
+def shift(series: pd.Series, periods: int, groups: Optional[pd.Series] = None) -> pd.Series:
+    """Value `periods` bars back within the same group"""
+    def compute() -> pd.Series:
+        if groups is None:
+            return series.shift(periods)
+        return series.groupby(groups, sort=False).shift(periods)
+
+    return _shared('shift', (series, groups), (periods,), compute)
+
+
+def diff(series: pd.Series, groups: Optional[pd.Series] = None) -> pd.Series:
+    """Bar-to-bar change within the same group"""
+    def compute() -> pd.Series:
+        if groups is None:
+            return series.diff()
+        return series.groupby(groups, sort=False).diff()
+
+    return _shared('diff', (series, groups), (), compute)
+
+
+def rsi(
+    series: pd.Series,
+    period: int = 14,
+    groups: Optional[pd.Series] = None,
+    min_periods: Optional[int] = None
+) -> pd.Series:
+    """Simple-average RSI; NaN until `period` changes are available or when flat"""
+    def compute() -> pd.Series:
+        delta = diff(series, groups)
+        gain = rolling_mean(delta.where(delta > 0, 0), period, groups, min_periods)
+        loss = rolling_mean(-delta.where(delta < 0, 0), period, groups, min_periods)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = gain / loss
+            return 100 - (100 / (1 + rs))
+
+    return _shared('rsi', (series, groups), (period, min_periods), compute)
+
+
+def bar_index(series: pd.Series, groups: Optional[pd.Series] = None) -> np.ndarray:
+    """Position of each bar within its group (0 for the first bar)"""
+    def compute() -> np.ndarray:
+        if groups is None:
+            return np.arange(len(series))
+        return series.groupby(groups, sort=False).cumcount().to_numpy()
+
+    return _shared('bar_index', (series, groups), (), compute)
+
+
+def latest_mean(values, window: int) -> float:
+    """Last value of rolling_mean from the trailing window only"""
+    tail = np.asarray(values, dtype=float)[-window:]
+    if len(tail) < window:
+        return np.nan
+    return tail.mean()
+
+
+def latest_rsi(series, period: int = 14) -> float:
+    """Last value of rsi from the trailing period + 1 closes only"""
+    tail = np.asarray(series, dtype=float)[-(period + 1):]
+    # The first bar of the series has no change and counts as 0, as in rsi
+    delta = np.diff(tail, prepend=np.nan)[-period:]
+    gain = latest_mean(np.where(delta > 0, delta, 0.0), period)
+    loss = latest_mean(np.where(delta < 0, -delta, 0.0), period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = np.float64(gain) / loss
+        return 100 - (100 / (1 + rs))
+
+
+def round_indicator(values, decimals: int = 2):
+    """
+    Round half away from zero, treating values within TIE_TOLERANCE of a tie as the tie.
+
+    Full-history and trailing-window evaluation sum in different orders and
+    can differ in the last bit; plain rounding would then split exact ties
+    (common with cent prices) differently.
+
+    Args:
+        values: Scalar or array
+        decimals: Decimal places
+
+    Returns:
+        Rounded float (or array); NaN stays NaN
+    """
+    scale = 10.0 ** decimals
+    with np.errstate(invalid='ignore'):
+        return np.sign(values) * np.floor(np.abs(values) * scale + 0.5 + TIE_TOLERANCE) / scale
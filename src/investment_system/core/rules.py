@@ -0,0 +1,307 @@
+"""
+Declarative trading rules compiled to vectorized NumPy evaluation.
+
+A rule set is one rule per line (or separated by ';'):
+
+    sma_20 > sma_50 and rsi_14 < 30 -> buy @ 0.8
+    rsi_14 > 70 or momentum_10 < -5 -> sell
+    # comments (to the end of the line) and blank lines are ignored
+
+Conditions use and/or/not, comparisons (chains allowed), + - * /, numbers
+and the variables close, volume, sma_N, rsi_N and momentum_N (percent change
+over N bars). The first matching rule gives the signal and its confidence
+(after '@', default DEFAULT_RULE_CONFIDENCE); no match is a HOLD. Rules are
+parsed once into closures over whole indicator arrays, so one evaluation
+covers every symbol of a panel.
+"""
+
+import ast
+import operator
+import re
+from dataclasses import dataclass
+from functools import reduce
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from investment_system.core import indicators
+from investment_system.core.analyzers import AnalyzerFactory, BaseAnalyzer
+from investment_system.core.contracts import IndicatorType, SignalType
+from investment_system.core.indicators import latest_mean, latest_rsi
+
+DEFAULT_RULE_CONFIDENCE = 0.6
+HOLD_CONFIDENCE = 0.5
+
+_VARIABLE = re.compile(r'^(?:(sma|rsi|momentum)_([1-9][0-9]*)|close|volume)$')
+
+_COMPARISONS = {
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+    ast.GtE: operator.ge, ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+_ARITHMETIC = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+Env = Dict[str, np.ndarray]
+
+
+@dataclass
+class Rule:
+    """One compiled rule"""
+    source: str
+    condition: Callable[[Env], np.ndarray]
+    signal: SignalType
+    confidence: float
+
+
+def _compile(node: ast.AST, variables: set) -> Tuple[Callable[[Env], np.ndarray], str]:
+    """Closure evaluating an expression node and its kind ('bool' or 'num')"""
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_bool(value, variables) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return (lambda env: reduce(combine, (part(env) for part in parts))), 'bool'
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        operand = _compile_bool(node.operand, variables)
+        return (lambda env: np.logical_not(operand(env))), 'bool'
+
+    if isinstance(node, ast.Compare):
+        operands = [_compile_num(n, variables) for n in [node.left] + node.comparators]
+        comparisons = []
+        for op, left, right in zip(node.ops, operands, operands[1:]):
+            if type(op) not in _COMPARISONS:
+                raise ValueError(f"Unsupported comparison: {type(op).__name__}")
+            comparisons.append((_COMPARISONS[type(op)], left, right))
+
+        def compare(env: Env) -> np.ndarray:
+            with np.errstate(invalid='ignore'):
+                return reduce(np.logical_and, (op(left(env), right(env)) for op, left, right in comparisons))
+        return compare, 'bool'
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+        op = _ARITHMETIC[type(node.op)]
+        left, right = _compile_num(node.left, variables), _compile_num(node.right, variables)
+
+        def arithmetic(env: Env) -> np.ndarray:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return op(left(env), right(env))
+        return arithmetic, 'num'
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        operand = _compile_num(node.operand, variables)
+        return (lambda env: -operand(env)), 'num'
+
+    if isinstance(node, ast.Name):
+        if not _VARIABLE.match(node.id):
+            raise ValueError(f"Unknown variable: {node.id}")
+        variables.add(node.id)
+        name = node.id
+        return (lambda env: env[name]), 'num'
+
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = float(node.value)
+        return (lambda env: value), 'num'
+
+    raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+
+
+def _compile_bool(node: ast.AST, variables: set) -> Callable[[Env], np.ndarray]:
+    compiled, kind = _compile(node, variables)
+    if kind != 'bool':
+        raise ValueError(f"Expected a condition, got: {ast.unparse(node)}")
+    return compiled
+
+
+def _compile_num(node: ast.AST, variables: set) -> Callable[[Env], np.ndarray]:
+    compiled, kind = _compile(node, variables)
+    if kind != 'num':
+        raise ValueError(f"Expected a value, got: {ast.unparse(node)}")
+    return compiled
+
+
+class RuleSet:
+    """Parsed and compiled rules, evaluated in order"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.rules: List[Rule] = []
+        self.variables: set = set()
+
+        # Comments end at the end of their line, ';' included
+        for number, line in enumerate(source.splitlines(), 1):
+            for statement in line.split('#', 1)[0].split(';'):
+                if statement.strip():
+                    self.rules.append(self._parse(statement.strip(), number))
+        if not self.rules:
+            raise ValueError("Rule set is empty")
+        if not self.variables:
+            raise ValueError("Rule set reads no variables")
+
+    def _parse(self, line: str, number: int) -> Rule:
+        condition, arrow, action = line.partition('->')
+        if not arrow:
+            raise ValueError(f"Line {number}: expected '<condition> -> <signal>', got: {line}")
+
+        signal, _, confidence = action.partition('@')
+        try:
+            signal_type = SignalType(signal.strip().lower())
+            confidence = float(confidence) if confidence.strip() else DEFAULT_RULE_CONFIDENCE
+            tree = ast.parse(condition.strip(), mode='eval')
+            compiled = _compile_bool(tree.body, self.variables)
+        except (SyntaxError, ValueError) as e:
+            raise ValueError(f"Line {number}: {e}") from e
+        if not 0 <= confidence <= 1:
+            raise ValueError(f"Line {number}: confidence must be between 0 and 1")
+
+        return Rule(source=line, condition=compiled, signal=signal_type, confidence=confidence)
+
+    def evaluate(self, env: Env, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Signal values and confidence of the first matching rule per row.
+
+        Args:
+            env: Variable name -> array of length size
+            size: Number of rows
+
+        Returns:
+            (object array of signal values, float array of confidences)
+        """
+        matches = [np.broadcast_to(rule.condition(env), (size,)) for rule in self.rules]
+        signals = np.select(matches, [rule.signal.value for rule in self.rules], default=SignalType.HOLD.value)
+        confidence = np.select(matches, [rule.confidence for rule in self.rules], default=HOLD_CONFIDENCE)
+        return signals.astype(object), confidence
+
+    def confidence(self, env: Env, signals: np.ndarray) -> np.ndarray:
+        """Confidence of the first matching rule that gives each row's (possibly overridden) signal"""
+        size = len(signals)
+        matches = [
+            np.broadcast_to(rule.condition(env), (size,)) & (signals == rule.signal.value)
+            for rule in self.rules
+        ]
+        return np.select(matches, [rule.confidence for rule in self.rules], default=HOLD_CONFIDENCE)
+
+    def windows(self) -> Dict[str, int]:
+        """Trailing bars each variable reads"""
+        windows = {}
+        for name in self.variables:
+            kind, n = _VARIABLE.match(name).groups()
+            windows[name] = 1 if kind is None else int(n) + (kind != 'sma')
+        return windows
+
+
+class RuleAnalyzer(BaseAnalyzer):
+    """Analyzer driven by a compiled rule set"""
+
+    ruleset: Optional[RuleSet] = None
+
+    def __init__(self, rules: Optional[str] = None):
+        super().__init__()
+        if rules is not None:
+            self.ruleset = RuleSet(rules)
+        if self.ruleset is None:
+            raise ValueError("RuleAnalyzer needs rules")
+
+    def indicator_params(self) -> Dict[str, object]:
+        """Rule variables are part of the cache key; the rules themselves are not"""
+        params = self._analyzer_params()
+        params.update(variables=sorted(self.ruleset.variables))
+        return params
+
+    def indicator_window(self) -> Optional[int]:
+        """Longest variable lookback"""
+        return max(self.ruleset.windows().values(), default=1)
+
+    def reported_indicators(self, values: Dict) -> Dict[IndicatorType, float]:
+        """First RSI, fastest and slowest SMA and volume, as the contract's indicator types"""
+        names = sorted(self.ruleset.variables, key=lambda name: (len(name), name))
+        rsi = [name for name in names if name.startswith('rsi_')]
+        sma = sorted((name for name in names if name.startswith('sma_')), key=lambda name: int(name[4:]))
+
+        reported = {}
+        if rsi:
+            reported[IndicatorType.RSI] = values[rsi[0]]
+        if sma:
+            reported[IndicatorType.SMA_20] = values[sma[0]]
+        if len(sma) > 1:
+            reported[IndicatorType.SMA_50] = values[sma[-1]]
+        if 'volume' in values:
+            reported[IndicatorType.VOLUME] = values['volume']
+        return reported
+
+    def calculate_indicators(self, data: pd.DataFrame) -> Dict[str, float]:
+        """Latest value of every rule variable"""
+        close = data['close'].to_numpy(dtype=float)
+        values = {}
+        for name in self.ruleset.variables:
+            kind, n = _VARIABLE.match(name).groups()
+            if name == 'close':
+                values[name] = close[-1]
+            elif name == 'volume':
+                values[name] = float(data['volume'].iloc[-1])
+            elif kind == 'sma':
+                values[name] = latest_mean(close, int(n))
+            elif kind == 'rsi':
+                rsi = latest_rsi(close, int(n))
+                values[name] = rsi if not pd.isna(rsi) else 50.0
+            else:
+                n = int(n)
+                values[name] = (close[-1] - close[-1 - n]) / close[-1 - n] * 100 if len(close) > n else np.nan
+        return {k: float(indicators.round_indicator(v)) for k, v in values.items()}
+
+    def indicator_history(
+        self,
+        data: pd.DataFrame,
+        groups: Optional[pd.Series] = None
+    ) -> Dict[str, pd.Series]:
+        """Every rule variable for every bar"""
+        close = data['close']
+        history = {}
+        for name in self.ruleset.variables:
+            kind, n = _VARIABLE.match(name).groups()
+            if name == 'close':
+                history[name] = close
+            elif name == 'volume':
+                history[name] = data['volume'].astype(float)
+            elif kind == 'sma':
+                history[name] = indicators.rolling_mean(close, int(n), groups)
+            elif kind == 'rsi':
+                history[name] = indicators.rsi(close, int(n), groups).fillna(50.0)
+            else:
+                previous = indicators.shift(close, int(n), groups)
+                history[name] = (close - previous) / previous * 100
+        return history
+
+    def generate_signal_array(self, values: Dict[str, np.ndarray]) -> np.ndarray:
+        """Signal of the first matching rule"""
+        size = len(next(iter(values.values())))
+        return self.ruleset.evaluate(values, size)[0]
+
+    def calculate_confidence_array(self, values: Dict[str, np.ndarray], signals: np.ndarray) -> np.ndarray:
+        """Confidence of the first matching rule for the signal"""
+        return self.ruleset.confidence(values, signals)
+
+    def generate_signal(self, values: Dict[str, float]) -> SignalType:
+        """Single-bar generate_signal_array"""
+        env = {k: np.array([v], dtype=float) for k, v in values.items()}
+        return SignalType(self.generate_signal_array(env)[0])
+
+    def calculate_confidence(self, values: Dict[str, float], signal: SignalType) -> float:
+        """Single-bar calculate_confidence_array"""
+        env = {k: np.array([v], dtype=float) for k, v in values.items()}
+        return float(self.calculate_confidence_array(env, np.array([SignalType(signal).value], dtype=object))[0])
+
+
+def register_rule_analyzer(name: str, rules: str) -> type:
+    """
+    Compile a rule set and register it in AnalyzerFactory.
+
+    Args:
+        name: Analyzer type name for AnalyzerFactory.create
+        rules: Rule set source
+
+    Returns:
+        The registered RuleAnalyzer subclass
+    """
+    ruleset = RuleSet(rules)
+    analyzer_class = type(f"RuleAnalyzer[{name}]", (RuleAnalyzer,), {'ruleset': ruleset})
+    AnalyzerFactory.register(name, analyzer_class)
+    return analyzer_class
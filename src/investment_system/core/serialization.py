@@ -0,0 +1,99 @@
+"""
+Precomputed JSON encoding for contract models.
+
+FastAPI serializes a response_model by validating the returned model a
+second time and walking the result with jsonable_encoder. For a 100-symbol
+SignalResponse this costs more CPU than the signals themselves. encoder_for
+builds one encoder per model class from its fields. Values are converted by
+exact type through a dispatch table filled on first use, with
+jsonable_encoder's conversions: Enum values (also as dict keys), datetime
+isoformat, and Decimal through pydantic's decimal_encoder. dumps uses the
+json.dumps settings of JSONResponse, so the output bytes are unchanged.
+"""
+
+import json
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Dict, Type
+
+from pydantic import BaseModel
+from pydantic.json import ENCODERS_BY_TYPE
+
+Encoder = Callable[[Any], Any]
+
+_PRIMITIVES = (str, int, float, type(None))
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _type_encoder(cls: type) -> Encoder:
+    """Conversion jsonable_encoder applies to values of exactly this type"""
+    if issubclass(cls, BaseModel):
+        return encoder_for(cls)
+    if issubclass(cls, Enum):
+        return lambda value: value.value
+    if issubclass(cls, _PRIMITIVES):
+        return _identity
+    if issubclass(cls, dict):
+        return lambda value: {encode_value(k): encode_value(v) for k, v in value.items()}
+    if issubclass(cls, (list, tuple, set, frozenset)):
+        return lambda value: [encode_value(v) for v in value]
+    for base in cls.__mro__[:-1]:
+        if base in ENCODERS_BY_TYPE:
+            return ENCODERS_BY_TYPE[base]
+    raise TypeError(f"Object of type {cls.__name__} is not JSON serializable")
+
+
+_type_encoders: Dict[type, Encoder] = {}
+
+
+def encode_value(value: Any) -> Any:
+    """JSON-ready form of any value, as jsonable_encoder produces it"""
+    encode = _type_encoders.get(type(value))
+    if encode is None:
+        encode = _type_encoders[type(value)] = _type_encoder(type(value))
+    return encode(value)
+
+
+@lru_cache(maxsize=None)
+def encoder_for(model: Type[BaseModel]) -> Encoder:
+    """
+    Encoder mapping instances of a model to JSON-ready dicts.
+
+    Args:
+        model: Pydantic model class (without custom json_encoders)
+
+    Returns:
+        Function of an instance giving the dict jsonable_encoder would give
+    """
+    if model.__config__.json_encoders:
+        raise ValueError(f"{model.__name__} defines json_encoders; use jsonable_encoder")
+
+    names = list(model.__fields__)
+
+    def encode(instance: BaseModel) -> dict:
+        values = instance.__dict__
+        return {name: encode_value(values[name]) for name in names}
+
+    return encode
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize like fastapi.responses.JSONResponse.
+
+    Args:
+        content: Model instance or any value jsonable_encoder accepts
+
+    Returns:
+        UTF-8 JSON bytes
+    """
+    return json.dumps(
+        encode_value(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
@@ -4,8 +4,9 @@ import logging
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
+import pandas as pd
 from sqlalchemy import (
     create_engine,
     Column,
@@ -14,13 +15,18 @@ from sqlalchemy import (
     DateTime,
     Integer,
     Boolean,
+    LargeBinary,
+    Index,
     text,
-    UniqueConstraint
+    UniqueConstraint,
+    func
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from tenacity import retry, stop_after_attempt, wait_fixed
 
+from investment_system.core.cardinality import HyperLogLog
+
 logger = logging.getLogger(__name__)
 
 # Ensure runtime directory exists
@@ -67,6 +73,36 @@ class Signal(Base):
     __table_args__ = (UniqueConstraint('symbol', 'ts', name='_symbol_ts_signal_uc'),)
 
 
+class UsageEvent(Base):
+    """Metered API request model."""
+    __tablename__ = 'usage_events'
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    endpoint = Column(String, nullable=False)
+    method = Column(String, nullable=False)
+    units = Column(Integer, nullable=False, default=1)
+    symbols = Column(String, nullable=False, default="")  # Comma-separated
+    signals = Column(Integer, nullable=False, default=0)
+    data_points = Column(Integer, nullable=False, default=0)
+    status_code = Column(Integer, nullable=False)
+    response_time_ms = Column(Integer)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (Index('ix_usage_user_created', 'user_id', 'created_at'),)
+
+
+class UsageSketch(Base):
+    """Distinct symbols queried by a user in a billing period (HyperLogLog)."""
+    __tablename__ = 'usage_sketches'
+    
+    user_id = Column(String, primary_key=True)
+    period_start = Column(DateTime, primary_key=True)
+    period_end = Column(DateTime, nullable=False)
+    sketch = Column(LargeBinary, nullable=False)  # HyperLogLog.to_bytes()
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class StoreManager:
     """Database store manager with connection pooling and resilience."""
     
@@ -261,6 +297,173 @@ class StoreManager:
         return count
 
 
+    def get_prices(
+        self,
+        symbols: Optional[List[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """
+        Load price data from database.
+        
+        Args:
+            symbols: Symbols to load (default: all)
+            start: First timestamp to include
+            end: Last timestamp to include
+        
+        Returns:
+            DataFrame with columns: date, open, high, low, close, volume, symbol
+        """
+        columns = ['symbol', 'date', 'open', 'high', 'low', 'close', 'volume']
+        
+        with self.get_session() as session:
+            try:
+                query = session.query(
+                    Price.symbol, Price.ts, Price.open, Price.high,
+                    Price.low, Price.close, Price.volume
+                )
+                if symbols:
+                    query = query.filter(Price.symbol.in_(symbols))
+                if start is not None:
+                    query = query.filter(Price.ts >= start)
+                if end is not None:
+                    query = query.filter(Price.ts <= end)
+                
+                rows = query.order_by(Price.symbol, Price.ts).all()
+                logger.info(f"Retrieved {len(rows)} price records")
+                
+            except Exception as e:
+                logger.error(f"Failed to get prices: {e}")
+                raise
+        
+        return pd.DataFrame(rows, columns=columns)[
+            ['date', 'open', 'high', 'low', 'close', 'volume', 'symbol']
+        ]
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_fixed(0.5))
+    def insert_usage_events(self, events: List[Dict[str, Any]]) -> int:
+        """
+        Append usage events in one bulk insert.
+        
+        Args:
+            events: List of usage event dictionaries (UsageEvent columns)
+        
+        Returns:
+            Number of events inserted
+        """
+        if not events:
+            return 0
+        
+        with self.get_session() as session:
+            try:
+                session.execute(UsageEvent.__table__.insert(), events)
+                session.commit()
+                logger.debug(f"Inserted {len(events)} usage events")
+                
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Failed to insert usage events: {e}")
+                raise
+        
+        return len(events)
+    
+    def get_usage_totals(self, user_id: str, start: datetime, end: datetime) -> Dict[str, Any]:
+        """
+        Aggregate a user's usage events in a period.
+        
+        Args:
+            user_id: User to aggregate
+            start: First timestamp to include
+            end: Timestamp to stop before
+        
+        Returns:
+            Dictionary with api_calls, unique_symbols (over the billing
+            periods overlapping the range), signals_generated and
+            data_points_fetched
+        """
+        with self.get_session() as session:
+            try:
+                in_period = (
+                    UsageEvent.user_id == user_id,
+                    UsageEvent.created_at >= start,
+                    UsageEvent.created_at < end
+                )
+                api_calls, signals, data_points = session.query(
+                    func.count(UsageEvent.id),
+                    func.coalesce(func.sum(UsageEvent.signals), 0),
+                    func.coalesce(func.sum(UsageEvent.data_points), 0)
+                ).filter(*in_period).one()
+                
+                sketches = session.query(UsageSketch.sketch).filter(
+                    UsageSketch.user_id == user_id,
+                    UsageSketch.period_start < end,
+                    UsageSketch.period_end > start
+                ).all()
+                
+            except Exception as e:
+                logger.error(f"Failed to aggregate usage: {e}")
+                raise
+        
+        symbols = HyperLogLog()
+        for (sketch,) in sketches:
+            symbols.merge(HyperLogLog.from_bytes(sketch))
+        
+        return {
+            'api_calls': api_calls,
+            'unique_symbols': symbols.count(),
+            'signals_generated': signals,
+            'data_points_fetched': data_points
+        }
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_fixed(0.5))
+    def merge_usage_sketches(
+        self,
+        sketches: Dict[Tuple[str, datetime, datetime], HyperLogLog]
+    ) -> Dict[Tuple[str, datetime, datetime], HyperLogLog]:
+        """
+        Merge distinct-symbol sketches into the stored ones.
+        
+        Merging is idempotent, so sketches may be merged repeatedly.
+        
+        Args:
+            sketches: Sketch per (user_id, period_start, period_end)
+        
+        Returns:
+            Stored sketch per key after the merge
+        """
+        merged = {}
+        
+        with self.get_session() as session:
+            try:
+                for (user_id, period_start, period_end), sketch in sketches.items():
+                    row = session.query(UsageSketch).filter(
+                        UsageSketch.user_id == user_id,
+                        UsageSketch.period_start == period_start
+                    ).with_for_update().first()
+                    
+                    total = sketch.copy()
+                    if row:
+                        total.merge(HyperLogLog.from_bytes(row.sketch))
+                        row.sketch = total.to_bytes()
+                    else:
+                        session.add(UsageSketch(
+                            user_id=user_id,
+                            period_start=period_start,
+                            period_end=period_end,
+                            sketch=total.to_bytes()
+                        ))
+                    merged[(user_id, period_start, period_end)] = total
+                
+                session.commit()
+                
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Failed to merge usage sketches: {e}")
+                raise
+        
+        return merged
+
+
 # Global instance
 _store: Optional[StoreManager] = None
 
@@ -5,11 +5,15 @@ Modular design allows switching cache backends without changing business logic.
 
 import json
 import pickle
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, Iterable, List
 from abc import ABC, abstractmethod
 import hashlib
 
+import numpy as np
+
 try:
     import redis
     REDIS_AVAILABLE = True
@@ -44,61 +48,131 @@ class CacheBackend(ABC):
     def clear(self) -> bool:
         """Clear all cache"""
         pass
+    
+    def add(self, key: str, value: Any, ttl: int) -> bool:
+        """
+        Set a value only if the key does not exist; True if it was set.
+        
+        This default checks, then sets: it is not atomic. Backends used for
+        locks between threads or processes override it atomically.
+        """
+        if self.exists(key):
+            return False
+        return self.set(key, value, ttl)
+    
+    def compare_and_delete(self, key: str, value: Any) -> bool:
+        """
+        Delete a key only if it holds value (e.g. a lock's owner token); True if deleted.
+        
+        This default reads, then deletes: it is not atomic. Backends used for
+        locks between threads or processes override it atomically.
+        """
+        if self.get(key) != value:
+            return False
+        return self.delete(key)
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get the cached values of several keys (missing keys are left out)"""
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+    
+    def set_many(self, items: Dict[str, Any], ttl: int) -> bool:
+        """Set several values with the same TTL"""
+        return all([self.set(key, value, ttl) for key, value in items.items()])
 
 
 class MemoryCacheBackend(CacheBackend):
     """In-memory cache backend for development"""
     
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
+    MAX_ENTRIES = 100_000
+    SWEEP_INTERVAL = 60  # Seconds between scans for expired entries when full
+    
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        # Least recently used first: content-addressed keys (e.g. indicators
+        # for an older bar) are never read again and must not pile up
+        self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self.max_entries = max_entries
+        self._next_sweep = datetime.utcnow()
+        # Used from the event loop's to_thread calls and the analysis workers at once
+        self._lock = threading.Lock()
+    
+    def _live_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Unexpired entry of a key, dropping it if expired (call with the lock held)"""
+        entry = self._cache.get(key)
+        if entry is not None and entry['expires_at'] and datetime.utcnow() > entry['expires_at']:
+            self._cache.pop(key, None)
+            return None
+        return entry
+    
+    def _store(self, key: str, value: Any, ttl: int):
+        """Insert an entry, making room if full (call with the lock held)"""
+        now = datetime.utcnow()
+        self._cache[key] = {
+            'value': value,
+            'expires_at': now + timedelta(seconds=ttl) if ttl > 0 else None,
+            'created_at': now
+        }
+        self._cache.move_to_end(key)
+        if len(self._cache) <= self.max_entries:
+            return
+        if now >= self._next_sweep:
+            expired = [k for k, entry in self._cache.items() if entry['expires_at'] and now > entry['expires_at']]
+            for k in expired:
+                del self._cache[k]
+            self._next_sweep = now + timedelta(seconds=self.SWEEP_INTERVAL)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from memory cache"""
-        if key not in self._cache:
-            return None
-        
-        entry = self._cache[key]
-        if entry['expires_at'] and datetime.utcnow() > entry['expires_at']:
-            del self._cache[key]
-            return None
-        
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                return None
+            self._cache.move_to_end(key)
         return entry['value']
     
     def set(self, key: str, value: Any, ttl: int) -> bool:
         """Set value in memory cache"""
-        expires_at = None
-        if ttl > 0:
-            expires_at = datetime.utcnow() + timedelta(seconds=ttl)
-        
-        self._cache[key] = {
-            'value': value,
-            'expires_at': expires_at,
-            'created_at': datetime.utcnow()
-        }
+        with self._lock:
+            self._store(key, value, ttl)
+        return True
+    
+    def add(self, key: str, value: Any, ttl: int) -> bool:
+        """Set a value only if the key does not exist (atomic within the process)"""
+        with self._lock:
+            if self._live_entry(key) is not None:
+                return False
+            self._store(key, value, ttl)
+        return True
+    
+    def compare_and_delete(self, key: str, value: Any) -> bool:
+        """Delete a key only if it holds value (atomic within the process)"""
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None or entry['value'] != value:
+                return False
+            self._cache.pop(key, None)
         return True
     
     def delete(self, key: str) -> bool:
         """Delete from memory cache"""
-        if key in self._cache:
-            del self._cache[key]
-            return True
-        return False
+        with self._lock:
+            return self._cache.pop(key, None) is not None
     
     def exists(self, key: str) -> bool:
         """Check if key exists in memory"""
-        if key not in self._cache:
-            return False
-        
-        entry = self._cache[key]
-        if entry['expires_at'] and datetime.utcnow() > entry['expires_at']:
-            del self._cache[key]
-            return False
-        
-        return True
+        with self._lock:
+            return self._live_entry(key) is not None
     
     def clear(self) -> bool:
         """Clear memory cache"""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
         return True
 
 
@@ -142,6 +216,57 @@ class RedisCacheBackend(CacheBackend):
             print(f"Redis set error: {e}")
             return False
     
+    def add(self, key: str, value: Any, ttl: int) -> bool:
+        """Set a value only if the key does not exist (atomic SET NX)"""
+        try:
+            return bool(self.client.set(key, pickle.dumps(value), nx=True, ex=ttl if ttl > 0 else None))
+        except Exception as e:
+            print(f"Redis add error: {e}")
+            return False
+    
+    # Deletes KEYS[1] only while it holds ARGV[1], in one atomic step
+    _COMPARE_AND_DELETE = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+    
+    def compare_and_delete(self, key: str, value: Any) -> bool:
+        """Delete a key only if it holds value (atomic Lua script)"""
+        try:
+            return bool(self.client.eval(self._COMPARE_AND_DELETE, 1, key, pickle.dumps(value)))
+        except Exception as e:
+            print(f"Redis compare-and-delete error: {e}")
+            return False
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values from Redis in one round trip"""
+        if not keys:
+            return {}
+        try:
+            return {
+                key: pickle.loads(value)
+                for key, value in zip(keys, self.client.mget(keys)) if value
+            }
+        except Exception as e:
+            print(f"Redis mget error: {e}")
+            return {}
+    
+    def set_many(self, items: Dict[str, Any], ttl: int) -> bool:
+        """Set several values in Redis in one pipelined round trip"""
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for key, value in items.items():
+                if ttl > 0:
+                    pipeline.setex(key, ttl, pickle.dumps(value))
+                else:
+                    pipeline.set(key, pickle.dumps(value))
+            return all(pipeline.execute())
+        except Exception as e:
+            print(f"Redis set error: {e}")
+            return False
+    
     def delete(self, key: str) -> bool:
         """Delete from Redis"""
         try:
@@ -178,6 +303,7 @@ class CacheManager:
         'user_data': 3600,       # 1 hour
         'api_response': 60,      # 1 minute
         'analysis': 900,         # 15 minutes
+        'indicators': 3600,      # 1 hour (keys are content-addressed)
     }
     
     def __init__(self, backend: Optional[CacheBackend] = None):
@@ -188,6 +314,7 @@ class CacheManager:
             'sets': 0,
             'deletes': 0
         }
+        self._stats_lock = threading.Lock()
     
     @classmethod
     def create_from_url(cls, cache_url: Optional[str] = None) -> 'CacheManager':
@@ -218,9 +345,9 @@ class CacheManager:
         """Get value from cache"""
         value = self.backend.get(key)
         if value is not None:
-            self._stats['hits'] += 1
+            self._count('hits')
         else:
-            self._stats['misses'] += 1
+            self._count('misses')
         return value
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None, data_type: Optional[str] = None) -> bool:
@@ -232,14 +359,48 @@ class CacheManager:
         
         result = self.backend.set(key, value, ttl)
         if result:
-            self._stats['sets'] += 1
+            self._count('sets')
+        return result
+    
+    def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Set a value only if the key does not exist (e.g. a lock); True if it was set"""
+        result = self.backend.add(key, value, 300 if ttl is None else ttl)
+        if result:
+            self._count('sets')
+        return result
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values from cache (missing keys are left out)"""
+        keys = list(keys)
+        values = self.backend.get_many(keys)
+        self._count('hits', len(values))
+        self._count('misses', len(keys) - len(values))
+        return values
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None, data_type: Optional[str] = None) -> bool:
+        """Set several values with the same TTL"""
+        if not items:
+            return True
+        if ttl is None:
+            ttl = self.DEFAULT_TTLS.get(data_type, 300) if data_type else 300
+        
+        result = self.backend.set_many(items, ttl)
+        if result:
+            self._count('sets', len(items))
         return result
     
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
         result = self.backend.delete(key)
         if result:
-            self._stats['deletes'] += 1
+            self._count('deletes')
+        return result
+    
+    def compare_and_delete(self, key: str, value: Any) -> bool:
+        """Delete key only if it holds value (e.g. a lock's owner token); True if deleted"""
+        result = self.backend.compare_and_delete(key, value)
+        if result:
+            self._count('deletes')
         return result
     
     def exists(self, key: str) -> bool:
@@ -250,13 +411,20 @@ class CacheManager:
         """Clear all cache"""
         return self.backend.clear()
     
+    def _count(self, stat: str, n: int = 1):
+        """Increment a statistic (the manager is shared by threads)"""
+        with self._stats_lock:
+            self._stats[stat] += n
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        total_requests = self._stats['hits'] + self._stats['misses']
-        hit_rate = self._stats['hits'] / total_requests if total_requests > 0 else 0
+        with self._stats_lock:
+            stats = dict(self._stats)
+        total_requests = stats['hits'] + stats['misses']
+        hit_rate = stats['hits'] / total_requests if total_requests > 0 else 0
         
         return {
-            **self._stats,
+            **stats,
             'hit_rate': round(hit_rate, 4),
             'backend': self.backend.__class__.__name__
         }
@@ -285,6 +453,47 @@ class CacheManager:
         key = self._make_key("signals", symbols_hash, user_tier)
         return self.set(key, signals, data_type='signals')
     
+    def _symbol_signal_key(self, symbol: str, analyzer: str, lookback_days: int) -> str:
+        return self._make_key("signal", analyzer, lookback_days, symbol)
+    
+    def get_symbol_signals(self, symbols: list, analyzer: str, lookback_days: int) -> Dict[str, Any]:
+        """Get cached per-symbol signal entries, by symbol (symbols not cached are left out)"""
+        keys = {self._symbol_signal_key(symbol, analyzer, lookback_days): symbol for symbol in symbols}
+        return {keys[key]: value for key, value in self.get_many(keys).items()}
+    
+    def set_symbol_signals(self, entries: Dict[str, Any], analyzer: str, lookback_days: int) -> bool:
+        """Cache per-symbol signal entries given by symbol"""
+        items = {
+            self._symbol_signal_key(symbol, analyzer, lookback_days): entry
+            for symbol, entry in entries.items()
+        }
+        return self.set_many(items, data_type='signals')
+    
+    def _indicator_key(self, symbol: str, last_bar: Any, checksum: str, params: Dict[str, Any]) -> str:
+        """Content-addressed key for indicator results"""
+        params_hash = hashlib.md5(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()[:12]
+        return self._make_key("indicators", symbol, last_bar, checksum, params_hash)
+    
+    def get_indicators(self, symbol: str, last_bar: Any, checksum: str, params: Dict[str, Any]) -> Optional[Any]:
+        """Get cached indicator results for identical input data and parameters"""
+        return self.get(self._indicator_key(symbol, last_bar, checksum, params))
+    
+    def set_indicators(self, symbol: str, last_bar: Any, checksum: str, params: Dict[str, Any], indicators: Any) -> bool:
+        """Cache indicator results"""
+        key = self._indicator_key(symbol, last_bar, checksum, params)
+        return self.set(key, indicators, data_type='indicators')
+    
+    def get_symbol_metrics(self, symbol: str, last_bar: Any, checksum: str) -> Optional[Any]:
+        """Get cached per-symbol analysis metrics for identical price history"""
+        return self.get(self._make_key("symbol_metrics", symbol, last_bar, checksum))
+    
+    def set_symbol_metrics(self, symbol: str, last_bar: Any, checksum: str, metrics: Any) -> bool:
+        """Cache per-symbol analysis metrics"""
+        key = self._make_key("symbol_metrics", symbol, last_bar, checksum)
+        return self.set(key, metrics, data_type='analysis')
+    
     def get_user(self, user_id: str) -> Optional[Any]:
         """Get cached user data"""
         key = self._make_key("user", user_id)
@@ -301,6 +510,16 @@ class CacheManager:
         return self.delete(key)
 
 
+def data_checksum(*arrays) -> str:
+    """Checksum of the raw bytes of one or more arrays (for cache keys)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(array.dtype.str.encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
 # Global cache instance (created on first use)
 _cache_instance: Optional[CacheManager] = None
 
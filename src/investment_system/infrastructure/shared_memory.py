@@ -0,0 +1,89 @@
+"""
+Shared memory helpers for handing NumPy arrays to worker processes.
+Arrays are packed into a single segment and attached by name in the workers,
+so large price panels never go through pickle.
+"""
+
+from multiprocessing import shared_memory
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+# Alignment of each array inside the segment (bytes)
+_ALIGNMENT = 64
+
+
+class SharedArrays:
+    """A set of named NumPy arrays backed by one shared memory segment.
+
+    The owner creates the segment with ``SharedArrays.create`` and must call
+    ``unlink`` when done. Workers receive ``spec`` (a small picklable dict)
+    and call ``SharedArrays.attach`` to get read-only views.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: Dict[str, Tuple[int, tuple, str]], owner: bool):
+        self._shm = shm
+        self._layout = layout
+        self._owner = owner
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, (offset, shape, dtype) in layout.items():
+            view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            if not owner:
+                view.flags.writeable = False
+            self.arrays[name] = view
+
+    @classmethod
+    def create(cls, arrays: Dict[str, np.ndarray]) -> 'SharedArrays':
+        """Copy arrays into a new shared memory segment"""
+        layout = {}
+        size = 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            size = -(-size // _ALIGNMENT) * _ALIGNMENT
+            layout[name] = (size, array.shape, array.dtype.str)
+            size += array.nbytes
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        shared = cls(shm, layout, owner=True)
+        for name, array in arrays.items():
+            shared.arrays[name][...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> 'SharedArrays':
+        """Attach to a segment created by another process"""
+        try:
+            shm = shared_memory.SharedMemory(name=spec['name'], track=False)
+        except TypeError:
+            # Python < 3.13 has no track flag; pool workers share the owner's
+            # resource tracker, so the segment is still unlinked exactly once
+            shm = shared_memory.SharedMemory(name=spec['name'])
+        return cls(shm, spec['layout'], owner=False)
+
+    @property
+    def spec(self) -> Dict[str, Any]:
+        """Picklable description used by workers to attach"""
+        return {'name': self._shm.name, 'layout': self._layout}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def close(self):
+        """Release this process's mapping"""
+        self.arrays = {}
+        self._shm.close()
+
+    def unlink(self):
+        """Close and destroy the segment (owner only)"""
+        self.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> 'SharedArrays':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._owner:
+            self.unlink()
+        else:
+            self.close()
@@ -0,0 +1,133 @@
+"""
+Request coalescing: one computation per key at a time.
+
+Concurrent callers with the same key share the first caller's (the
+leader's) result instead of repeating its work. Within a process the work
+runs as a task all callers await, so cancelling any caller (the leader
+included) leaves it running for the others. Across processes the leader also holds a lock key
+in the shared cache (set-if-absent with a TTL); a leader elsewhere that
+finds the lock taken polls for the result the lock holder stores in the
+cache, and only computes itself if none appears by the time the lock is
+released or expires. A lock holder whose result is not stored where the
+others look (e.g. no data for a symbol) puts the result itself in the cache
+for RESULT_TTL seconds, so the others return it instead of computing again.
+"""
+
+import asyncio
+import functools
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from investment_system.infrastructure.cache import CacheManager
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+LOCK_TTL = 30  # Seconds a cross-process lock is held at most (bounds a crashed leader)
+POLL_INTERVAL = 0.05  # Seconds between checks for another process's result
+RESULT_TTL = 5  # Seconds a result load() does not find is handed to other processes
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution"""
+
+    def __init__(
+        self,
+        cache: Optional[CacheManager] = None,
+        lock_ttl: int = LOCK_TTL,
+        poll_interval: float = POLL_INTERVAL
+    ):
+        """
+        Args:
+            cache: Shared cache for coalescing across processes (None: within this process only)
+            lock_ttl: Seconds a cross-process lock is held at most
+            poll_interval: Seconds between checks for another process's result
+        """
+        self.cache = cache
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+        self.stats = {'leaders': 0, 'followers': 0, 'remote_hits': 0}
+
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        load: Optional[Callable[[], Optional[T]]] = None
+    ) -> T:
+        """
+        Result of compute(), shared with concurrent calls for the same key.
+
+        Args:
+            key: Normalized identity of the computation
+            compute: Coroutine function doing the work (its result must be
+                stored where load finds it for cross-process coalescing)
+            load: Synchronous lookup of another process's stored result (None
+                if not there yet); without it coalescing is in-process only
+
+        Returns:
+            The leader's result (exceptions are shared the same way)
+        """
+        loop = asyncio.get_running_loop()
+        flight = (loop, key)
+        task = self._inflight.get(flight)
+        if task is None:
+            # The computation is a task of its own: a caller cancelled while
+            # waiting (e.g. a dropped client) does not cancel it for the others
+            task = self._inflight[flight] = loop.create_task(self._lead(key, compute, load))
+            task.add_done_callback(functools.partial(self._finish, flight))
+        else:
+            self.stats['followers'] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, flight: Tuple[asyncio.AbstractEventLoop, str], task: asyncio.Task):
+        del self._inflight[flight]
+        if not task.cancelled():
+            task.exception()  # Retrieved: no warning when every caller was cancelled
+
+    async def _lead(self, key: str, compute: Callable[[], Awaitable[T]], load: Optional[Callable[[], Optional[T]]]) -> T:
+        if self.cache is None or load is None:
+            self.stats['leaders'] += 1
+            return await compute()
+
+        lock_key = self.cache._make_key("singleflight", key)
+        result_key = self.cache._make_key("singleflight-result", key)
+        token = uuid.uuid4().hex
+        locked = await asyncio.to_thread(self.cache.add, lock_key, token, self.lock_ttl)
+        if not locked:
+            result = await self._wait_for_remote(lock_key, functools.partial(self._load_remote, result_key, load))
+            if result is not None:
+                self.stats['remote_hits'] += 1
+                return result
+            logger.info("No result from the lock holder of %s; computing it here", key)
+
+        self.stats['leaders'] += 1
+        try:
+            result = await compute()
+            if locked and await asyncio.to_thread(load) is None:
+                # Waiters elsewhere would not find it and compute again
+                await asyncio.to_thread(self.cache.set, result_key, result, RESULT_TTL)
+            return result
+        finally:
+            if locked:
+                # Only our own lock: after LOCK_TTL it may be another worker's
+                await asyncio.to_thread(self.cache.compare_and_delete, lock_key, token)
+
+    def _load_remote(self, result_key: str, load: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """Another process's result, as stored by its computation or handed over by its leader"""
+        result = load()
+        return result if result is not None else self.cache.get(result_key)
+
+    async def _wait_for_remote(self, lock_key: str, load: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """Poll for another process's result while it holds the lock"""
+        deadline = asyncio.get_running_loop().time() + self.lock_ttl
+        while True:
+            result = await asyncio.to_thread(load)
+            if result is not None:
+                return result
+            if asyncio.get_running_loop().time() > deadline or not await asyncio.to_thread(self.cache.exists, lock_key):
+                # Lock released (or expired): the result is stored by now if it ever will be
+                return await asyncio.to_thread(load)
+            await asyncio.sleep(self.poll_interval)
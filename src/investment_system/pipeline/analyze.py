@@ -1,24 +1,37 @@
 """Technical analysis module for generating trading signals."""
 
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 import pandas as pd
 import numpy as np
 
+from investment_system.core import indicators
+from investment_system.infrastructure.cache import get_cache, data_checksum
+
 logger = logging.getLogger(__name__)
 
+# Parameters of the indicators computed by add_indicators (part of the cache key)
+INDICATOR_PARAMS = {'sma_windows': [20, 50], 'rsi_window': 14, 'min_periods': 1}
+
+
+INDICATOR_COLUMNS = ['sma_20', 'sma_50', 'rsi_14']
+
+# Default RSI thresholds used by the signal rules
+RSI_OVERSOLD = 30
+RSI_OVERBOUGHT = 70
+
 
-def calculate_sma(series: pd.Series, window: int) -> pd.Series:
-    """Calculate Simple Moving Average."""
-    return series.rolling(window=window, min_periods=1).mean()
+def calculate_sma(series: pd.Series, window: int, groups: Optional[pd.Series] = None) -> pd.Series:
+    """Calculate Simple Moving Average (per group when groups is given)."""
+    return indicators.rolling_mean(series, window, groups, min_periods=1)
 
 
-def calculate_rsi(series: pd.Series, window: int = 14) -> pd.Series:
-    """Calculate Relative Strength Index."""
-    delta = series.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window, min_periods=1).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window, min_periods=1).mean()
+def calculate_rsi(series: pd.Series, window: int = 14, groups: Optional[pd.Series] = None) -> pd.Series:
+    """Calculate Relative Strength Index (per group when groups is given)."""
+    delta = indicators.diff(series, groups)
+    gain = calculate_sma(delta.where(delta > 0, 0), window, groups)
+    loss = calculate_sma(-delta.where(delta < 0, 0), window, groups)
     
     # Avoid division by zero
     rs = gain / loss.replace(0, 1e-10)
@@ -27,34 +40,86 @@ def calculate_rsi(series: pd.Series, window: int = 14) -> pd.Series:
     return rsi
 
 
-def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+def order_by_symbol_date(df: pd.DataFrame) -> pd.DataFrame:
+    """Sort rows by date within each symbol, keeping symbols in order of first appearance."""
+    codes, _ = pd.factorize(df['symbol'])
+    dates = pd.to_datetime(df['date']).values
+    return df.iloc[np.lexsort((dates, codes))]
+
+
+def _compute_indicators(ordered: pd.DataFrame) -> pd.DataFrame:
+    """Indicator columns for a frame ordered by symbol and date (vectorized across symbols)."""
+    close = ordered['close']
+    groups = ordered['symbol']
+    return pd.DataFrame({
+        'sma_20': calculate_sma(close, 20, groups),
+        'sma_50': calculate_sma(close, 50, groups),
+        'rsi_14': calculate_rsi(close, 14, groups),
+    }, index=ordered.index)
+
+
+def _cached_indicators(ordered: pd.DataFrame) -> np.ndarray:
+    """Indicator values for an ordered frame, computing only symbols missing from the cache"""
+    cache = get_cache()
+    close = ordered['close'].to_numpy()
+    dates = ordered['date'].to_numpy()
+    values = np.full((len(ordered), len(INDICATOR_COLUMNS)), np.nan)
+    
+    missing = []
+    for symbol, positions in ordered.groupby('symbol', sort=False).indices.items():
+        last_bar = dates[positions[-1]]
+        checksum = data_checksum(close[positions])
+        cached = cache.get_indicators(symbol, last_bar, checksum, INDICATOR_PARAMS)
+        if cached is not None:
+            values[positions] = np.column_stack([cached[col] for col in INDICATOR_COLUMNS])
+        else:
+            missing.append((symbol, positions, last_bar, checksum))
+    
+    if missing:
+        rows = np.concatenate([positions for _, positions, _, _ in missing])
+        values[rows] = _compute_indicators(ordered.iloc[rows]).to_numpy()
+        for symbol, positions, last_bar, checksum in missing:
+            symbol_values = {col: values[positions, i] for i, col in enumerate(INDICATOR_COLUMNS)}
+            cache.set_indicators(symbol, last_bar, checksum, INDICATOR_PARAMS, symbol_values)
+    
+    return values
+
+
+def add_indicators(df: pd.DataFrame, use_cache: bool = True) -> pd.DataFrame:
     """
     Add technical indicators to price data.
     
     Args:
         df: DataFrame with price data
+        use_cache: Reuse cached indicators for identical symbol histories
     
     Returns:
         DataFrame with added indicators: SMA_20, SMA_50, RSI_14
     """
-    result = df.copy()
+    result = df.reset_index(drop=True)
+    if result.empty:
+        return result.assign(**{col: np.nan for col in INDICATOR_COLUMNS})
     
-    # Group by symbol for indicator calculation
-    for symbol in result['symbol'].unique():
-        mask = result['symbol'] == symbol
-        symbol_data = result[mask].sort_values('date')
-        
-        # Calculate indicators
-        result.loc[mask, 'sma_20'] = calculate_sma(symbol_data['close'], 20).values
-        result.loc[mask, 'sma_50'] = calculate_sma(symbol_data['close'], 50).values
-        result.loc[mask, 'rsi_14'] = calculate_rsi(symbol_data['close'], 14).values
+    # All symbols are computed in one pass over the symbol/date ordered frame
+    ordered = order_by_symbol_date(result)
+    if use_cache:
+        values = _cached_indicators(ordered)
+    else:
+        values = _compute_indicators(ordered).to_numpy()
+    
+    computed = pd.DataFrame(values, columns=INDICATOR_COLUMNS, index=ordered.index)
+    result[INDICATOR_COLUMNS] = computed.reindex(result.index)
     
-    logger.info(f"Added indicators for {len(result['symbol'].unique())} symbols")
+    logger.info(f"Added indicators for {result['symbol'].nunique()} symbols")
     
     return result
 
 
-def generate_signal_for_row(row: pd.Series) -> str:
+def generate_signal_for_row(
+    row: pd.Series,
+    rsi_oversold: float = RSI_OVERSOLD,
+    rsi_overbought: float = RSI_OVERBOUGHT
+) -> str:
     """Generate signal for a single row based on indicators."""
     # Skip if indicators not available
     if pd.isna(row['sma_20']) or pd.isna(row['sma_50']) or pd.isna(row['rsi_14']):
@@ -68,16 +133,16 @@ def generate_signal_for_row(row: pd.Series) -> str:
     
     # Generate signal
     if sma_diff > 0:  # SMA20 above SMA50 (bullish)
-        if rsi < 30:  # Oversold
+        if rsi < rsi_oversold:  # Oversold
             return 'buy'
-        elif rsi > 70:  # Overbought but trending up
+        elif rsi > rsi_overbought:  # Overbought but trending up
             return 'hold'
         else:
             return 'buy'
     elif sma_diff < 0:  # SMA20 below SMA50 (bearish)
-        if rsi > 70:  # Overbought
+        if rsi > rsi_overbought:  # Overbought
             return 'sell'
-        elif rsi < 30:  # Oversold but trending down
+        elif rsi < rsi_oversold:  # Oversold but trending down
             return 'hold'
         else:
             return 'sell'
@@ -85,6 +150,61 @@ def generate_signal_for_row(row: pd.Series) -> str:
         return 'hold'
 
 
+def classify_signals(
+    sma_20: np.ndarray,
+    sma_50: np.ndarray,
+    rsi: np.ndarray,
+    rsi_oversold: float = RSI_OVERSOLD,
+    rsi_overbought: float = RSI_OVERBOUGHT
+) -> np.ndarray:
+    """Vectorized generate_signal_for_row over indicator arrays."""
+    sma_20 = np.asarray(sma_20, dtype=float)
+    sma_50 = np.asarray(sma_50, dtype=float)
+    rsi = np.asarray(rsi, dtype=float)
+    
+    missing = np.isnan(sma_20) | np.isnan(sma_50) | np.isnan(rsi)
+    bullish = sma_20 > sma_50
+    bearish = sma_20 < sma_50
+    
+    conditions = [
+        missing,
+        bullish & (rsi > rsi_overbought),  # Overbought but trending up
+        bullish,
+        bearish & (rsi < rsi_oversold),  # Oversold but trending down
+        bearish,
+    ]
+    choices = ['hold', 'hold', 'buy', 'hold', 'sell']
+    return np.select(conditions, choices, default='hold').astype(object)
+
+
+def generate_signal_history(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Generate signals for every bar in the history (vectorized).
+    
+    Args:
+        df: DataFrame with price data, with or without indicators
+    
+    Returns:
+        Columnar DataFrame ordered by symbol and date with columns:
+        symbol, date, close, sma_20, sma_50, rsi_14, signal, is_stale
+    """
+    if 'sma_20' not in df.columns:
+        df = add_indicators(df)
+    
+    history = order_by_symbol_date(df).dropna(subset=INDICATOR_COLUMNS)
+    
+    return pd.DataFrame({
+        'symbol': history['symbol'].to_numpy(),
+        'date': history['date'].to_numpy(),
+        'close': history['close'].to_numpy(),
+        'sma_20': history['sma_20'].to_numpy(),
+        'sma_50': history['sma_50'].to_numpy(),
+        'rsi_14': history['rsi_14'].to_numpy(),
+        'signal': classify_signals(history['sma_20'], history['sma_50'], history['rsi_14']),
+        'is_stale': history['is_stale'].to_numpy() if 'is_stale' in history.columns else False,
+    })
+
+
 def generate_signals(df: pd.DataFrame) -> List[Dict[str, Any]]:
     """
     Generate trading signals from price data with indicators.
@@ -100,40 +220,40 @@ def generate_signals(df: pd.DataFrame) -> List[Dict[str, Any]]:
     if 'sma_20' not in df.columns:
         df = add_indicators(df)
     
-    signals = []
-    
-    # Group by symbol and get latest data points
-    for symbol in df['symbol'].unique():
-        symbol_data = df[df['symbol'] == symbol].sort_values('date')
-        
-        # Skip warmup period (need at least 50 rows for SMA50)
-        if len(symbol_data) < 50:
-            logger.warning(f"Insufficient data for {symbol}, using available data")
-        
-        # Drop rows with NaN in indicators (warmup period)
-        clean_data = symbol_data.dropna(subset=['sma_20', 'sma_50', 'rsi_14'])
-        
-        if clean_data.empty:
-            logger.warning(f"No valid signals for {symbol} after warmup")
-            continue
-        
-        # Generate signals for recent data (last 5 days or available)
-        recent_data = clean_data.tail(5)
-        
-        for _, row in recent_data.iterrows():
-            signal = generate_signal_for_row(row)
-            
-            signals.append({
-                'symbol': symbol,
-                'ts': pd.Timestamp(row['date']).isoformat(),
-                'signal': signal,
-                'rsi': round(row['rsi_14'], 2),
-                'sma20': round(row['sma_20'], 2),
-                'sma50': round(row['sma_50'], 2),
-                'close': round(row['close'], 2),
-                'is_stale': row.get('is_stale', False)
-            })
-    
-    logger.info(f"Generated {len(signals)} signals for {len(df['symbol'].unique())} symbols")
-    
-    return signals
\ No newline at end of file
+    if df.empty:
+        logger.info("Generated 0 signals for 0 symbols")
+        return []
+    
+    # Skip warmup period (need at least 50 rows for SMA50)
+    row_counts = df['symbol'].value_counts(sort=False)
+    for symbol in row_counts.index[row_counts < 50]:
+        logger.warning(f"Insufficient data for {symbol}, using available data")
+    
+    history = generate_signal_history(df)
+    
+    for symbol in set(row_counts.index) - set(history['symbol'].unique()):
+        logger.warning(f"No valid signals for {symbol} after warmup")
+    
+    # Generate signals for recent data (last 5 days or available)
+    recent = history.groupby('symbol', sort=False).tail(5)
+    
+    signals = [
+        {
+            'symbol': symbol,
+            'ts': pd.Timestamp(date).isoformat(),
+            'signal': signal,
+            'rsi': round(rsi, 2),
+            'sma20': round(sma_20, 2),
+            'sma50': round(sma_50, 2),
+            'close': round(close, 2),
+            'is_stale': is_stale
+        }
+        for symbol, date, signal, rsi, sma_20, sma_50, close, is_stale in zip(*(
+            recent[col].to_numpy() for col in
+            ['symbol', 'date', 'signal', 'rsi_14', 'sma_20', 'sma_50', 'close', 'is_stale']
+        ))
+    ]
+    
+    logger.info(f"Generated {len(signals)} signals for {len(row_counts)} symbols")
+    
+    return signals
@@ -0,0 +1,202 @@
+"""Sharded multi-process signal generation for large symbol universes."""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from investment_system.infrastructure.shared_memory import SharedArrays
+from investment_system.pipeline.analyze import generate_signals
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+SHARDS_PER_WORKER = 4  # Smaller shards even out symbols with long histories
+MIN_SYMBOLS_FOR_POOL = 50  # Below this a process pool costs more than it saves
+
+# (symbol, first row, last row + 1) in the packed arrays
+SymbolRange = Tuple[str, int, int]
+
+
+def pack_prices(df: pd.DataFrame) -> Tuple[Dict[str, np.ndarray], List[SymbolRange]]:
+    """
+    Pack a long price DataFrame into column arrays grouped by symbol.
+
+    Args:
+        df: DataFrame with columns: date, open, high, low, close, volume, symbol
+
+    Returns:
+        Tuple of (arrays, ranges). Symbols keep their order of first appearance
+        and rows are sorted by date within each symbol.
+    """
+    codes, names = pd.factorize(df['symbol'])
+    dates = pd.to_datetime(df['date']).values.astype('datetime64[ns]').view('int64')
+    order = np.lexsort((dates, codes))
+
+    arrays = {
+        'date': dates[order],
+        'prices': df[PRICE_COLUMNS].to_numpy(dtype=np.float64)[order],
+    }
+    if 'is_stale' in df.columns:
+        arrays['is_stale'] = df['is_stale'].fillna(False).to_numpy(dtype=bool)[order]
+
+    counts = np.bincount(codes, minlength=len(names))
+    stops = np.cumsum(counts)
+    ranges = [
+        (str(name), int(stop - count), int(stop))
+        for name, count, stop in zip(names, counts, stops)
+    ]
+    return arrays, ranges
+
+
+def split_shards(ranges: List[SymbolRange], n_shards: int) -> List[List[SymbolRange]]:
+    """Split symbol ranges into contiguous shards of roughly equal row counts"""
+    if not ranges:
+        return []
+
+    total_rows = ranges[-1][2] - ranges[0][1]
+    target = max(1, total_rows // max(1, n_shards))
+
+    shards = []
+    current = []
+    current_rows = 0
+    for symbol_range in ranges:
+        current.append(symbol_range)
+        current_rows += symbol_range[2] - symbol_range[1]
+        if current_rows >= target:
+            shards.append(current)
+            current = []
+            current_rows = 0
+    if current:
+        shards.append(current)
+    return shards
+
+
+def _frame_from_arrays(arrays: Dict[str, np.ndarray], ranges: List[SymbolRange]) -> pd.DataFrame:
+    """Copy one contiguous shard out of the packed arrays into a DataFrame"""
+    start, stop = ranges[0][1], ranges[-1][2]
+    prices = np.array(arrays['prices'][start:stop])
+
+    df = pd.DataFrame(prices, columns=PRICE_COLUMNS)
+    df['date'] = np.array(arrays['date'][start:stop]).view('datetime64[ns]')
+    df['symbol'] = np.repeat(
+        [symbol for symbol, _, _ in ranges],
+        [stop_ - start_ for _, start_, stop_ in ranges]
+    )
+    if 'is_stale' in arrays:
+        df['is_stale'] = np.array(arrays['is_stale'][start:stop])
+    return df
+
+
+def _signals_for_shard(spec: Dict[str, Any], ranges: List[SymbolRange]) -> List[Dict[str, Any]]:
+    """Worker: generate pipeline signals for one shard"""
+    shared = SharedArrays.attach(spec)
+    try:
+        df = _frame_from_arrays(shared.arrays, ranges)
+    finally:
+        shared.close()
+    return generate_signals(df)
+
+
+# Analyzer instances cached per worker process
+_worker_analyzers: Dict[str, Any] = {}
+
+
+def _analyze_ranges(df: pd.DataFrame, ranges: List[SymbolRange], analyzer_type: str) -> list:
+    """Run an analyzer over every symbol of a shard frame"""
+    from investment_system.core.analyzers import AnalyzerFactory
+
+    analyzer = _worker_analyzers.get(analyzer_type)
+    if analyzer is None:
+        analyzer = AnalyzerFactory.create(analyzer_type)
+        _worker_analyzers[analyzer_type] = analyzer
+
+    df = df.rename(columns={'date': 'timestamp'})
+
+    signals = []
+    base = ranges[0][1]
+    for symbol, start, stop in ranges:
+        symbol_df = df.iloc[start - base:stop - base].reset_index(drop=True)
+        try:
+            signals.append(analyzer.analyze_frame(symbol, symbol_df))
+        except Exception as e:
+            logger.warning(f"Analysis failed for {symbol}: {e}")
+    return signals
+
+
+def _analyze_shard(spec: Dict[str, Any], ranges: List[SymbolRange], analyzer_type: str) -> list:
+    """Worker: run an analyzer over every symbol in one shard"""
+    shared = SharedArrays.attach(spec)
+    try:
+        df = _frame_from_arrays(shared.arrays, ranges)
+    finally:
+        shared.close()
+    return _analyze_ranges(df, ranges, analyzer_type)
+
+
+def _run_sharded(df: pd.DataFrame, worker_fn, workers: Optional[int], *args) -> list:
+    """Pack prices into shared memory and map worker_fn over the shards"""
+    arrays, ranges = pack_prices(df)
+    workers = workers or os.cpu_count() or 1
+    shards = split_shards(ranges, workers * SHARDS_PER_WORKER)
+
+    results = []
+    with SharedArrays.create(arrays) as shared:
+        spec = shared.spec
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(worker_fn, spec, shard, *args) for shard in shards]
+            # Merge in shard order so output order matches the input symbols
+            for future in futures:
+                results.extend(future.result())
+
+    logger.info(f"Processed {len(ranges)} symbols in {len(shards)} shards on {workers} workers")
+    return results
+
+
+def generate_signals_sharded(df: pd.DataFrame, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Sharded version of generate_signals for large universes.
+
+    Symbols are split across a process pool; price columns are handed to the
+    workers through shared memory and the signal lists merged at the end.
+
+    Args:
+        df: DataFrame with price data
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        Same signal dictionaries as generate_signals, in the same order
+    """
+    if workers == 1 or df['symbol'].nunique() < MIN_SYMBOLS_FOR_POOL:
+        return generate_signals(df)
+    return _run_sharded(df, _signals_for_shard, workers)
+
+
+def analyze_sharded(
+    df: pd.DataFrame,
+    analyzer_type: str = "technical",
+    workers: Optional[int] = None
+) -> list:
+    """
+    Run a registered analyzer over every symbol in df across a process pool.
+
+    Each worker creates its own analyzer from AnalyzerFactory, so AI hooks
+    registered at runtime in the parent process are not applied.
+
+    Args:
+        df: DataFrame with price data
+        analyzer_type: Name registered in AnalyzerFactory
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        List of TradingSignal, one per symbol that could be analyzed
+    """
+    if df.empty:
+        return []
+    if workers == 1 or df['symbol'].nunique() < MIN_SYMBOLS_FOR_POOL:
+        arrays, ranges = pack_prices(df)
+        return _analyze_ranges(_frame_from_arrays(arrays, ranges), ranges, analyzer_type)
+    return _run_sharded(df, _analyze_shard, workers, analyzer_type)
@@ -0,0 +1,174 @@
+"""
+Rolling covariance/correlation of universe returns for risk limits.
+
+RollingCorrelation keeps the last `window` bars of returns in a ring buffer
+together with running sums and cross-products, so each new bar costs O(N^2)
+instead of recomputing over the whole window. Memory is bounded by the
+window buffer plus two N x N matrices (about 64 MB for 2,000 symbols).
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config.settings import get_risk_settings
+from investment_system.core.contracts import SignalType, TradingSignal
+
+
+class RollingCorrelation:
+    """Incrementally updated rolling covariance over a fixed symbol universe.
+
+    Missing returns (NaN) are treated as zero returns for that bar.
+    """
+
+    def __init__(self, symbols: Sequence[str], window: Optional[int] = None, refresh_every: Optional[int] = None):
+        self.symbols = list(symbols)
+        self.window = window or get_risk_settings().lookback_days
+        if self.window < 2:
+            raise ValueError("Correlation window must be at least 2 bars")
+        # Rebuilding the sums from the buffer every `refresh_every` bars bounds
+        # floating-point drift while keeping updates amortized O(N^2)
+        self.refresh_every = refresh_every or max(self.window, 256)
+
+        n = len(self.symbols)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._buffer = np.zeros((self.window, n))
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._scratch = np.zeros((n, n))
+        self._position = 0
+        self._count = 0
+        self._updates = 0
+
+    @classmethod
+    def from_returns(cls, returns: pd.DataFrame, window: Optional[int] = None) -> 'RollingCorrelation':
+        """Engine warmed up with a (dates x symbols) returns frame"""
+        engine = cls(list(returns.columns), window)
+        for row in returns.to_numpy(dtype=float)[-engine.window:]:
+            engine.update(row)
+        return engine
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    @property
+    def count(self) -> int:
+        """Bars currently in the window"""
+        return self._count
+
+    def update(self, returns: np.ndarray):
+        """Add one bar of returns (aligned with symbols), evicting the oldest bar"""
+        new = np.nan_to_num(np.asarray(returns, dtype=float))
+        if new.shape != self._sum.shape:
+            raise ValueError(f"Expected {len(self._sum)} returns, got {new.shape}")
+
+        if self._count == self.window:
+            old = self._buffer[self._position]
+            self._sum -= old
+            np.multiply.outer(old, old, out=self._scratch)
+            self._cross -= self._scratch
+        else:
+            self._count += 1
+
+        self._sum += new
+        np.multiply.outer(new, new, out=self._scratch)
+        self._cross += self._scratch
+        self._buffer[self._position] = new
+        self._position = (self._position + 1) % self.window
+
+        self._updates += 1
+        if self._updates % self.refresh_every == 0:
+            self._refresh()
+
+    def update_bar(self, returns: Dict[str, float]):
+        """Add one bar given as symbol -> return; symbols outside the universe are ignored"""
+        row = np.zeros(len(self.symbols))
+        for symbol, value in returns.items():
+            i = self._index.get(symbol)
+            if i is not None:
+                row[i] = value
+        self.update(row)
+
+    def _refresh(self):
+        """Recompute the running sums exactly from the buffer"""
+        filled = self._buffer if self._count == self.window else self._buffer[:self._count]
+        self._sum = filled.sum(axis=0)
+        self._cross = filled.T @ filled
+
+    def _indices(self, symbols: Optional[Sequence[str]]) -> np.ndarray:
+        if symbols is None:
+            return np.arange(len(self.symbols))
+        return np.array([self._index[symbol] for symbol in symbols], dtype=int)
+
+    def covariance(self, symbols: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Sample covariance over the window (optionally for a subset of symbols)"""
+        if self._count < 2:
+            raise ValueError("Need at least 2 bars for covariance")
+        ix = self._indices(symbols)
+        total = self._sum[ix]
+        cross = self._cross[np.ix_(ix, ix)]
+        return (cross - np.multiply.outer(total, total) / self._count) / (self._count - 1)
+
+    def correlation(self, symbols: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Correlation over the window; 0 for symbols with no variance"""
+        cov = self.covariance(symbols)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.multiply.outer(std, std)
+        corr[~np.isfinite(corr)] = 0.0
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, 0.0))
+        return np.clip(corr, -1.0, 1.0)
+
+
+def price_returns(closes: pd.DataFrame) -> pd.DataFrame:
+    """Bar-to-bar returns of a (dates x symbols) close frame"""
+    return closes.sort_index().pct_change(fill_method=None).iloc[1:]
+
+
+def cap_correlated_buys(
+    signals: List[TradingSignal],
+    correlation: RollingCorrelation,
+    max_correlation: Optional[float] = None
+) -> List[TradingSignal]:
+    """
+    Downgrade BUY signals that are too correlated with a stronger BUY to HOLD.
+
+    BUYs are accepted in order of confidence; a BUY whose correlation with an
+    already accepted BUY exceeds max_correlation becomes a HOLD.
+
+    Args:
+        signals: Signals to check (symbols outside the engine are left as is)
+        correlation: Rolling correlation engine covering the symbols
+        max_correlation: Limit (default: dynamic_risk_management.base_limits)
+
+    Returns:
+        New list of signals in the input order
+    """
+    if max_correlation is None:
+        max_correlation = get_risk_settings().base_limits.max_correlation
+
+    buys = [
+        i for i, signal in enumerate(signals)
+        if signal.signal == SignalType.BUY and signal.symbol in correlation
+    ]
+    if len(buys) < 2 or correlation.count < 2:
+        return list(signals)
+
+    buys.sort(key=lambda i: signals[i].confidence, reverse=True)
+    corr = correlation.correlation([signals[i].symbol for i in buys])
+
+    result = list(signals)
+    accepted: List[int] = []
+    for position, i in enumerate(buys):
+        peaks = corr[position, accepted]
+        if len(accepted) and peaks.max() > max_correlation:
+            peer = signals[buys[accepted[int(peaks.argmax())]]].symbol
+            note = f"Capped: correlation {peaks.max():.2f} with {peer} exceeds {max_correlation:.2f}"
+            result[i] = signals[i].copy(update={
+                'signal': SignalType.HOLD,
+                'reasoning': f"{signals[i].reasoning} | {note}" if signals[i].reasoning else note,
+            })
+        else:
+            accepted.append(position)
+    return result
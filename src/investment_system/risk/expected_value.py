@@ -0,0 +1,236 @@
+"""
+Monte Carlo expected-value engine over weighted market scenarios.
+
+Each simulated path draws a market scenario (bull_market, normal_up, ...)
+with the weights from enhanced_system.expected_value and evolves every
+symbol as a geometric random walk with the scenario's drift scaled by the
+symbol's beta to the market, and the symbol's own historical volatility. The scenario is fixed along a path, so
+the horizon log return is drawn directly (horizon times the daily drift,
+sqrt(horizon) times the daily volatility) instead of day by day. Draws are
+made for paths x symbols at once, in chunks bounded by a memory budget, from
+per-block RNG streams so results do not depend on the chunk size. With one
+seed per symbol, each symbol draws its scenarios and shocks from its own
+stream instead, so its result does not depend on the other symbols
+simulated with it.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from config.settings import ExpectedValueSettings, get_expected_value_settings
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Scenario -> (annual drift, volatility multiplier)
+SCENARIOS: Dict[str, Tuple[float, float]] = {
+    'bull_market': (0.30, 1.0),
+    'normal_up': (0.10, 0.9),
+    'sideways': (0.0, 0.8),
+    'normal_down': (-0.10, 1.1),
+    'bear_market': (-0.35, 1.5),
+}
+
+PATH_BLOCK = 256  # Paths per RNG stream
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024  # Memory budget of one chunk of draws
+
+EV_COLUMNS = ['expected_value', 'prob_profit', 'p05', 'p95', 'volatility', 'beta']
+
+
+def universe_beta(log_returns: pd.DataFrame, market: Optional[pd.Series] = None) -> np.ndarray:
+    """Beta of each symbol to market log returns (default: equal-weight universe; 1 when undefined)"""
+    if market is None:
+        if log_returns.shape[1] < 2:
+            return np.ones(log_returns.shape[1])
+        market = log_returns.mean(axis=1)
+    market = market.reindex(log_returns.index)
+    if not market.var() > 0:
+        return np.ones(log_returns.shape[1])
+    values = log_returns.to_numpy(dtype=float)
+    m = market.to_numpy()[:, None]
+    valid = ~np.isnan(values) & ~np.isnan(m)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = np.where(valid, values, 0.0)
+        y = np.where(valid, m, 0.0)
+        n = valid.sum(axis=0)
+        cov = ((x * y).sum(axis=0) - x.sum(axis=0) * y.sum(axis=0) / n) / (n - 1)
+        var = ((y * y).sum(axis=0) - y.sum(axis=0) ** 2 / n) / (n - 1)
+        beta = cov / var
+    return np.where(np.isfinite(beta), beta, 1.0)
+
+
+def _scenario_table(weights: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Normalized weights, daily drifts and volatility multipliers of the configured scenarios"""
+    unknown = set(weights) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {sorted(unknown)}")
+    names = [name for name in SCENARIOS if weights.get(name, 0) > 0]
+    if not names:
+        raise ValueError("No scenario has a positive weight")
+
+    probabilities = np.array([weights[name] for name in names], dtype=float)
+    probabilities /= probabilities.sum()
+    drifts = np.array([SCENARIOS[name][0] for name in names]) / TRADING_DAYS_PER_YEAR
+    vol_multipliers = np.array([SCENARIOS[name][1] for name in names])
+    return probabilities, drifts, vol_multipliers
+
+
+def _horizon_returns(
+    scenarios: np.ndarray,
+    shocks: np.ndarray,
+    volatility: np.ndarray,
+    beta: np.ndarray,
+    horizon: int,
+    drifts: np.ndarray,
+    vol_multipliers: np.ndarray
+) -> np.ndarray:
+    """Simple returns at the horizon from scenario indices (paths x 1 or symbols) and standard normal shocks (modified)"""
+    # Daily log returns: per-scenario drift and scaled symbol volatility
+    sigma = volatility[None, :] * vol_multipliers[scenarios].astype(np.float32)
+    mu = (drifts[scenarios] * beta[None, :] - 0.5 * sigma.astype(np.float64) ** 2).astype(np.float32)
+
+    # Sum of horizon i.i.d. daily log returns of the path's scenario
+    shocks *= sigma * np.float32(np.sqrt(horizon))
+    shocks += mu * np.float32(horizon)
+    return np.expm1(shocks)
+
+
+def simulate_returns(
+    volatility: np.ndarray,
+    n_paths: int,
+    horizon: int,
+    weights: Dict[str, float],
+    beta: Optional[np.ndarray] = None,
+    seed: Optional[Union[int, Sequence[int]]] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES
+) -> np.ndarray:
+    """
+    Simulated horizon returns for every path and symbol.
+
+    Args:
+        volatility: Daily log-return volatility per symbol
+        n_paths: Number of paths
+        horizon: Days simulated
+        weights: Scenario name -> weight
+        beta: Sensitivity of each symbol to the scenario drift (default 1)
+        seed: Seed of the RNG streams (None for fresh entropy), or one seed
+            per symbol for draws independent of the other symbols
+        max_bytes: Memory budget for one chunk of paths x symbols draws
+
+    Returns:
+        float32 array (n_paths x symbols) of simple returns at the horizon
+    """
+    volatility = np.asarray(volatility, dtype=np.float32)
+    n_symbols = len(volatility)
+    beta = np.ones(n_symbols) if beta is None else np.asarray(beta, dtype=float)
+    probabilities, drifts, vol_multipliers = _scenario_table(weights)
+
+    if seed is not None and not np.isscalar(seed):
+        return _simulate_per_symbol(
+            volatility, n_paths, horizon, beta, list(seed), max_bytes, (probabilities, drifts, vol_multipliers)
+        )
+    n_blocks = -(-n_paths // PATH_BLOCK)
+    streams = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(n_blocks)]
+
+    bytes_per_block = PATH_BLOCK * max(n_symbols, 1) * 4
+    blocks_per_chunk = max(1, max_bytes // bytes_per_block)
+
+    results = np.empty((n_blocks * PATH_BLOCK, n_symbols), dtype=np.float32)
+    for first in range(0, n_blocks, blocks_per_chunk):
+        chunk_streams = streams[first:first + blocks_per_chunk]
+        rows = slice(first * PATH_BLOCK, (first + len(chunk_streams)) * PATH_BLOCK)
+
+        scenarios = np.concatenate([rng.choice(len(probabilities), PATH_BLOCK, p=probabilities) for rng in chunk_streams])
+        shocks = np.concatenate([
+            rng.standard_normal((PATH_BLOCK, n_symbols), dtype=np.float32) for rng in chunk_streams
+        ])
+        results[rows] = _horizon_returns(scenarios[:, None], shocks, volatility, beta, horizon, drifts, vol_multipliers)
+
+    return results[:n_paths]
+
+
+def _simulate_per_symbol(
+    volatility: np.ndarray,
+    n_paths: int,
+    horizon: int,
+    beta: np.ndarray,
+    seeds: list,
+    max_bytes: int,
+    tables: Tuple[np.ndarray, np.ndarray, np.ndarray]
+) -> np.ndarray:
+    """simulate_returns with each symbol drawing from the stream of its own seed"""
+    if len(seeds) != len(volatility):
+        raise ValueError(f"Expected {len(volatility)} seeds, got {len(seeds)}")
+    probabilities, drifts, vol_multipliers = tables
+    thresholds = np.cumsum(probabilities)[:-1]
+    streams = [np.random.default_rng(symbol_seed) for symbol_seed in seeds]
+
+    # Draws (uniform for the scenario, normal for the shock) of a symbol come
+    # from its stream only; the returns are computed for many symbols at once
+    symbols_per_chunk = max(1, max_bytes // (n_paths * 12))
+    results = np.empty((n_paths, len(volatility)), dtype=np.float32)
+    for first in range(0, len(streams), symbols_per_chunk):
+        columns = slice(first, first + symbols_per_chunk)
+        chunk_streams = streams[columns]
+        uniforms = np.empty((n_paths, len(chunk_streams)))
+        shocks = np.empty((n_paths, len(chunk_streams)), dtype=np.float32)
+        for j, rng in enumerate(chunk_streams):
+            uniforms[:, j] = rng.random(n_paths)
+            shocks[:, j] = rng.standard_normal(n_paths, dtype=np.float32)
+        scenarios = np.searchsorted(thresholds, uniforms, side='right')
+        results[:, columns] = _horizon_returns(
+            scenarios, shocks, volatility[columns], beta[columns], horizon, drifts, vol_multipliers
+        )
+
+    return results
+
+
+def expected_values(
+    closes: pd.DataFrame,
+    n_paths: int = 1000,
+    horizon: Optional[int] = None,
+    settings: Optional[ExpectedValueSettings] = None,
+    seed: Optional[Union[int, Sequence[int]]] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    market: Optional[pd.Series] = None
+) -> pd.DataFrame:
+    """
+    Expected horizon return of every symbol under the weighted scenarios.
+
+    Args:
+        closes: (dates x symbols) close prices used to estimate volatility
+        n_paths: Simulated paths per symbol
+        horizon: Days ahead (default: time_horizon_days)
+        settings: Scenario settings (default: config.json)
+        seed: Seed for reproducible runs, or one seed per symbol (with a
+            market series, each symbol's result then depends only on its
+            own history)
+        max_bytes: Memory budget for one chunk of draws
+        market: Market log returns for beta (default: equal-weight closes)
+
+    Returns:
+        DataFrame indexed by symbol with EV_COLUMNS (returns as fractions)
+    """
+    settings = settings or get_expected_value_settings()
+    horizon = horizon or settings.time_horizon_days
+
+    closes = closes.sort_index()
+    if closes.isna().values.any():
+        # Returns over each symbol's own bars, not across another symbol's calendar
+        log_returns = closes.apply(lambda column: np.log(column.dropna()).diff())
+    else:
+        log_returns = np.log(closes).diff()
+    volatility = log_returns.std().fillna(0.0).to_numpy()
+    beta = universe_beta(log_returns, market)
+
+    simulated = simulate_returns(volatility, n_paths, horizon, settings.scenario_weights, beta, seed, max_bytes)
+
+    return pd.DataFrame({
+        'expected_value': simulated.mean(axis=0, dtype=np.float64),
+        'prob_profit': (simulated > 0).mean(axis=0),
+        'p05': np.percentile(simulated, 5, axis=0),
+        'p95': np.percentile(simulated, 95, axis=0),
+        'volatility': volatility,
+        'beta': beta,
+    }, index=pd.Index(closes.columns, name='symbol'))
@@ -0,0 +1,202 @@
+"""
+Kelly-criterion position sizing from historical trade outcomes.
+
+Parameters come from enhanced_system.kelly_criterion in config.json.
+kelly_table sizes every symbol in one vectorized pass over a trade log;
+KellySizer keeps running sums over a rolling window of trades so sizes can
+be refreshed bar by bar without rescanning the lookback period.
+"""
+
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import KellyCriterionSettings, get_kelly_settings
+
+KELLY_COLUMNS = ['trades', 'win_rate', 'avg_win', 'avg_loss', 'payoff', 'edge', 'kelly', 'fraction']
+
+
+def kelly_from_sums(
+    trades: np.ndarray,
+    wins: np.ndarray,
+    win_sum: np.ndarray,
+    loss_sum: np.ndarray,
+    settings: KellyCriterionSettings
+) -> Dict[str, np.ndarray]:
+    """
+    Kelly statistics from per-symbol outcome sums.
+
+    Args:
+        trades: Number of trades per symbol
+        wins: Number of winning trades (return > 0)
+        win_sum: Sum of winning returns
+        loss_sum: Sum of losing return magnitudes (positive)
+        settings: Kelly parameters
+
+    Returns:
+        Dict of arrays keyed by KELLY_COLUMNS. edge is the expected profit per
+        unit risked (p * b - q), kelly the full Kelly fraction (p - q / b) and
+        fraction the capped, conservative size (0 when not eligible)
+    """
+    trades = np.asarray(trades, dtype=float)
+    wins = np.asarray(wins, dtype=float)
+    losses = trades - wins
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        win_rate = np.where(trades > 0, wins / trades, 0.0)
+        avg_win = np.where(wins > 0, win_sum / np.maximum(wins, 1), 0.0)
+        avg_loss = np.where(losses > 0, loss_sum / np.maximum(losses, 1), 0.0)
+        payoff = np.where(avg_loss > 0, avg_win / avg_loss, np.where(avg_win > 0, np.inf, 0.0))
+        edge = np.where(payoff > 0, win_rate * payoff - (1 - win_rate), -(1 - win_rate))
+        kelly = np.where(payoff > 0, win_rate - (1 - win_rate) / payoff, -np.inf)
+
+    eligible = (
+        settings.enabled
+        & (trades >= settings.min_trades_required)
+        & (win_rate >= settings.min_win_rate)
+        & (edge >= settings.min_edge_threshold)
+        & (kelly > 0)
+    )
+    fraction = np.where(
+        eligible,
+        np.minimum(settings.max_kelly_fraction, kelly * settings.conservative_multiplier),
+        0.0
+    )
+
+    return {
+        'trades': trades.astype(int),
+        'win_rate': win_rate,
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'payoff': payoff,
+        'edge': edge,
+        'kelly': np.maximum(kelly, -1.0),
+        'fraction': fraction,
+    }
+
+
+def lookback_start(as_of, settings: KellyCriterionSettings) -> pd.Timestamp:
+    """Exits at or before this timestamp fall outside the lookback window"""
+    return pd.Timestamp(as_of) - pd.offsets.BDay(settings.lookback_period_days)
+
+
+def kelly_table(
+    trades: pd.DataFrame,
+    settings: Optional[KellyCriterionSettings] = None,
+    as_of=None
+) -> pd.DataFrame:
+    """
+    Kelly sizes for every symbol in a trade log.
+
+    Args:
+        trades: Trade log with symbol, exit and return columns
+            (see backtest.engine.trade_log)
+        settings: Kelly parameters (default: config.json)
+        as_of: End of the lookback window (default: last exit)
+
+    Returns:
+        DataFrame indexed by symbol with KELLY_COLUMNS
+    """
+    settings = settings or get_kelly_settings()
+    if trades.empty:
+        return pd.DataFrame(columns=KELLY_COLUMNS, index=pd.Index([], name='symbol'))
+
+    exits = pd.to_datetime(trades['exit'])
+    as_of = exits.max() if as_of is None else pd.Timestamp(as_of)
+    in_window = ((exits > lookback_start(as_of, settings)) & (exits <= as_of)).to_numpy()
+
+    codes, symbols = pd.factorize(trades['symbol'])
+    codes = codes[in_window]
+    returns = trades['return'].to_numpy(dtype=float)[in_window]
+    won = returns > 0
+    n = len(symbols)
+
+    stats = kelly_from_sums(
+        np.bincount(codes, minlength=n),
+        np.bincount(codes, weights=won, minlength=n),
+        np.bincount(codes, weights=np.where(won, returns, 0.0), minlength=n),
+        np.bincount(codes, weights=np.where(won, 0.0, -returns), minlength=n),
+        settings
+    )
+    return pd.DataFrame(stats, index=pd.Index(symbols, name='symbol'))
+
+
+class KellySizer:
+    """Incremental Kelly sizing over a rolling window of closed trades.
+
+    Trades are added in exit order as they close and advance() is called as
+    bars arrive; both only touch the trades entering or leaving the window,
+    so each update is O(1) amortized per trade instead of a rescan of the
+    lookback period.
+    """
+
+    def __init__(self, settings: Optional[KellyCriterionSettings] = None):
+        self.settings = settings or get_kelly_settings()
+        self._slots: Dict[str, int] = {}
+        self._sums = np.zeros((0, 4))  # trades, wins, win_sum, loss_sum per slot
+        self._window: Deque[Tuple[pd.Timestamp, int, float]] = deque()
+        self._cutoff: Optional[pd.Timestamp] = None
+
+    def _slot(self, symbol: str) -> int:
+        """Row of symbol in the running sums"""
+        slot = self._slots.get(symbol)
+        if slot is None:
+            slot = len(self._slots)
+            self._slots[symbol] = slot
+            if slot >= len(self._sums):
+                grown = np.zeros((max(8, 2 * len(self._sums)), 4))
+                grown[:len(self._sums)] = self._sums
+                self._sums = grown
+        return slot
+
+    def _apply(self, slot: int, trade_return: float, sign: int):
+        won = trade_return > 0
+        self._sums[slot] += sign * np.array([
+            1.0, float(won), trade_return if won else 0.0, 0.0 if won else -trade_return
+        ])
+
+    def add_trade(self, symbol: str, exit, trade_return: float):
+        """Add a closed trade and slide the window forward to its exit"""
+        exit = pd.Timestamp(exit)
+        self.advance(exit)
+        slot = self._slot(symbol)
+        self._apply(slot, trade_return, 1)
+        self._window.append((exit, slot, trade_return))
+
+    def add_trades(self, trades: pd.DataFrame):
+        """Add a trade log (symbol, exit, return), in exit order"""
+        ordered = trades.sort_values('exit', kind='stable')
+        for symbol, exit, trade_return in zip(ordered['symbol'], ordered['exit'], ordered['return']):
+            self.add_trade(symbol, exit, float(trade_return))
+
+    def advance(self, as_of):
+        """Drop trades that left the lookback window as of a new bar"""
+        cutoff = lookback_start(as_of, self.settings)
+        if self._cutoff is not None and cutoff <= self._cutoff:
+            return
+        self._cutoff = cutoff
+        while self._window and self._window[0][0] <= cutoff:
+            _, slot, trade_return = self._window.popleft()
+            self._apply(slot, trade_return, -1)
+
+    def table(self) -> pd.DataFrame:
+        """Current Kelly statistics for every symbol seen"""
+        sums = self._sums[:len(self._slots)]
+        # Removing trades can leave tiny float residue in the sums
+        sums = np.where(np.abs(sums) < 1e-12, 0.0, sums)
+        stats = kelly_from_sums(sums[:, 0].round(), sums[:, 1].round(), sums[:, 2], sums[:, 3], self.settings)
+        return pd.DataFrame(stats, index=pd.Index(list(self._slots), name='symbol'))
+
+    def fraction(self, symbol: str) -> float:
+        """Current capped Kelly fraction of a symbol (0 if unknown)"""
+        slot = self._slots.get(symbol)
+        if slot is None:
+            return 0.0
+        trades, wins, win_sum, loss_sum = self._sums[slot]
+        stats = kelly_from_sums(
+            np.array([round(trades)]), np.array([round(wins)]),
+            np.array([win_sum]), np.array([loss_sum]), self.settings
+        )
+        return float(stats['fraction'][0])
@@ -0,0 +1,271 @@
+"""
+Portfolio scoring and greedy portfolio construction.
+
+A portfolio's score is the enhanced_system.portfolio_scoring weighted sum of
+its members' performance and expected-value scores (rank-normalized to 0-1
+across the universe) and its diversification: breadth (size relative to the
+optimal number of positions, capped at 1) times 1 - mean pairwise
+correlation. Portfolios are built greedily, one best-improving symbol at a
+time, then refined with swap passes, so the search is O(N * size) per step
+instead of enumerating combinations.
+"""
+
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.settings import PortfolioScoringSettings, get_portfolio_scoring_settings
+from investment_system.infrastructure.cache import data_checksum, get_cache
+from investment_system.risk.correlation import RollingCorrelation, price_returns
+from investment_system.risk.expected_value import expected_values
+
+TRADING_DAYS_PER_YEAR = 252
+MAX_SWAP_ROUNDS = 10
+
+METRIC_COLUMNS = ['sharpe', 'expected_value']
+
+
+@dataclass
+class PortfolioCandidate:
+    """A scored portfolio"""
+    symbols: List[str]
+    score: float
+    performance: float
+    expected_value: float
+    diversification: float
+
+
+def symbol_metrics(closes: pd.DataFrame, seed: int = 0, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Per-symbol performance and expected value, reusing cached results.
+
+    Args:
+        closes: (dates x symbols) close prices
+        seed: Seed of the expected-value simulation (each symbol draws from
+            its own stream derived from the seed and the symbol, so its result
+            does not depend on the symbols computed with it)
+        use_cache: Reuse metrics of symbols whose price history is unchanged
+
+    Returns:
+        DataFrame indexed by symbol with columns sharpe (annualized, of daily
+        returns) and expected_value
+    """
+    closes = closes.sort_index()
+    log_returns = np.log(closes).diff()
+    market = log_returns.mean(axis=1)
+    cache = get_cache()
+
+    # The market series is part of the key: expected value depends on beta
+    market_checksum = data_checksum(market.to_numpy())
+    keys = {
+        symbol: (closes[symbol].last_valid_index(), data_checksum(closes[symbol].to_numpy(), market_checksum))
+        for symbol in closes.columns
+    }
+
+    metrics = {}
+    if use_cache:
+        for symbol, (last_bar, checksum) in keys.items():
+            cached = cache.get_symbol_metrics(symbol, last_bar, checksum)
+            if cached is not None:
+                metrics[symbol] = cached
+
+    missing = [symbol for symbol in closes.columns if symbol not in metrics]
+    if missing:
+        returns = log_returns[missing]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sharpe = (returns.mean() / returns.std() * np.sqrt(TRADING_DAYS_PER_YEAR)).fillna(0.0)
+        seeds = [zlib.crc32(f"{seed}:{symbol}".encode()) for symbol in missing]
+        ev = expected_values(closes[missing], seed=seeds, market=market)['expected_value']
+        for symbol in missing:
+            metrics[symbol] = {'sharpe': float(sharpe[symbol]), 'expected_value': float(ev[symbol])}
+            if use_cache:
+                cache.set_symbol_metrics(symbol, *keys[symbol], metrics[symbol])
+
+    return pd.DataFrame.from_dict(metrics, orient='index', columns=METRIC_COLUMNS).loc[list(closes.columns)]
+
+
+def _rank_scores(values: pd.Series) -> np.ndarray:
+    """Percentile rank in [0, 1] (all 1 for a single symbol)"""
+    if len(values) < 2:
+        return np.ones(len(values))
+    return ((values.rank(method='average') - 1) / (len(values) - 1)).to_numpy()
+
+
+class _PortfolioState:
+    """Running sums of one portfolio for O(N) candidate scoring"""
+
+    def __init__(self, performance: np.ndarray, ev: np.ndarray, corr: np.ndarray, settings: PortfolioScoringSettings):
+        self.performance = performance
+        self.ev = ev
+        self.corr = corr
+        self.settings = settings
+        self.members: List[int] = []
+        self.corr_to_members = np.zeros(len(performance))  # sum of corr to each member
+        self.pair_sum = 0.0
+        self.performance_sum = 0.0
+        self.ev_sum = 0.0
+
+    def score_parts(self, size: int, performance_sum, ev_sum, pair_sum) -> tuple:
+        n_pairs = size * (size - 1) / 2
+        mean_corr = pair_sum / n_pairs if n_pairs else 0.0
+        s = self.settings
+        breadth = min(size, s.target_positions.optimal) / max(s.target_positions.optimal, 1)
+        diversification = breadth * (1 - np.clip(mean_corr, 0.0, 1.0))
+        performance = performance_sum / size
+        ev = ev_sum / size
+        score = (
+            s.performance_weight * performance
+            + s.ev_analysis_weight * ev
+            + s.diversification_weight * diversification
+        )
+        return score, performance, ev, diversification
+
+    def score(self) -> tuple:
+        return self.score_parts(len(self.members), self.performance_sum, self.ev_sum, self.pair_sum)
+
+    def add(self, i: int):
+        self.pair_sum += self.corr_to_members[i]
+        self.performance_sum += self.performance[i]
+        self.ev_sum += self.ev[i]
+        self.corr_to_members += self.corr[i]
+        self.members.append(i)
+
+    def remove(self, i: int):
+        self.members.remove(i)
+        self.corr_to_members -= self.corr[i]
+        self.pair_sum -= self.corr_to_members[i]
+        self.performance_sum -= self.performance[i]
+        self.ev_sum -= self.ev[i]
+
+    def best_addition(self, available: np.ndarray) -> int:
+        """Candidate that maximizes the score of the enlarged portfolio"""
+        size = len(self.members) + 1
+        scores = self.score_parts(
+            size,
+            self.performance_sum + self.performance,
+            self.ev_sum + self.ev,
+            self.pair_sum + self.corr_to_members
+        )[0]
+        scores = np.where(available, scores, -np.inf)
+        return int(np.argmax(scores))
+
+    def best_swap(self, available: np.ndarray) -> Optional[tuple]:
+        """(member, candidate) swap with the largest score gain, if any improves"""
+        members = np.array(self.members)
+        size = len(members)
+        # Pair sum after replacing member m with candidate c
+        pair_sum = (
+            self.pair_sum
+            - (self.corr_to_members[members] - 1.0)[:, None]
+            + self.corr_to_members[None, :]
+            - self.corr[members]
+        )
+        scores = self.score_parts(
+            size,
+            self.performance_sum - self.performance[members][:, None] + self.performance[None, :],
+            self.ev_sum - self.ev[members][:, None] + self.ev[None, :],
+            pair_sum
+        )[0]
+        scores = np.where(available[None, :], scores, -np.inf)
+        m, c = np.unravel_index(np.argmax(scores), scores.shape)
+        if scores[m, c] > self.score()[0] + 1e-12:
+            return int(members[m]), int(c)
+        return None
+
+
+def optimize_portfolio(
+    metrics: pd.DataFrame,
+    correlation: np.ndarray,
+    settings: Optional[PortfolioScoringSettings] = None
+) -> List[PortfolioCandidate]:
+    """
+    Rank candidate portfolios of every allowed size by the weighted score.
+
+    Args:
+        metrics: Per-symbol sharpe and expected_value (see symbol_metrics)
+        correlation: Correlation matrix aligned with metrics.index
+        settings: Scoring weights and target positions (default: config.json)
+
+    Returns:
+        One refined candidate per size between target_positions min and max
+        (capped by the universe size), best score first
+    """
+    settings = settings or get_portfolio_scoring_settings()
+    n = len(metrics)
+    if n == 0:
+        return []
+    if correlation.shape != (n, n):
+        raise ValueError(f"Correlation matrix shape {correlation.shape} does not match {n} symbols")
+
+    target = settings.target_positions
+    max_size = min(target.max, n)
+    min_size = min(target.min, max_size)
+
+    performance = _rank_scores(metrics['sharpe'])
+    ev = _rank_scores(metrics['expected_value'])
+    corr = np.nan_to_num(np.asarray(correlation, dtype=float))
+    symbols = list(metrics.index)
+
+    candidates = []
+    state = _PortfolioState(performance, ev, corr, settings)
+    for size in range(1, max_size + 1):
+        available = np.ones(n, dtype=bool)
+        available[state.members] = False
+        state.add(state.best_addition(available))
+        if size < min_size:
+            continue
+
+        # Refine a copy with best-improvement swaps; the greedy path continues unchanged
+        refined = _PortfolioState(performance, ev, corr, settings)
+        for i in state.members:
+            refined.add(i)
+        for _ in range(MAX_SWAP_ROUNDS):
+            available = np.ones(n, dtype=bool)
+            available[refined.members] = False
+            swap = refined.best_swap(available)
+            if swap is None:
+                break
+            refined.remove(swap[0])
+            refined.add(swap[1])
+
+        score, perf, expected, diversification = refined.score()
+        candidates.append(PortfolioCandidate(
+            symbols=[symbols[i] for i in refined.members],
+            score=float(score),
+            performance=float(perf),
+            expected_value=float(expected),
+            diversification=float(diversification),
+        ))
+
+    # Best score first; ties go to the size closest to the optimal target
+    candidates.sort(key=lambda c: (-round(c.score, 12), abs(len(c.symbols) - target.optimal)))
+    return candidates
+
+
+def build_portfolio(
+    closes: pd.DataFrame,
+    correlation: Optional[RollingCorrelation] = None,
+    settings: Optional[PortfolioScoringSettings] = None,
+    seed: int = 0
+) -> List[PortfolioCandidate]:
+    """
+    Score portfolios from close prices.
+
+    Args:
+        closes: (dates x symbols) close prices of the candidate universe
+        correlation: Maintained correlation engine covering the symbols
+            (default: computed from closes)
+        settings: Scoring settings (default: config.json)
+        seed: Seed of the expected-value simulation
+
+    Returns:
+        Candidates as returned by optimize_portfolio
+    """
+    metrics = symbol_metrics(closes, seed=seed)
+    symbols = list(metrics.index)
+    if correlation is None or any(symbol not in correlation for symbol in symbols):
+        correlation = RollingCorrelation.from_returns(price_returns(closes), window=len(closes))
+    return optimize_portfolio(metrics, correlation.correlation(symbols), settings)
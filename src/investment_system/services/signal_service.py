@@ -3,41 +3,153 @@ Signal generation service with caching and billing integration.
 This is the core revenue-generating service.
 """
 
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
 import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from decimal import Decimal
+from typing import Callable, List, Optional, Dict, Any, Tuple, Union
+
+import numpy as np
+import pandas as pd
 
 from investment_system.core.contracts import (
-    MarketData, TradingSignal, SignalRequest, SignalResponse,
-    UserTier, User, RateLimitStatus, ErrorCode, ErrorResponse
+    ColumnarMarketData, MarketData, TradingSignal, SignalRequest, SignalResponse,
+    UserTier, User, RateLimitStatus, ErrorCode, ErrorResponse, trusted
 )
-from investment_system.core.analyzers import AnalyzerFactory, BaseAnalyzer
+from investment_system.core import indicators
+from investment_system.core.analyzers import AnalyzerFactory, BaseAnalyzer, market_data_panel, prepare_panel
 from investment_system.infrastructure.cache import get_cache, cache_result
+from investment_system.infrastructure.singleflight import SingleFlight
 from investment_system.pipeline.ingest import fetch_prices
 from investment_system.pipeline.analyze import generate_signals as legacy_generate_signals
+from investment_system.pipeline.shard import analyze_sharded
+from investment_system.risk.correlation import RollingCorrelation, cap_correlated_buys, price_returns
+from investment_system.risk.expected_value import expected_values
+from investment_system.risk.portfolio import PortfolioCandidate, build_portfolio
+from investment_system.services.usage_service import get_usage_meter
+from config.settings import get_expected_value_settings, get_risk_settings
+
+logger = logging.getLogger(__name__)
+
+
+# Analyzer type per subscription tier (others use "technical")
+TIER_ANALYZERS = {
+    UserTier.ENTERPRISE: "ai_enhanced",
+    UserTier.PRO: "momentum",
+}
+
+
+# Worker threads for CPU-bound analysis, off the event loop (NumPy/pandas
+# kernels release the GIL; analyzers and their hooks stay in-process)
+_analysis_executor: Optional[ThreadPoolExecutor] = None
+_analysis_executor_lock = threading.Lock()
+
+
+def get_analysis_executor() -> ThreadPoolExecutor:
+    """Get the shared analysis worker pool, creating it on first use"""
+    global _analysis_executor
+    with _analysis_executor_lock:
+        if _analysis_executor is None:
+            _analysis_executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                thread_name_prefix="signal-analysis"
+            )
+        return _analysis_executor
+
+
+async def run_in_worker(fn: Callable, *args, **kwargs):
+    """Run CPU-bound work in the analysis pool (with the caller's context) and await it"""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_analysis_executor(), call)
+
+
+def _handler_identity(handler: Callable) -> Optional[str]:
+    """Identity of a hook handler that is the same in every process, if it has one"""
+    cache_key = getattr(handler, 'cache_key', None)
+    if cache_key is not None:
+        return f"cache_key:{cache_key}"
+    
+    # A module-level function (or static method) is fully named by its import
+    # path; closures, lambdas and bound methods may carry configuration
+    module = sys.modules.get(getattr(handler, '__module__', None) or '')
+    qualname = getattr(handler, '__qualname__', '')
+    target = module
+    for part in qualname.split('.'):
+        target = getattr(target, part, None)
+    if module is not None and target is handler:
+        return f"{handler.__module__}.{qualname}"
+    return None
 
 
 class SignalService:
-    """Service for generating trading signals"""
+    """Service for generating trading signals
     
-    def __init__(self):
+    Async methods never block the event loop: price fetches and cache round
+    trips run in the default executor, analysis in the analysis worker pool.
+    """
+    
+    def __init__(self, coalesce_across_workers: bool = True):
         self.cache = get_cache()
+        # Identical in-flight computations run once (across workers through the cache)
+        self._inflight = SingleFlight(self.cache if coalesce_across_workers else None)
         self.analyzer_factory = AnalyzerFactory()
         self._ai_hooks = {}
+        # Bumped whenever the hook set changes; pooled analyzers bound to an older set are rebuilt
+        self._hooks_version = 0
+        self._hooks_key = ""  # Digest of the hook set for shared cache keys
+        self._analyzers: Dict[Tuple[str, str], Tuple[int, BaseAnalyzer]] = {}
+        self.correlation: Optional[RollingCorrelation] = None
+        
+    def register_ai_hook(
+        self,
+        hook_name: str,
+        handler: callable,
+        batch: bool = False,
+        timeout: Optional[float] = None
+    ):
+        """Register an AI hook for signal enhancement (see AnalyzerHooks.register)
         
-    def register_ai_hook(self, hook_name: str, handler: callable):
-        """Register an AI hook for signal enhancement"""
-        self._ai_hooks[hook_name] = handler
+        Signals computed with hooks are cached under a digest of the hook set.
+        A handler is identified across workers and restarts by its cache_key
+        attribute (set it on configured callables, e.g. closures from a factory)
+        or, for a module-level function, by its import path; any other handler
+        gets a key of its own, so its signals are only reused by this service.
+        """
+        identity = _handler_identity(handler) or f"local:{uuid.uuid4().hex}"
+        self._ai_hooks[hook_name] = (handler, {'batch': batch, 'timeout': timeout}, identity)
+        self._hooks_version += 1
+        self._hooks_key = self._hooks_digest()
+    
+    def set_correlation_engine(self, engine: RollingCorrelation):
+        """Use a maintained rolling correlation engine for correlation limits"""
+        self.correlation = engine
     
     async def generate_signals(
         self,
         request: SignalRequest,
-        user: User
+        user: User,
+        endpoint: str = "/signals",
+        method: str = "POST"
     ) -> SignalResponse:
         """
         Generate trading signals for requested symbols.
         This is the main revenue-generating endpoint.
+        
+        Args:
+            request: Symbols to analyze
+            user: User the request is billed to
+            endpoint: Endpoint path recorded for billing
+            method: HTTP method recorded for billing
         """
         request_id = str(uuid.uuid4())
         
@@ -45,45 +157,97 @@ class SignalService:
         if not self._check_user_limits(user, request):
             raise ValueError(ErrorCode.SUBSCRIPTION_REQUIRED)
         
-        # Try cache first (different cache for different tiers)
-        cached_signals = self._get_cached_signals(request.symbols, user.tier)
-        if cached_signals:
-            return SignalResponse(
-                signals=cached_signals,
-                request_id=request_id,
-                cached=True,
-                rate_limit=self._get_rate_limit_status(user)
-            )
-        
-        # Fetch market data
-        market_data_list = await self._fetch_market_data(
-            request.symbols,
-            request.lookback_days
+        # Per-symbol cache, shared by the tiers using the same analyzer configuration:
+        # only symbols without an entry are fetched and analyzed
+        analyzer_key = self._analyzer_cache_key(user.tier)
+        entries = await asyncio.to_thread(
+            self._get_cached_signals, request.symbols, analyzer_key, request.lookback_days
         )
-        
-        # Generate signals
-        signals = []
-        for market_data in market_data_list:
-            signal = await self._generate_signal_for_symbol(
-                market_data,
-                user.tier,
-                request.indicators
+        missing = [symbol for symbol in request.symbols if symbol not in entries]
+        
+        if missing:
+            # Concurrent requests missing the same symbols share one computation
+            # (across workers too, through the cache)
+            flight = f"{analyzer_key}:{request.lookback_days}:{','.join(sorted(set(missing)))}"
+            fresh = await self._inflight.do(
+                flight,
+                lambda: self._compute_entries(missing, user.tier, analyzer_key, request.lookback_days),
+                load=lambda: self._load_entries(missing, analyzer_key, request.lookback_days)
             )
-            signals.append(signal)
-        
-        # Cache results
-        self._cache_signals(request.symbols, user.tier, signals)
-        
-        # Track usage for billing
-        await self._track_usage(user, request.symbols)
-        
-        return SignalResponse(
+            entries.update(fresh)
+        
+        market_data_list = [entries[symbol]['market_data'] for symbol in request.symbols if symbol in entries]
+        # Copies: tier decoration and the limits below modify signals, cache entries
+        # must stay as generated
+        signals = self._decorate_signals([
+            entries[symbol]['signal'].copy(update={'expected_value': entries[symbol].get('expected_value')})
+            for symbol in request.symbols
+            if symbol in entries and entries[symbol]['signal'] is not None
+        ], user.tier)
+        
+        # Cap BUYs that are highly correlated with a stronger BUY
+        signals = await run_in_worker(self._apply_correlation_limit, signals, market_data_list)
+        
+        # Track usage for billing (fully cached responses are not billed)
+        if missing:
+            self._track_usage(user, endpoint, method, request.symbols, signals, market_data_list)
+        
+        return trusted(
+            SignalResponse,
             signals=signals,
             request_id=request_id,
-            cached=False,
+            cached=not missing,
             rate_limit=self._get_rate_limit_status(user)
         )
     
+    async def _compute_entries(
+        self,
+        symbols: List[str],
+        tier: UserTier,
+        analyzer_key: str,
+        lookback_days: int
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch, analyze and cache signal entries for symbols"""
+        # Fetch market data, with the expected-value benchmark unless it is
+        # cached (no round trip of its own)
+        benchmark_symbol, benchmark = await self._cached_benchmark(symbols, lookback_days)
+        extra = [benchmark_symbol] if benchmark_symbol and benchmark is None and benchmark_symbol not in symbols else []
+        fetched = await self._fetch_market_data(symbols + extra, lookback_days)
+        if benchmark_symbol and benchmark is None:
+            benchmark = next((md for md in fetched if md.symbol == benchmark_symbol), None)
+            if benchmark is not None:
+                await asyncio.to_thread(self.cache.set_market_data, benchmark_symbol, lookback_days, benchmark)
+        if extra:
+            fetched = [md for md in fetched if md.symbol != benchmark_symbol]
+        
+        # Generate signals for all symbols in one vectorized pass
+        batch = await run_in_worker(self._generate_signals_batch, fetched, tier)
+        generated = {s.symbol: s for s in batch}
+        
+        # Monte Carlo expected values over the configured scenarios
+        ev = await run_in_worker(
+            self._expected_values, [md for md in fetched if md.symbol in generated], benchmark
+        )
+        
+        # Market data is kept with the signal (None if the history is too short):
+        # request-level limits need every requested symbol's prices
+        entries = {
+            md.symbol: {'signal': generated.get(md.symbol), 'market_data': md, 'expected_value': ev.get(md.symbol)}
+            for md in fetched
+        }
+        await asyncio.to_thread(self._cache_signals, entries, analyzer_key, lookback_days)
+        return entries
+    
+    def _load_entries(
+        self,
+        symbols: List[str],
+        analyzer_key: str,
+        lookback_days: int
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Cached entries of all symbols, or None while any is missing"""
+        entries = self._get_cached_signals(symbols, analyzer_key, lookback_days)
+        return entries if all(symbol in entries for symbol in symbols) else None
+    
     def _check_user_limits(self, user: User, request: SignalRequest) -> bool:
         """Check if user can make this request"""
         limits = user.tier_limits
@@ -102,86 +266,190 @@ class SignalService:
     def _get_cached_signals(
         self,
         symbols: List[str],
-        tier: UserTier
-    ) -> Optional[List[TradingSignal]]:
-        """Get signals from cache if available"""
-        return self.cache.get_signals(symbols, tier.value)
+        analyzer_key: str,
+        lookback_days: int
+    ) -> Dict[str, Dict[str, Any]]:
+        """Cached signal entries (signal and market data) of the symbols that have one"""
+        return self.cache.get_symbol_signals(symbols, analyzer_key, lookback_days)
     
     def _cache_signals(
         self,
-        symbols: List[str],
-        tier: UserTier,
-        signals: List[TradingSignal]
+        entries: Dict[str, Dict[str, Any]],
+        analyzer_key: str,
+        lookback_days: int
     ):
-        """Cache generated signals"""
-        self.cache.set_signals(symbols, tier.value, signals)
+        """Cache signal entries per symbol"""
+        self.cache.set_symbol_signals(entries, analyzer_key, lookback_days)
     
     async def _fetch_market_data(
         self,
         symbols: List[str],
         lookback_days: int
-    ) -> List[MarketData]:
+    ) -> List[ColumnarMarketData]:
         """Fetch market data for symbols"""
-        # Use the existing pipeline function
-        df = fetch_prices(symbols, lookback_days)
+        # Use the existing pipeline function (blocking network I/O and rate-limit sleeps)
+        df = await asyncio.to_thread(fetch_prices, symbols, lookback_days)
         
-        # Convert to MarketData objects
+        # Columnar market data: no per-row models on the hot path
+        frames = dict(iter(df.groupby('symbol', sort=False))) if not df.empty else {}
         market_data_list = []
         for symbol in symbols:
-            symbol_df = df[df['symbol'] == symbol]
-            if symbol_df.empty:
+            symbol_df = frames.get(symbol)
+            if symbol_df is None:
                 continue
             
-            prices = []
-            for _, row in symbol_df.iterrows():
-                from investment_system.core.contracts import PricePoint
-                prices.append(PricePoint(
-                    timestamp=row['date'],
-                    open=Decimal(str(row['open'])),
-                    high=Decimal(str(row['high'])),
-                    low=Decimal(str(row['low'])),
-                    close=Decimal(str(row['close'])),
-                    volume=int(row['volume'])
-                ))
-            
-            market_data = MarketData(
-                symbol=symbol,
-                prices=prices,
-                is_stale=symbol_df['is_stale'].iloc[0] if 'is_stale' in symbol_df else False
-            )
-            market_data_list.append(market_data)
+            market_data_list.append(ColumnarMarketData.from_frame(
+                symbol,
+                symbol_df,
+                is_stale=bool(symbol_df['is_stale'].iloc[0]) if 'is_stale' in symbol_df else False
+            ))
         
         return market_data_list
     
+    def _analyzer_config(self, tier: UserTier, **params) -> Tuple[str, str]:
+        """Analyzer type and canonical parameters used for a tier"""
+        return TIER_ANALYZERS.get(tier, "technical"), json.dumps(params, sort_keys=True, default=str)
+    
+    def _analyzer_cache_key(self, tier: UserTier, **params) -> str:
+        """Signal cache key part of the tier's analyzer configuration (and bound hooks)"""
+        analyzer_type, config = self._analyzer_config(tier, **params)
+        key = analyzer_type if config == "{}" else f"{analyzer_type}{config}"
+        # Hooks change the signals: entries are shared only by services (workers,
+        # restarts) with the same registrations
+        return f"{key}@hooks-{self._hooks_key}" if self._ai_hooks else key
+    
+    def _hooks_digest(self) -> str:
+        """Digest of the hook registrations (names, handler identities and options)"""
+        registrations = sorted(
+            (hook_name, identity, json.dumps(options, sort_keys=True))
+            for hook_name, (_, options, identity) in self._ai_hooks.items()
+        )
+        return hashlib.sha256(json.dumps(registrations).encode()).hexdigest()[:16]
+    
+    def _get_analyzer(self, tier: UserTier, **params) -> BaseAnalyzer:
+        """Pooled analyzer for a tier and configuration with the AI hooks bound once"""
+        key = self._analyzer_config(tier, **params)
+        analyzer_type = key[0]
+        
+        pooled = self._analyzers.get(key)
+        if pooled is not None and pooled[0] == self._hooks_version:
+            return pooled[1]
+        
+        analyzer = self.analyzer_factory.create(analyzer_type, **params)
+        
+        # Register AI hooks if available
+        for hook_name, (handler, options, _) in self._ai_hooks.items():
+            analyzer.hooks.register(hook_name, handler, **options)
+        
+        self._analyzers[key] = (self._hooks_version, analyzer)
+        return analyzer
+    
+    def _generate_signals_batch(
+        self,
+        market_data_list: List[ColumnarMarketData],
+        tier: UserTier
+    ) -> List[TradingSignal]:
+        """Generate signals for many symbols with one analyze_many call (without tier decoration)"""
+        return self._get_analyzer(tier).analyze_many(market_data_list)
+    
+    def _decorate_signals(self, signals: List[TradingSignal], tier: UserTier) -> List[TradingSignal]:
+        """Add tier-specific enhancements (in place)"""
+        if tier in [UserTier.PRO, UserTier.ENTERPRISE]:
+            for signal in signals:
+                signal.reasoning = self._generate_reasoning(signal)
+        return signals
+    
+    def hook_metrics(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """AI hook latency and outcome counters of the pooled analyzers, by analyzer type and config"""
+        metrics = {}
+        for (analyzer_type, config), (_, analyzer) in self._analyzers.items():
+            label = analyzer_type if config == "{}" else f"{analyzer_type}{config}"
+            metrics[label] = analyzer.hooks.metrics()
+        return metrics
+    
     async def _generate_signal_for_symbol(
         self,
-        market_data: MarketData,
+        market_data: Union[MarketData, ColumnarMarketData],
         tier: UserTier,
         indicators: Optional[List] = None
     ) -> TradingSignal:
         """Generate signal for a single symbol"""
         
-        # Select analyzer based on tier
-        if tier == UserTier.ENTERPRISE:
-            analyzer = self.analyzer_factory.create("ai_enhanced")
-        elif tier == UserTier.PRO:
-            analyzer = self.analyzer_factory.create("momentum")
-        else:
-            analyzer = self.analyzer_factory.create("technical")
-        
-        # Register AI hooks if available
-        if self._ai_hooks:
-            for hook_name, handler in self._ai_hooks.items():
-                analyzer.hooks.register(hook_name, handler)
-        
-        # Generate signal
-        signal = analyzer.analyze(market_data)
+        # Select analyzer based on tier and generate signal
+        signal = await run_in_worker(self._get_analyzer(tier).analyze, market_data)
         
         # Add tier-specific enhancements
-        if tier in [UserTier.PRO, UserTier.ENTERPRISE]:
-            signal.reasoning = self._generate_reasoning(signal)
-        
-        return signal
+        return self._decorate_signals([signal], tier)[0]
+    
+    def _apply_correlation_limit(
+        self,
+        signals: List[TradingSignal],
+        market_data_list: List[ColumnarMarketData]
+    ) -> List[TradingSignal]:
+        """Apply dynamic_risk_management.base_limits.max_correlation to BUY signals"""
+        settings = get_risk_settings()
+        buys = [s.symbol for s in signals if s.signal == "buy"]
+        if not settings.enabled or len(buys) < 2:
+            return signals
+        
+        engine = self.correlation
+        if engine is None or any(symbol not in engine for symbol in buys):
+            # No maintained engine for these symbols: use the fetched window
+            closes = self._closes_frame(market_data_list)
+            engine = RollingCorrelation.from_returns(price_returns(closes), settings.lookback_days)
+        
+        return cap_correlated_buys(signals, engine, settings.base_limits.max_correlation)
+    
+    async def _cached_benchmark(
+        self,
+        symbols: List[str],
+        lookback_days: int
+    ) -> Tuple[Optional[str], Optional[ColumnarMarketData]]:
+        """expected_value.benchmark_symbol (None when disabled) and its cached market data"""
+        settings = get_expected_value_settings()
+        if not settings.enabled:
+            return None, None
+        symbol = settings.benchmark_symbol
+        if symbol in symbols:
+            # Fetched with the request
+            return symbol, None
+        return symbol, await asyncio.to_thread(self.cache.get_market_data, symbol, lookback_days)
+    
+    def _expected_values(
+        self,
+        market_data_list: List[ColumnarMarketData],
+        benchmark: Optional[ColumnarMarketData]
+    ) -> Dict[str, float]:
+        """Expected value per symbol from a scenario simulation against the benchmark"""
+        settings = get_expected_value_settings()
+        if not settings.enabled or not market_data_list:
+            return {}
+        if benchmark is None:
+            logger.warning(f"No data for benchmark {settings.benchmark_symbol}; expected values skipped")
+            return {}
+        
+        closes = self._closes_frame(market_data_list)
+        market = np.log(pd.Series(benchmark.close, index=pd.DatetimeIndex(benchmark.timestamp))).diff()
+        # Each symbol is seeded by its own latest bar: its EV depends only on its
+        # history, not on the other symbols computed with it
+        seeds = [zlib.crc32(f"{md.symbol}:{md.timestamp[-1]}".encode()) for md in market_data_list]
+        ev = expected_values(closes, settings=settings, seed=seeds, market=market)['expected_value']
+        return {symbol: round(float(value), 4) for symbol, value in ev.items()}
+    
+    def _closes_frame(self, market_data_list: List[ColumnarMarketData]) -> pd.DataFrame:
+        """(dates x symbols) close prices of the fetched market data"""
+        if not market_data_list:
+            return pd.DataFrame()
+        first = market_data_list[0].timestamp
+        symbols = [md.symbol for md in market_data_list]
+        if len(set(symbols)) == len(symbols) and all(np.array_equal(md.timestamp, first) for md in market_data_list):
+            # Shared bars (the common case): no index alignment needed
+            closes = np.column_stack([md.close for md in market_data_list])
+            return pd.DataFrame(closes, index=pd.DatetimeIndex(first), columns=symbols)
+        return pd.DataFrame({
+            md.symbol: pd.Series(md.close, index=pd.DatetimeIndex(md.timestamp))
+            for md in market_data_list
+        })
     
     def _generate_reasoning(self, signal: TradingSignal) -> str:
         """Generate human-readable reasoning for signal"""
@@ -207,20 +475,24 @@ class SignalService:
         
         return " | ".join(reasons)
     
-    async def _track_usage(self, user: User, symbols: List[str]):
-        """Track API usage for billing"""
-        # This would integrate with billing service
-        # For MVP, just log it
-        from investment_system.core.contracts import APIUsage
-        usage = APIUsage(
-            user_id=user.id,
-            endpoint="/signals",
-            method="GET",
-            units=len(symbols),
-            status_code=200
+    def _track_usage(
+        self,
+        user: User,
+        endpoint: str,
+        method: str,
+        symbols: List[str],
+        signals: List[TradingSignal],
+        market_data_list: List[ColumnarMarketData]
+    ):
+        """Track API usage for billing (queued, written to the store in batches)"""
+        get_usage_meter().record(
+            user.id,
+            endpoint=endpoint,
+            method=method,
+            symbols=symbols,
+            signals=len(signals),
+            data_points=sum(len(md) for md in market_data_list)
         )
-        # In production, save to database
-        print(f"Usage tracked: {user.id} used {len(symbols)} symbol queries")
     
     def _get_rate_limit_status(self, user: User) -> RateLimitStatus:
         """Get current rate limit status for user"""
@@ -228,7 +500,8 @@ class SignalService:
         
         # In production, query actual usage from database
         # For MVP, return mock data
-        return RateLimitStatus(
+        return trusted(
+            RateLimitStatus,
             limit=limits['api_calls'],
             remaining=max(0, limits['api_calls'] - 10),  # Mock: used 10 calls
             reset_at=datetime.utcnow().replace(hour=23, minute=59, second=59),
@@ -263,30 +536,114 @@ class SignalService:
         
         response = await self.generate_signals(request, user)
         return response.signals
+    
+    async def optimize_portfolio(
+        self,
+        user: User,
+        symbols: List[str],
+        lookback_days: int = 252
+    ) -> List[PortfolioCandidate]:
+        """Rank candidate portfolios from a symbol universe (premium feature)"""
+        if user.tier not in [UserTier.PRO, UserTier.ENTERPRISE]:
+            raise ValueError(ErrorCode.SUBSCRIPTION_REQUIRED)
+        
+        df = await asyncio.to_thread(fetch_prices, symbols, lookback_days)
+        closes = df.pivot_table(index='date', columns='symbol', values='close', aggfunc='last')
+        closes.index = pd.to_datetime(closes.index)
+        return await run_in_worker(build_portfolio, closes, self.correlation)
+    
+    async def analyze_universe(
+        self,
+        symbols: List[str],
+        lookback_days: int = 120,
+        analyzer_type: str = "technical",
+        workers: Optional[int] = None
+    ) -> List[TradingSignal]:
+        """
+        Generate signals for a large universe (nightly batch runs).
+        Symbols are sharded across a process pool; AI hooks are not applied.
+        """
+        df = await asyncio.to_thread(fetch_prices, symbols, lookback_days)
+        # The process pool does the work; waiting for it must not block the loop
+        return await asyncio.to_thread(analyze_sharded, df, analyzer_type, workers)
 
 
 class SignalAggregator:
-    """Aggregate signals from multiple sources (future feature)"""
+    """Aggregate signals from multiple sources
     
-    def __init__(self):
+    The panel is ordered and trimmed once for all sources, and sources run
+    concurrently inside one indicators.shared_kernels() block, so indicators
+    common to several sources are computed once.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None):
         self.sources = []
+        self.max_workers = max_workers
     
     def add_source(self, source: BaseAnalyzer, weight: float = 1.0):
         """Add a signal source with weight"""
         self.sources.append((source, weight))
     
-    def aggregate(self, market_data: MarketData) -> TradingSignal:
+    def aggregate(self, market_data: Union[MarketData, ColumnarMarketData]) -> TradingSignal:
         """Aggregate signals from all sources"""
-        if not self.sources:
-            raise ValueError("No signal sources configured")
+        signals = self.aggregate_many([market_data])
+        if not signals:
+            raise ValueError(f"Not enough history to analyze {market_data.symbol}")
+        return signals[0]
+    
+    def aggregate_many(
+        self,
+        panel: Union[pd.DataFrame, List[Union[MarketData, ColumnarMarketData]]]
+    ) -> List[TradingSignal]:
+        """
+        Aggregated signal of every symbol in a panel.
         
-        signals = []
-        weights = []
+        Args:
+            panel: Long price data or a list of (columnar) MarketData, as for
+                BaseAnalyzer.analyze_many
         
-        for source, weight in self.sources:
-            signal = source.analyze(market_data)
-            signals.append(signal)
-            weights.append(weight)
+        Returns:
+            One signal per symbol that at least one source could analyze, in
+            order of first appearance
+        """
+        if not self.sources:
+            raise ValueError("No signal sources configured")
+        if not isinstance(panel, pd.DataFrame):
+            panel = market_data_panel(panel)
+        
+        # One ordered panel holding the longest trailing window any source needs
+        windows = [source.indicator_window() for source, _ in self.sources]
+        window = None if any(w is None for w in windows) else max(windows)
+        ordered, bars = prepare_panel(panel, window)
+        
+        def evaluate(source: BaseAnalyzer) -> List[TradingSignal]:
+            # pre_analysis hooks change a source's input, so it needs its own panel
+            if source.hooks.has("pre_analysis"):
+                return source.analyze_many(panel)
+            return source.analyze_prepared(ordered, bars)
+        
+        with indicators.shared_kernels():
+            with ThreadPoolExecutor(max_workers=self.max_workers or len(self.sources)) as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, evaluate, source)
+                    for source, _ in self.sources
+                ]
+                source_signals = [future.result() for future in futures]
+        
+        by_symbol: Dict[str, List[Tuple[TradingSignal, float]]] = {}
+        for signals, (_, weight) in zip(source_signals, self.sources):
+            for signal in signals:
+                by_symbol.setdefault(signal.symbol, []).append((signal, weight))
+        
+        return [
+            self._combine(symbol, by_symbol[symbol])
+            for symbol in pd.unique(ordered['symbol']) if symbol in by_symbol
+        ]
+    
+    def _combine(self, symbol: str, entries: List[Tuple[TradingSignal, float]]) -> TradingSignal:
+        """Weighted combination of the sources' signals for one symbol"""
+        signals = [signal for signal, _ in entries]
+        weights = [weight for _, weight in entries]
         
         # Weighted average of confidence
         total_weight = sum(weights)
@@ -314,13 +671,14 @@ class SignalAggregator:
         }
         
         # Create aggregated signal
-        return TradingSignal(
-            symbol=market_data.symbol,
+        return trusted(
+            TradingSignal,
+            symbol=symbol,
             signal=final_signal_type,
-            confidence=weighted_confidence,
-            price=market_data.latest_price,
+            confidence=round(weighted_confidence, 4),
+            price=signals[0].price,
             indicators=avg_indicators,
-            reasoning=f"Aggregated from {len(self.sources)} sources",
+            reasoning=f"Aggregated from {len(signals)} sources",
             ai_enhanced=any(s.ai_enhanced for s in signals)
         )
 
@@ -0,0 +1,289 @@
+"""
+Write-behind usage metering for billing.
+
+Requests record usage events into an in-memory queue (a deque append, no
+I/O on the request path). A background thread writes queued events to the
+store in one bulk insert when batch_size events are pending or every
+flush_interval seconds, and once more at shutdown. Usage statistics flush
+pending events first, so they include every request recorded so far.
+
+Distinct symbols are counted with a HyperLogLog sketch per user and billing
+period, updated as requests are recorded (constant memory per user, O(1)
+count). Flushes merge changed sketches into the stored ones and take the
+merged result back, so each worker's counts include the other workers' as
+of its last flush.
+"""
+
+import atexit
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from investment_system.core.cardinality import HyperLogLog
+from investment_system.core.contracts import UsageStats
+from investment_system.db.store import StoreManager, get_store
+
+logger = logging.getLogger(__name__)
+
+SketchKey = Tuple[str, datetime, datetime]  # user_id, period_start, period_end
+
+BATCH_SIZE = 500  # Pending events that trigger a flush
+FLUSH_INTERVAL = 1.0  # Seconds between flushes of whatever is pending
+MAX_PENDING = 100_000  # Events kept while the store is unavailable (oldest dropped beyond)
+
+
+def billing_period(at: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """
+    Calendar month containing a timestamp.
+
+    Args:
+        at: Timestamp in the period (default: now, UTC)
+
+    Returns:
+        Period start and the start of the next period
+    """
+    at = at or datetime.utcnow()
+    start = at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if at.month == 12:
+        end = start.replace(year=at.year + 1, month=1)
+    else:
+        end = start.replace(month=at.month + 1)
+    return start, end
+
+
+class UsageMeter:
+    """Queues usage events and writes them to the store in batches"""
+
+    def __init__(
+        self,
+        store: Optional[StoreManager] = None,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_pending: int = MAX_PENDING
+    ):
+        """
+        Args:
+            store: Store the events are written to (default: the global store)
+            batch_size: Pending events that trigger a flush
+            flush_interval: Seconds between flushes of whatever is pending
+            max_pending: Events kept while writes fail (oldest dropped beyond)
+        """
+        self._store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_lock = threading.Lock()
+        self._period = billing_period()
+        self._sketches: Dict[SketchKey, HyperLogLog] = {}
+        self._dirty: Set[SketchKey] = set()  # Sketches changed since their last merge
+        self._sketch_lock = threading.Lock()
+        self.stats = {'recorded': 0, 'flushed': 0, 'flushes': 0, 'dropped': 0}
+        self._stats_lock = threading.Lock()  # recorded (the others change under _flush_lock)
+
+    @property
+    def store(self) -> StoreManager:
+        if self._store is None:
+            self._store = get_store()
+        return self._store
+
+    def record(
+        self,
+        user_id: str,
+        endpoint: str,
+        method: str,
+        symbols: List[str],
+        signals: int = 0,
+        data_points: int = 0,
+        status_code: int = 200,
+        response_time_ms: Optional[int] = None
+    ):
+        """
+        Queue a usage event (never blocks on the store).
+
+        Args:
+            user_id: User the request is billed to
+            endpoint: Endpoint path
+            method: HTTP method
+            symbols: Symbols queried (one unit each)
+            signals: Signals returned
+            data_points: Market data rows the response is based on
+            status_code: Response status
+            response_time_ms: Response time, if measured
+        """
+        now = datetime.utcnow()
+        key = (user_id, *self._current_period(now))
+        with self._sketch_lock:
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                sketch = self._sketches[key] = HyperLogLog()
+            sketch.update(symbols)
+            self._dirty.add(key)
+
+        self._pending.append({
+            'user_id': user_id,
+            'endpoint': endpoint,
+            'method': method,
+            'units': len(symbols),
+            'symbols': ",".join(symbols),
+            'signals': signals,
+            'data_points': data_points,
+            'status_code': status_code,
+            'response_time_ms': response_time_ms,
+            'created_at': now,
+        })
+        with self._stats_lock:
+            self.stats['recorded'] += 1
+        if self._flusher is None:
+            self._start_flusher()
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    @property
+    def pending(self) -> int:
+        """Events recorded but not written yet"""
+        return len(self._pending)
+
+    def unique_symbols(self, user_id: str) -> int:
+        """
+        Distinct symbols a user queried in the current billing period, in O(1).
+
+        Counts the user's requests to this worker plus, once it has flushed
+        them, all workers' requests as of that flush.
+
+        Args:
+            user_id: User to count
+
+        Returns:
+            Estimated number of distinct symbols
+        """
+        key = (user_id, *self._current_period(datetime.utcnow()))
+        with self._sketch_lock:
+            sketch = self._sketches.get(key)
+            return sketch.count() if sketch is not None else 0
+
+    def flush(self) -> int:
+        """
+        Write all pending events to the store in one batch and merge changed
+        distinct-symbol sketches into the stored ones.
+
+        Returns:
+            Number of events written (0 if the write failed; they stay queued)
+        """
+        with self._flush_lock:
+            self._merge_sketches()
+            return self._write_events()
+
+    def _write_events(self) -> int:
+        batch = [self._pending.popleft() for _ in range(len(self._pending))]
+        if not batch:
+            return 0
+        try:
+            self.store.insert_usage_events(batch)
+        except Exception as e:
+            logger.error(f"Usage flush failed, keeping {len(batch)} events queued: {e}")
+            self._pending.extendleft(reversed(batch))
+            overflow = len(self._pending) - self.max_pending
+            for _ in range(max(0, overflow)):
+                self._pending.popleft()
+            if overflow > 0:
+                self.stats['dropped'] += overflow
+                logger.warning(f"Usage queue full, dropped {overflow} oldest events")
+            return 0
+        self.stats['flushed'] += len(batch)
+        self.stats['flushes'] += 1
+        return len(batch)
+
+    def usage_stats(
+        self,
+        user_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> UsageStats:
+        """
+        Aggregate a user's usage, including events not written yet.
+
+        Args:
+            user_id: User to aggregate
+            start: Period start (default: current billing period)
+            end: Period end, exclusive (default: current billing period)
+
+        Returns:
+            Usage statistics for the period
+        """
+        if start is None or end is None:
+            period_start, period_end = billing_period()
+            start = start or period_start
+            end = end or period_end
+        self.flush()
+        totals = self.store.get_usage_totals(user_id, start, end)
+        return UsageStats(user_id=user_id, period_start=start, period_end=end, **totals)
+
+    def close(self):
+        """Stop the background flusher and write what is still pending"""
+        self._closed = True
+        self._wake.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def _merge_sketches(self):
+        with self._sketch_lock:
+            changed = {key: self._sketches[key].copy() for key in self._dirty}
+            self._dirty.clear()
+        if not changed:
+            return
+        try:
+            merged = self.store.merge_usage_sketches(changed)
+        except Exception as e:
+            logger.error(f"Usage sketch merge failed, retrying on the next flush: {e}")
+            with self._sketch_lock:
+                self._dirty.update(changed)
+            return
+
+        now = datetime.utcnow()
+        with self._sketch_lock:
+            for key, total in merged.items():
+                self._sketches[key].merge(total)
+            # Sketches of past periods are complete in the store
+            for key in [k for k in self._sketches if k[2] <= now and k not in self._dirty]:
+                del self._sketches[key]
+
+    def _current_period(self, now: datetime) -> Tuple[datetime, datetime]:
+        if now >= self._period[1]:
+            self._period = billing_period(now)
+        return self._period
+
+    def _start_flusher(self):
+        with self._flusher_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._run, name="usage-flusher", daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+# Global meter instance
+_usage_meter: Optional[UsageMeter] = None
+_usage_meter_lock = threading.Lock()
+
+
+def get_usage_meter() -> UsageMeter:
+    """Get the global usage meter, creating it on first use"""
+    global _usage_meter
+    with _usage_meter_lock:
+        if _usage_meter is None:
+            _usage_meter = UsageMeter()
+        return _usage_meter
@@ -1,6 +1,10 @@
 import os
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+import pytest
+
 
 def _load_env_test():
     """Best-effort load of .env.test if python-dotenv is available."""
@@ -20,6 +24,8 @@ Path("runtime").mkdir(parents=True, exist_ok=True)
 
 # Set environment variables for tests (override if needed for compatibility)
 os.environ["ENVIRONMENT"] = os.environ.get("ENVIRONMENT", "test")
+# Validate contract models built through the trusted (unvalidated) fast path
+os.environ.setdefault("STRICT_CONTRACT_VALIDATION", "1")
 # Provide DATABASE_URL in a JSON object format so Pydantic BaseSettings can parse
 # the nested 'database' field correctly during import-time settings initialization.
 os.environ["DATABASE_URL"] = (
@@ -38,3 +44,76 @@ os.environ.setdefault(
     "0000000000000000000000000000000000000000000000000000000000000000",
 )
 os.environ.setdefault("JWT_SECRET_KEY", "test")
+
+
+# Imported after the environment is set up (settings are read at import time)
+from investment_system.core.analyzers import AnalyzerFactory
+from investment_system.core.contracts import ColumnarMarketData, MarketData
+from investment_system.infrastructure.cache import CacheManager
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    """Isolate a test from the global cache instance and analyzer registry."""
+    cache = CacheManager()
+    monkeypatch.setattr("investment_system.infrastructure.cache._cache_instance", cache)
+    monkeypatch.setattr(AnalyzerFactory, "_analyzers", dict(AnalyzerFactory._analyzers))
+    return cache
+
+
+class MarketFactory:
+    """Seeded random-walk market data in the layouts the tests need."""
+
+    start = "2024-01-01"
+
+    @staticmethod
+    def symbols(n_symbols: int) -> list:
+        """Distinct valid ticker symbols SAA, SAB, ..."""
+        return ["S" + chr(65 + i // 26) + chr(65 + i % 26) for i in range(n_symbols)]
+
+    def closes(self, n_symbols: int = 4, n_days: int = 120, seed: int = 3, drift: float = 0.0) -> pd.DataFrame:
+        """Wide close panel, one column per symbol."""
+        rng = np.random.default_rng(seed)
+        returns = rng.normal(drift, 0.02, (n_days, n_symbols))
+        return pd.DataFrame(
+            np.round(100 * np.exp(np.cumsum(returns, axis=0)), 4),
+            index=pd.date_range(self.start, periods=n_days),
+            columns=self.symbols(n_symbols),
+        )
+
+    def universe(self, n_symbols: int, n_days: int = 120, seed: int = 3, drift: float = 0.0) -> list:
+        """ColumnarMarketData per symbol of a close panel."""
+        closes = self.closes(n_symbols, n_days, seed, drift)
+        volume = np.random.default_rng(seed + 1).integers(1_000_000, 2_000_000, closes.shape)
+        return [
+            ColumnarMarketData(
+                symbol=symbol,
+                timestamp=closes.index,
+                open=close.values * 0.99, high=close.values * 1.01, low=close.values * 0.98,
+                close=close.values, volume=volume[:, i],
+            )
+            for i, (symbol, close) in enumerate(closes.items())
+        ]
+
+    def columnar(self, symbol: str = "AAPL", n_days: int = 120, seed: int = 3) -> ColumnarMarketData:
+        """Columnar market data for one named symbol."""
+        return self.universe(1, n_days, seed)[0].copy(update={'symbol': symbol})
+
+    def market_data(self, symbol: str = "AAPL", n_days: int = 120, seed: int = 3) -> MarketData:
+        """Row-wise (PricePoint) market data for one named symbol."""
+        return self.columnar(symbol, n_days, seed).to_market_data()
+
+    def prices(self, n_symbols: int = 3, n_days: int = 120, seed: int = 3, drift: float = 0.0) -> pd.DataFrame:
+        """Long price frame in the fetch_prices layout."""
+        return pd.concat([
+            md.frame().rename(columns={'timestamp': 'date'}).assign(
+                date=lambda df: df['date'].dt.date, symbol=md.symbol, is_stale=False
+            )
+            for md in self.universe(n_symbols, n_days, seed, drift)
+        ], ignore_index=True)
+
+
+@pytest.fixture
+def market() -> MarketFactory:
+    """Seeded random-walk market data factory."""
+    return MarketFactory()
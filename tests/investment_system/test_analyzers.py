@@ -0,0 +1,292 @@
+"""Tests for the modular analyzer system."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from investment_system.core import indicators
+from investment_system.core.analyzers import (
+    BREAKER_THRESHOLD, AIEnhancedAnalyzer, BaseAnalyzer, MomentumAnalyzer, TechnicalAnalyzer
+)
+from investment_system.core.contracts import AIHookResponse, ColumnarMarketData, IndicatorType, SignalType
+
+pytestmark = pytest.mark.usefixtures("fresh_cache")
+
+
+class CountingAnalyzer(TechnicalAnalyzer):
+    """Technical analyzer that counts indicator computations."""
+
+    calls = 0
+
+    def calculate_indicators(self, data):
+        CountingAnalyzer.calls += 1
+        return super().calculate_indicators(data)
+
+
+def test_indicator_cache_reuses_identical_inputs(market):
+    CountingAnalyzer.calls = 0
+    market_data = market.market_data()
+
+    first = CountingAnalyzer().analyze(market_data)
+    second = CountingAnalyzer().analyze(market_data)
+
+    assert CountingAnalyzer.calls == 1
+    assert first.indicators == second.indicators
+
+
+def test_indicator_cache_recomputes_when_data_changes(market):
+    CountingAnalyzer.calls = 0
+
+    CountingAnalyzer().analyze(market.market_data(seed=1))
+    CountingAnalyzer().analyze(market.market_data(seed=2))
+
+    assert CountingAnalyzer.calls == 2
+
+
+
+class WindowAnalyzer(BaseAnalyzer):
+    """Analyzer with a per-instance window that keeps the default indicator_params."""
+
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = window
+
+    def calculate_indicators(self, data):
+        return {IndicatorType.SMA_20: float(data['close'].tail(self.window).mean())}
+
+    def generate_signal(self, indicators):
+        return SignalType.HOLD
+
+    def calculate_confidence(self, indicators, signal):
+        return 0.5
+
+
+def test_indicator_cache_separates_instance_configurations_by_default(market):
+    market_data = market.market_data()
+
+    fast = WindowAnalyzer(5).analyze(market_data)
+    slow = WindowAnalyzer(50).analyze(market_data)
+
+    assert fast.indicators != slow.indicators
+    assert WindowAnalyzer(5).indicator_params() != WindowAnalyzer(50).indicator_params()
+
+@pytest.mark.parametrize("analyzer_class", [TechnicalAnalyzer, MomentumAnalyzer])
+def test_analyze_history_matches_single_bar_analysis(analyzer_class, market):
+    analyzer = analyzer_class()
+    df = analyzer._market_data_to_df(market.market_data(n_days=70))
+
+    history = analyzer.analyze_history(df)
+
+    assert len(history) == len(df) - analyzer.min_history + 1
+    for end in (analyzer.min_history, 30, len(df)):
+        signal = analyzer.analyze_frame("AAPL", df.iloc[:end])
+        row = history[history['timestamp'] == df['timestamp'].iloc[end - 1]].iloc[0]
+        assert row['signal'] == signal.signal.value
+        assert row['confidence'] == pytest.approx(signal.confidence)
+        for indicator, value in signal.indicators.items():
+            assert row[indicator.value] == pytest.approx(value, nan_ok=True)
+
+
+def test_analyze_history_handles_many_symbols(market):
+    analyzer = TechnicalAnalyzer()
+    frames = []
+    for i, symbol in enumerate(["AAPL", "MSFT"]):
+        df = analyzer._market_data_to_df(market.market_data(symbol, n_days=60, seed=i))
+        frames.append(df.assign(symbol=symbol))
+    panel = pd.concat(frames, ignore_index=True)
+
+    history = analyzer.analyze_history(panel)
+
+    single = analyzer.analyze_history(frames[1].drop(columns='symbol'))
+    msft = history[history['symbol'] == "MSFT"].reset_index(drop=True)
+    pd.testing.assert_frame_equal(msft.drop(columns='symbol'), single)
+
+
+@pytest.mark.parametrize("analyzer_class", [TechnicalAnalyzer, MomentumAnalyzer, AIEnhancedAnalyzer])
+def test_analyze_many_matches_per_symbol_analysis(analyzer_class, market):
+    universe = [market.market_data(symbol, n_days=60, seed=i) for i, symbol in enumerate(["AAPL", "MSFT", "NVDA"])]
+    universe.append(market.market_data("NEW", n_days=5, seed=9))  # too short for momentum
+
+    batch = analyzer_class().analyze_many(universe)
+
+    expected = [
+        analyzer_class().analyze(md) for md in universe if len(md.prices) >= analyzer_class().min_history
+    ]
+    assert [s.symbol for s in batch] == [s.symbol for s in expected]
+    for got, want in zip(batch, expected):
+        assert got.signal == want.signal
+        assert got.confidence == pytest.approx(want.confidence)
+        assert got.price == want.price
+        for indicator, value in want.indicators.items():
+            assert got.indicators[indicator] == value or (np.isnan(value) and np.isnan(got.indicators[indicator]))
+
+
+def test_analyze_many_batches_hooks(market):
+    universe = [market.market_data(symbol, n_days=60, seed=i) for i, symbol in enumerate(["AAPL", "MSFT"])]
+    calls = []
+
+    def batch_override(request):
+        calls.append(len(request.data["inputs"]))
+        outputs = [SignalType.HOLD] * len(request.data["inputs"])
+        return AIHookResponse(hook_id=request.hook_id, processed_data={"outputs": outputs},
+                              modifications_made=True, confidence=1.0)
+
+    def boost(request):
+        return AIHookResponse(hook_id=request.hook_id, processed_data={"output": 0.9},
+                              modifications_made=True, confidence=1.0)
+
+    analyzer = TechnicalAnalyzer()
+    analyzer.hooks.register("signal_override", batch_override, batch=True)
+    analyzer.hooks.register("confidence_adjustment", boost)
+
+    signals = analyzer.analyze_many(universe)
+
+    assert calls == [2]
+    assert all(s.signal == SignalType.HOLD and s.confidence == 0.9 and s.ai_enhanced for s in signals)
+    assert analyzer.analyze(universe[0]).signal == SignalType.HOLD
+
+
+def test_columnar_market_data_round_trip(market):
+    market_data = market.market_data(n_days=30)
+    columnar = ColumnarMarketData.from_market_data(market_data)
+
+    assert len(columnar) == 30
+    assert columnar.latest_price == market_data.latest_price
+    assert columnar.to_market_data().prices == market_data.prices
+    from_columns = TechnicalAnalyzer().analyze(columnar)
+    from_rows = TechnicalAnalyzer().analyze(market_data)
+    assert (from_columns.signal, from_columns.confidence, from_columns.price) == (
+        from_rows.signal, from_rows.confidence, from_rows.price
+    )
+    assert from_columns.indicators == from_rows.indicators
+
+    with pytest.raises(ValueError):
+        ColumnarMarketData(symbol="AAPL", timestamp=[datetime(2024, 1, 1)], open=[1.0], high=[1.0],
+                           low=[1.0], close=[-1.0], volume=[1])
+    with pytest.raises(ValueError):
+        ColumnarMarketData(symbol="AAPL", timestamp=[datetime(2024, 1, 1)], open=[1.0, 2.0], high=[1.0],
+                           low=[1.0], close=[1.0], volume=[1])
+
+
+@pytest.mark.parametrize("n_days", [3, 7, 14, 15, 16, 60, 250])
+def test_latest_indicators_match_full_series(n_days):
+    rng = np.random.default_rng(n_days)
+    for close in (
+        pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))),
+        pd.Series(np.full(n_days, 100.0)),                     # flat: RSI undefined
+        pd.Series(100 + np.arange(n_days, dtype=float)),       # no losses: RSI 100
+    ):
+        for period in (7, 14):
+            full = indicators.rsi(close, period).iloc[-1]
+            assert indicators.latest_rsi(close, period) == pytest.approx(full, nan_ok=True, rel=1e-12)
+        for window in (5, 20, 50):
+            full = close.rolling(window).mean().iloc[-1]
+            assert indicators.latest_mean(close, window) == pytest.approx(full, nan_ok=True, rel=1e-12)
+
+
+def test_analyze_many_reads_trailing_window(market):
+    market_data = market.market_data(n_days=250)
+    analyzer = TechnicalAnalyzer()
+    tail = ColumnarMarketData.from_market_data(market_data).frame().iloc[-analyzer.indicator_window():]
+
+    signal = analyzer.analyze_many([market_data])[0]
+
+    assert signal.indicators == analyzer.analyze_frame("AAPL", tail.reset_index(drop=True)).indicators
+    assert signal.indicators == analyzer.analyze(market_data).indicators
+
+
+def test_round_indicator_splits_ties_consistently():
+    assert indicators.round_indicator(100.555) == 100.56
+    assert indicators.round_indicator(np.nextafter(100.555, 0)) == 100.56
+    assert indicators.round_indicator(-2.345) == -2.35
+    assert np.isnan(indicators.round_indicator(np.nan))
+
+
+def test_async_hooks_run_concurrently_within_timeout(market):
+    universe = [market.market_data(symbol, n_days=60, seed=i) for i, symbol in enumerate(["AAPL", "MSFT", "NVDA", "AMZN"])]
+
+    async def slow_boost(request):
+        await asyncio.sleep(0.2)
+        return AIHookResponse(hook_id=request.hook_id, processed_data={"output": 0.9},
+                              modifications_made=True, confidence=1.0)
+
+    async def stuck(request):
+        await asyncio.sleep(10)
+
+    analyzer = TechnicalAnalyzer()
+    analyzer.hooks.register("confidence_adjustment", slow_boost)
+    analyzer.hooks.register("signal_override", stuck, timeout=0.1)
+
+    started = time.perf_counter()
+    signals = analyzer.analyze_many(universe)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    assert [s.confidence for s in signals] == [0.9] * 4
+    assert [s.signal for s in signals] == [s.signal for s in TechnicalAnalyzer().analyze_many(universe)]
+    metrics = analyzer.hooks.metrics()
+    assert metrics["signal_override:test_async_hooks_run_concurrently_within_timeout.<locals>.stuck"]["timeouts"] == 4
+    assert metrics["confidence_adjustment:test_async_hooks_run_concurrently_within_timeout.<locals>.slow_boost"]["mean_ms"] >= 200
+
+
+def test_failing_hook_is_skipped_after_repeated_errors():
+    calls = []
+
+    def broken(request):
+        calls.append(request)
+        raise RuntimeError("model unavailable")
+
+    analyzer = TechnicalAnalyzer()
+    analyzer.hooks.register("confidence_adjustment", broken)
+
+    for _ in range(BREAKER_THRESHOLD + 2):
+        assert analyzer.hooks.execute("confidence_adjustment", 0.5) == 0.5
+
+    assert len(calls) == BREAKER_THRESHOLD
+    stats = next(iter(analyzer.hooks.metrics().values()))
+    assert (stats["failures"], stats["skipped"]) == (BREAKER_THRESHOLD, 2)
+
+
+def test_hook_stats_are_exact_under_concurrent_calls():
+    def boost(request):
+        return AIHookResponse(hook_id=request.hook_id, processed_data={"output": 0.9},
+                              modifications_made=True, confidence=1.0)
+
+    analyzer = TechnicalAnalyzer()
+    analyzer.hooks.register("confidence_adjustment", boost)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        outputs = list(pool.map(lambda _: analyzer.hooks.execute_many("confidence_adjustment", [0.5] * 10), range(200)))
+
+    assert all(output == [0.9] * 10 for output in outputs)
+    stats = next(iter(analyzer.hooks.metrics().values()))
+    assert (stats["calls"], stats["failures"], stats["skipped"]) == (2000, 0, 0)
+
+
+def test_analyzers_without_indicator_history_fall_back_to_per_symbol_analysis(market):
+    universe = [market.market_data(symbol, n_days=60, seed=i) for i, symbol in enumerate(["AAPL", "MSFT"])]
+    analyzer = WindowAnalyzer(5)
+
+    assert not analyzer.supports_history and TechnicalAnalyzer().supports_history
+    assert [s.indicators for s in analyzer.analyze_many(universe)] == [analyzer.analyze(md).indicators for md in universe]
+    with pytest.raises(ValueError):
+        analyzer.analyze_history(analyzer._market_data_to_df(universe[0]))
+
+
+def test_errors_inside_indicator_history_are_not_swallowed(market):
+    class BrokenHistory(TechnicalAnalyzer):
+        def indicator_history(self, data, groups=None):
+            raise NotImplementedError("half-finished")
+
+    with pytest.raises(NotImplementedError, match="half-finished"):
+        BrokenHistory().analyze_many([market.market_data(n_days=60)])
+
+
+def test_momentum_min_history_follows_long_window():
+    assert MomentumAnalyzer().min_history == 10
+    assert MomentumAnalyzer(long_window=20).min_history == 20
@@ -0,0 +1,181 @@
+"""Tests for the vectorized backtesting engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from investment_system.backtest.engine import (
+    BUY,
+    HOLD,
+    SELL,
+    PricePanel,
+    backtest,
+    positions_from_signals,
+    price_panel,
+    run_backtest,
+    signal_matrix,
+    trade_log,
+)
+from investment_system.backtest.sweep import _evaluate_chunk, panel_arrays, parameter_grid, run_sweep
+from investment_system.backtest.walk_forward import walk_forward, walk_forward_folds
+from investment_system.core.analyzers import TechnicalAnalyzer
+from investment_system.infrastructure.shared_memory import SharedArrays
+
+
+def make_panel(close) -> PricePanel:
+    close = np.asarray(close, dtype=float)
+    if close.ndim == 1:
+        close = close[:, None]
+    return PricePanel(
+        dates=pd.date_range('2024-01-01', periods=close.shape[0]).values,
+        symbols=[f"S{chr(65 + i)}" for i in range(close.shape[1])],
+        close=close,
+    )
+
+
+def test_positions_hold_until_sell():
+    signals = np.array([[HOLD], [BUY], [HOLD], [SELL], [HOLD]], dtype=np.int8)
+
+    assert positions_from_signals(signals).ravel().tolist() == [0, 1, 1, 0, 0]
+    assert positions_from_signals(signals, allow_short=True).ravel().tolist() == [0, 1, 1, -1, -1]
+
+
+def test_single_trade_metrics():
+    panel = make_panel([10, 11, 12, 11, 10])
+    signals = np.array([[BUY], [HOLD], [SELL], [HOLD], [HOLD]], dtype=np.int8)
+
+    result = run_backtest(panel, signals)
+    metrics = result.metrics.iloc[0]
+
+    # Long from close 10 to close 12, flat afterwards
+    assert metrics['total_return'] == pytest.approx(0.2)
+    assert metrics['max_drawdown'] == 0
+    assert metrics['trades'] == 1
+    assert metrics['win_rate'] == 1.0
+
+
+def test_trade_log_lists_closed_trades():
+    panel = make_panel([10, 11, 12, 11, 10, 11])
+    signals = np.array([[BUY], [HOLD], [SELL], [BUY], [HOLD], [HOLD]], dtype=np.int8)
+
+    trades = trade_log(run_backtest(panel, signals))
+
+    assert len(trades) == 1  # second trade is still open
+    trade = trades.iloc[0]
+    assert trade['symbol'] == "SA"
+    assert (trade['entry'], trade['exit']) == (panel.dates[0], panel.dates[2])
+    assert trade['return'] == pytest.approx(0.2)
+    assert len(trade_log(run_backtest(panel, signals), include_open=True)) == 2
+
+
+def test_costs_reduce_returns():
+    panel = make_panel([10, 11, 12, 11, 10])
+    signals = np.array([[BUY], [HOLD], [SELL], [HOLD], [HOLD]], dtype=np.int8)
+
+    free = run_backtest(panel, signals).metrics['total_return'].iloc[0]
+    costly = run_backtest(panel, signals, cost_bps=50).metrics['total_return'].iloc[0]
+
+    assert costly < free
+
+
+def test_drawdown_and_losing_trade():
+    panel = make_panel([10, 12, 9, 9, 9])
+    signals = np.array([[BUY], [HOLD], [SELL], [HOLD], [HOLD]], dtype=np.int8)
+
+    metrics = run_backtest(panel, signals).metrics.iloc[0]
+
+    assert metrics['max_drawdown'] == pytest.approx(9 / 12 - 1)
+    assert metrics['win_rate'] == 0.0
+
+
+def test_signal_matrix_aligns_history_to_panel(market):
+    df = market.prices(n_days=300, drift=0.0005)
+    panel = price_panel(df)
+    history = TechnicalAnalyzer().analyze_history(df)
+
+    matrix = signal_matrix(history, panel)
+
+    assert matrix.shape == panel.close.shape
+    last = history.groupby('symbol').tail(1).set_index('symbol')['signal']
+    expected = [{'buy': BUY, 'sell': SELL, 'hold': HOLD}[last[s]] for s in panel.symbols]
+    assert matrix[-1].tolist() == expected
+
+
+@pytest.mark.parametrize("analyzer", [None, TechnicalAnalyzer()])
+def test_backtest_over_long_prices(analyzer, market):
+    result = backtest(market.prices(n_days=300, drift=0.0005), analyzer=analyzer)
+
+    assert list(result.metrics.index) == market.symbols(3)
+    assert result.equity.shape == (300, 3)
+    assert np.isfinite(result.metrics['sharpe']).all()
+
+
+GRID = {'rsi_oversold': [25, 30], 'rsi_overbought': [70, 80], 'sma_fast': [10, 20]}
+
+
+def test_sweep_matches_individual_backtests(market):
+    df = market.prices(n_days=300, drift=0.0005)
+
+    table = run_sweep(df, GRID, workers=1)
+
+    assert len(table) == len(parameter_grid(GRID))
+    for _, row in table.iterrows():
+        config = {name: int(row[name]) for name in GRID}
+        metrics = backtest(df, analyzer=TechnicalAnalyzer(**config)).metrics
+        assert row['total_return'] == pytest.approx(metrics['total_return'].mean(), rel=1e-5)
+        assert row['trades'] == metrics['trades'].sum()
+
+
+def test_sweep_process_pool_matches_in_process(tmp_path, market):
+    df = market.prices(n_days=300, drift=0.0005)
+    output = tmp_path / "sweep.parquet"
+
+    pooled = run_sweep(df, GRID, workers=2, output=str(output))
+    single = run_sweep(df, GRID, workers=1)
+
+    pd.testing.assert_frame_equal(pooled, single)
+    pd.testing.assert_frame_equal(pd.read_parquet(output), single)
+
+
+def test_sweep_workers_evaluate_read_only_shared_views(market):
+    seen = {}
+
+    def evaluate(arrays, analyzer_type, configs):
+        seen.update({name: (array.flags.writeable, array.flags.owndata) for name, array in arrays.items()})
+        return [config['sma_fast'] for config in configs]
+
+    with SharedArrays.create(panel_arrays(market.prices())) as shared:
+        assert _evaluate_chunk(shared.spec, evaluate, "technical", [{'sma_fast': 10}, {'sma_fast': 20}]) == [10, 20]
+
+    assert seen == {'close': (False, False), 'volume': (False, False)}
+
+
+def test_walk_forward_folds_tile_test_windows():
+    folds = walk_forward_folds(100, train_size=40, test_size=20)
+
+    assert [(f.train_start, f.train_end, f.test_end) for f in folds] == [(0, 40, 60), (20, 60, 80), (40, 80, 100)]
+    with pytest.raises(ValueError):
+        walk_forward_folds(50, train_size=40, test_size=20)
+
+
+def test_walk_forward_scores_match_fold_backtests(market):
+    df = market.prices(n_days=300, drift=0.0005)
+    result = walk_forward(df, GRID, train_size=150, test_size=50, workers=2)
+
+    assert len(result.evaluations) == len(parameter_grid(GRID)) * len(result.folds)
+    assert len(result.selected) == len(result.folds)
+
+    # Indicators come from the full history; signals and positions restart at the window
+    fold = result.folds[1]
+    row = result.selected.iloc[1]
+    config = {name: int(row[name]) for name in GRID}
+    history = TechnicalAnalyzer(**config).analyze_history(df)
+    panel = price_panel(df)
+    window = PricePanel(panel.dates[fold.train_end:fold.test_end], panel.symbols,
+                        panel.close[fold.train_end:fold.test_end])
+    signals = signal_matrix(history, panel)[fold.train_end:fold.test_end]
+    expected = run_backtest(window, signals).metrics
+
+    assert row['test_total_return'] == pytest.approx(expected['total_return'].mean(), rel=1e-5)
+    fold_rows = result.evaluations[result.evaluations['fold'] == 1]
+    assert row['train_portfolio_sharpe'] == fold_rows['train_portfolio_sharpe'].max()
@@ -0,0 +1,63 @@
+"""Tests for the cache backends under concurrent use."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from investment_system.infrastructure.cache import CacheManager, MemoryCacheBackend
+
+
+def test_threads_reading_expired_entries_do_not_fail():
+    backend = MemoryCacheBackend()
+    keys = [f"k{i}" for i in range(2000)]
+    for key in keys:
+        backend.set(key, key, ttl=60)
+        backend._cache[key]['expires_at'] = datetime.utcnow() - timedelta(seconds=1)
+
+    def read(op):
+        return [op(key) for key in keys]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(read, [backend.get, backend.exists, backend.delete] * 8))
+
+    assert all(value in (None, False, True) for result in results for value in result)
+    assert backend._cache == {}
+
+
+def test_stats_are_exact_under_concurrent_use():
+    cache = CacheManager()
+    cache.set("hit", 1)
+
+    def work(_):
+        for _ in range(500):
+            cache.get("hit")
+            cache.get("miss")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(8)))
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses']) == (4000, 4000)
+
+
+def test_add_and_compare_and_delete():
+    cache = CacheManager()
+
+    assert cache.add("lock", "a", ttl=30)
+    assert not cache.add("lock", "b", ttl=30)
+    assert not cache.compare_and_delete("lock", "b")
+    assert cache.compare_and_delete("lock", "a")
+    assert not cache.exists("lock")
+
+
+def test_memory_backend_is_bounded():
+    backend = MemoryCacheBackend(max_entries=3)
+    backend.set("expired", 0, ttl=60)
+    backend._cache["expired"]['expires_at'] = datetime.utcnow() - timedelta(seconds=1)
+    for key in ["a", "b"]:
+        backend.set(key, key, ttl=60)
+    backend.get("a")  # Recently used
+
+    backend.set("c", "c", ttl=60)  # Full: expired entries go first
+    backend.set("d", "d", ttl=60)  # Then the least recently used
+
+    assert list(backend._cache) == ["a", "c", "d"]
@@ -0,0 +1,60 @@
+"""Tests for trusted construction of contract models."""
+
+from decimal import Decimal
+
+import pytest
+
+from investment_system.core import contracts
+from investment_system.core.contracts import IndicatorType, SignalType, TradingSignal, trusted
+
+
+@pytest.fixture
+def strict(request):
+    """Set strict validation for one test, restoring the previous mode."""
+    previous = contracts._strict_validation
+    contracts.set_strict_validation(request.param)
+    yield request.param
+    contracts.set_strict_validation(previous)
+
+
+def signal_values(**overrides):
+    values = dict(
+        symbol="AAPL",
+        signal=SignalType.BUY,
+        confidence=0.75,
+        price=Decimal("151.2"),
+        indicators={IndicatorType.RSI: 45.0},
+    )
+    values.update(overrides)
+    return values
+
+
+def test_tests_run_with_strict_validation():
+    assert contracts._strict_validation
+
+
+@pytest.mark.parametrize("strict", [False, True], indirect=True)
+def test_trusted_model_equals_validated_model(strict):
+    signal = trusted(TradingSignal, **signal_values())
+    expected = TradingSignal(**signal_values())
+
+    assert signal.dict(exclude={'created_at'}) == expected.dict(exclude={'created_at'})
+    assert signal.created_at is not None
+
+
+@pytest.mark.parametrize("strict", [False], indirect=True)
+def test_trusted_construction_skips_validators(strict):
+    signal = trusted(TradingSignal, **signal_values(confidence=0.123456))
+
+    assert signal.confidence == 0.123456
+
+
+@pytest.mark.parametrize("strict", [True], indirect=True)
+@pytest.mark.parametrize("overrides", [
+    {'confidence': 0.123456},  # validator would round
+    {'confidence': 1.5},  # out of range
+    {'symbol': "brk.b"},
+])
+def test_strict_validation_rejects_values_validation_would_change(strict, overrides):
+    with pytest.raises(ValueError):
+        trusted(TradingSignal, **signal_values(**overrides))
@@ -0,0 +1,215 @@
+"""Tests for risk sizing and limits."""
+
+from decimal import Decimal
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config.settings import (
+    ExpectedValueSettings,
+    KellyCriterionSettings,
+    PortfolioScoringSettings,
+    TargetPositions,
+    get_kelly_settings,
+)
+from investment_system.core.contracts import SignalType, TradingSignal
+from investment_system.risk.correlation import RollingCorrelation, cap_correlated_buys
+from investment_system.risk.expected_value import expected_values
+from investment_system.risk.kelly import KellySizer, kelly_table
+from investment_system.risk.portfolio import optimize_portfolio, symbol_metrics
+
+
+def make_trades(n_trades: int = 600, seed: int = 5) -> pd.DataFrame:
+    """Random trade log over a few years for three symbols."""
+    rng = np.random.default_rng(seed)
+    exits = pd.Timestamp('2021-01-04') + pd.to_timedelta(np.sort(rng.integers(0, 1000, n_trades)), unit='D')
+    return pd.DataFrame({
+        'symbol': rng.choice(['AAA', 'BBB', 'CCC'], n_trades),
+        'exit': exits,
+        'return': rng.normal(0.004, 0.03, n_trades),
+    })
+
+
+def test_settings_load_from_config_json():
+    settings = get_kelly_settings()
+
+    assert settings.lookback_period_days == 252
+    assert settings.max_kelly_fraction == 0.25
+
+
+def test_kelly_table_caps_and_floors():
+    trades = pd.DataFrame({
+        'symbol': ['EDGE'] * 60 + ['FEW'] * 10,
+        'exit': pd.date_range('2024-01-01', periods=70, freq='B'),
+        'return': [0.02] * 36 + [-0.01] * 24 + [0.02] * 10,
+    })
+
+    table = kelly_table(trades)
+
+    edge = table.loc['EDGE']
+    assert edge['win_rate'] == pytest.approx(0.6)
+    assert edge['payoff'] == pytest.approx(2.0)
+    assert edge['edge'] == pytest.approx(0.8)
+    assert edge['kelly'] == pytest.approx(0.4)
+    assert edge['fraction'] == pytest.approx(0.2)  # half Kelly, under the 0.25 cap
+    assert table.loc['FEW', 'fraction'] == 0  # below min_trades_required
+
+
+def test_incremental_sizer_matches_batch_table():
+    trades = make_trades()
+    settings = KellyCriterionSettings(min_trades_required=10, min_win_rate=0.0, min_edge_threshold=0.0)
+    sizer = KellySizer(settings)
+
+    previous = pd.Timestamp.min
+    for as_of in pd.date_range('2021-06-30', '2023-09-30', freq='QE'):
+        sizer.add_trades(trades[(trades['exit'] > previous) & (trades['exit'] <= as_of)])
+        sizer.advance(as_of)
+        previous = as_of
+
+        expected = kelly_table(trades[trades['exit'] <= as_of], settings, as_of=as_of)
+        actual = sizer.table().reindex(expected.index)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, atol=1e-9)
+        assert sizer.fraction('AAA') == pytest.approx(expected.loc['AAA', 'fraction'])
+
+
+def test_rolling_correlation_matches_full_recompute():
+    rng = np.random.default_rng(1)
+    returns = pd.DataFrame(rng.normal(size=(120, 5)), columns=list("ABCDE"))
+    engine = RollingCorrelation(list(returns.columns), window=30, refresh_every=40)
+
+    for i, row in enumerate(returns.to_numpy()):
+        engine.update(row)
+        if i in (10, 29, 77, 119):
+            window = returns.iloc[max(0, i - 29):i + 1]
+            np.testing.assert_allclose(engine.correlation(), window.corr().to_numpy(), atol=1e-10)
+            np.testing.assert_allclose(engine.covariance(["B", "D"]), window[["B", "D"]].cov().to_numpy(), atol=1e-10)
+
+
+def make_signal(symbol: str, signal: SignalType, confidence: float) -> TradingSignal:
+    return TradingSignal(symbol=symbol, signal=signal, confidence=confidence, price=Decimal("100"), indicators={})
+
+
+def test_correlated_buys_are_capped_to_hold():
+    rng = np.random.default_rng(2)
+    base = rng.normal(size=60)
+    returns = pd.DataFrame({
+        "AAA": base,
+        "BBB": base + rng.normal(scale=0.1, size=60),  # nearly identical to AAA
+        "CCC": rng.normal(size=60),
+    })
+    engine = RollingCorrelation.from_returns(returns, window=30)
+    signals = [
+        make_signal("AAA", SignalType.BUY, 0.6),
+        make_signal("BBB", SignalType.BUY, 0.8),
+        make_signal("CCC", SignalType.BUY, 0.7),
+    ]
+
+    capped = cap_correlated_buys(signals, engine, max_correlation=0.7)
+
+    # The weaker of the correlated pair is downgraded
+    assert [s.signal for s in capped] == [SignalType.HOLD, SignalType.BUY, SignalType.BUY]
+    assert "BBB" in capped[0].reasoning
+    assert signals[0].signal == SignalType.BUY
+
+
+def test_expected_values_are_reproducible_across_chunk_sizes(market):
+    closes = market.closes()
+
+    first = expected_values(closes, n_paths=600, seed=42)
+    chunked = expected_values(closes, n_paths=600, seed=42, max_bytes=1)
+    other = expected_values(closes, n_paths=600, seed=43)
+
+    pd.testing.assert_frame_equal(first, chunked)
+    assert not first['expected_value'].equals(other['expected_value'])
+
+
+def test_per_symbol_seeds_make_expected_values_independent_of_other_symbols(market):
+    closes = market.closes(n_symbols=4)
+    closes.iloc[:10, 3] = np.nan  # Shorter history on another calendar
+    market = np.log(market.closes(n_symbols=1, seed=9).iloc[:, 0]).diff()
+    seeds = [11, 12, 13, 14]
+
+    together = expected_values(closes, n_paths=600, seed=seeds, market=market)
+
+    for j, symbol in enumerate(closes.columns):
+        alone = expected_values(closes[[symbol]], n_paths=600, seed=seeds[j:j + 1], market=market)
+        pd.testing.assert_frame_equal(together.loc[[symbol]], alone)
+
+
+def test_symbol_metrics_do_not_depend_on_the_symbols_computed_with_them(fresh_cache, market, monkeypatch):
+    closes = market.closes()
+    together = symbol_metrics(closes, use_cache=False)
+    symbol_metrics(closes)
+    get_symbol_metrics = fresh_cache.get_symbol_metrics
+
+    # Recompute one symbol alone, the others coming from the cache
+    for symbol in closes.columns:
+        monkeypatch.setattr(fresh_cache, "get_symbol_metrics",
+                            lambda s, *key, missing=symbol: None if s == missing else get_symbol_metrics(s, *key))
+        pd.testing.assert_frame_equal(symbol_metrics(closes), together)
+
+
+def test_expected_values_follow_scenario_weights(market):
+    closes = market.closes()
+    bull = ExpectedValueSettings(scenario_weights={'bull_market': 1.0})
+    bear = ExpectedValueSettings(scenario_weights={'bear_market': 1.0})
+
+    bull_ev = expected_values(closes, n_paths=2000, settings=bull, seed=1)['expected_value']
+    bear_ev = expected_values(closes, n_paths=2000, settings=bear, seed=1)['expected_value']
+
+    assert (bull_ev > bear_ev).all()
+    assert bull_ev.mean() == pytest.approx(np.expm1(0.30 * 30 / 252), abs=0.02)
+
+
+def brute_force_score(metrics, corr, members, settings):
+    """Portfolio score recomputed from scratch."""
+    def ranks(values):
+        return ((values.rank() - 1) / (len(values) - 1)).to_numpy()
+    k = len(members)
+    mean_corr = (corr[np.ix_(members, members)].sum() - k) / (k * (k - 1))
+    optimal = settings.target_positions.optimal
+    diversification = min(k, optimal) / optimal * (1 - np.clip(mean_corr, 0, 1))
+    return (
+        settings.performance_weight * ranks(metrics['sharpe'])[members].mean()
+        + settings.ev_analysis_weight * ranks(metrics['expected_value'])[members].mean()
+        + settings.diversification_weight * diversification
+    )
+
+
+def test_greedy_portfolio_matches_exhaustive_search():
+    rng = np.random.default_rng(4)
+    factors = rng.normal(size=(200, 3)) @ rng.normal(size=(3, 12)) + rng.normal(size=(200, 12))
+    corr = np.corrcoef(factors.T)
+    metrics = pd.DataFrame(
+        {'sharpe': rng.normal(size=12), 'expected_value': rng.normal(size=12)},
+        index=[f"S{chr(65 + i)}" for i in range(12)]
+    )
+    settings = PortfolioScoringSettings(target_positions=TargetPositions(min=3, optimal=4, max=5))
+
+    candidates = optimize_portfolio(metrics, corr, settings)
+
+    assert sorted(len(c.symbols) for c in candidates) == [3, 4, 5]
+    assert [c.score for c in candidates] == sorted((c.score for c in candidates), reverse=True)
+    best = candidates[0]
+    members = [metrics.index.get_loc(symbol) for symbol in best.symbols]
+    assert best.score == pytest.approx(brute_force_score(metrics, corr, members, settings))
+    exhaustive = max(
+        brute_force_score(metrics, corr, list(combo), settings)
+        for k in (3, 4, 5) for combo in itertools.combinations(range(12), k)
+    )
+    assert best.score == pytest.approx(exhaustive)
+
+
+def test_symbol_metrics_reuse_cache(fresh_cache, market):
+    closes = market.closes()
+
+    first = symbol_metrics(closes)
+    misses = fresh_cache.get_stats()['misses']
+    second = symbol_metrics(closes)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert fresh_cache.get_stats()['misses'] == misses
+    assert fresh_cache.get_stats()['hits'] == len(closes.columns)
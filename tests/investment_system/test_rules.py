@@ -0,0 +1,79 @@
+"""Tests for the declarative rule engine."""
+
+import numpy as np
+import pytest
+
+from investment_system.core.analyzers import AnalyzerFactory, TechnicalAnalyzer
+from investment_system.core.contracts import SignalType
+from investment_system.core.rules import RuleAnalyzer, RuleSet, register_rule_analyzer
+
+pytestmark = pytest.mark.usefixtures("fresh_cache")
+
+# TechnicalAnalyzer's decision table with its default parameters
+TECHNICAL_RULES = """
+sma_20 > sma_50 and rsi_14 < 30 -> buy @ 0.8   # oversold uptrend
+sma_20 > sma_50 and rsi_14 > 70 -> sell
+sma_20 > sma_50 -> buy @ 0.55
+not (rsi_14 < 30) -> sell
+"""
+
+
+@pytest.mark.parametrize("source, message", [
+    ("x > 1 -> buy", "Unknown variable: x"),
+    ("rsi_14 < 30", "expected '<condition> -> <signal>'"),
+    ("rsi_14 + 1 -> buy", "Expected a condition"),
+    ("rsi_14 < 30 -> jump", "Line 1"),
+    ("rsi_14 < 30 -> buy\n\nclose > 1 -> jump", "Line 3"),
+    ("__import__('os') -> buy", "Unsupported expression"),
+    ("rsi_14 < 30 -> buy @ 2", "confidence must be between 0 and 1"),
+    ("# nothing", "empty"),
+    ("1 < 2 -> buy", "reads no variables"),
+])
+def test_invalid_rules_are_rejected(source, message):
+    with pytest.raises(ValueError, match=message):
+        RuleSet(source)
+
+
+def test_first_matching_rule_wins():
+    ruleset = RuleSet("close > 10 -> buy @ 0.9; close > 5 -> sell; volume < 0 -> buy")
+    env = {'close': np.array([20.0, 7.0, 1.0]), 'volume': np.array([1.0, 1.0, 1.0])}
+
+    signals, confidence = ruleset.evaluate(env, 3)
+
+    assert list(signals) == ['buy', 'sell', 'hold']
+    assert list(confidence) == [0.9, 0.6, 0.5]
+    assert ruleset.windows() == {'close': 1, 'volume': 1}
+
+
+def test_semicolons_in_comments_are_not_rules():
+    ruleset = RuleSet("close > 10 -> buy  # not: volume < 0 -> sell; rsi_14 > 99 -> sell")
+
+    assert len(ruleset.rules) == 1
+    assert ruleset.variables == {'close'}
+
+
+def test_rules_reproduce_technical_analyzer(market):
+    universe = market.universe(100)
+    register_rule_analyzer("technical_rules", TECHNICAL_RULES)
+    analyzer = AnalyzerFactory.create("technical_rules")
+
+    assert isinstance(analyzer, RuleAnalyzer)
+    assert analyzer.indicator_window() == 50
+
+    rules = analyzer.analyze_many(universe)
+    technical = TechnicalAnalyzer().analyze_many(universe)
+    assert [s.signal for s in rules] == [s.signal for s in technical]
+    for got, want in zip(rules, technical):
+        assert got.indicators == {k: want.indicators[k] for k in got.indicators}
+
+
+def test_rule_analyze_many_matches_analyze(market):
+    universe = market.universe(30, seed=5)
+    analyzer = RuleAnalyzer("momentum_10 > 5 and volume > 1500000 -> buy @ 0.7\nclose < sma_20 * 0.95 -> sell")
+
+    batch = analyzer.analyze_many(universe)
+
+    for market_data, signal in zip(universe, batch):
+        single = analyzer.analyze(market_data)
+        assert (single.signal, single.confidence, single.indicators) == (signal.signal, signal.confidence, signal.indicators)
+    assert {s.signal for s in batch} <= {SignalType.BUY, SignalType.SELL, SignalType.HOLD}
@@ -0,0 +1,65 @@
+"""Tests for the precomputed contract JSON encoding."""
+
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from investment_system.core import serialization
+from investment_system.core.contracts import (
+    IndicatorType, RateLimitStatus, SignalResponse, SignalType, TradingSignal, UserTier
+)
+
+
+def make_response(n_signals: int = 100, rsi: float = 45.12) -> SignalResponse:
+    signals = [
+        TradingSignal(
+            symbol="S" + chr(65 + i // 26) + chr(65 + i % 26),
+            signal=list(SignalType)[i % 3],
+            confidence=0.712345,
+            price=Decimal("151.2300") if i % 2 else Decimal("151"),
+            indicators={IndicatorType.RSI: rsi, IndicatorType.SMA_20: 150.0, IndicatorType.VOLUME: 1234567.0},
+            reasoning="Überkauft | capped" if i % 3 else None,
+            ai_enhanced=bool(i % 2),
+            expected_value=0.0125 if i % 4 else None,
+            updated_at=datetime(2024, 5, 1, 12, 30) if i % 5 == 0 else None,
+        )
+        for i in range(n_signals)
+    ]
+    return SignalResponse(
+        signals=signals,
+        request_id="req-1",
+        rate_limit=RateLimitStatus(limit=100, remaining=7, reset_at=datetime(2024, 5, 1, 13), tier=UserTier.PRO),
+    )
+
+
+def fastapi_body(response: SignalResponse) -> bytes:
+    """Body FastAPI produces for a route with response_model=SignalResponse."""
+    field = create_response_field(name="response", type_=SignalResponse)
+    content = asyncio.run(serialize_response(field=field, response_content=response, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def test_signal_response_bytes_match_fastapi():
+    response = make_response()
+
+    assert serialization.dumps(response) == fastapi_body(response)
+
+
+def test_nan_indicator_is_rejected_like_fastapi():
+    response = make_response(n_signals=2, rsi=float("nan"))
+
+    with pytest.raises(ValueError):
+        fastapi_body(response)
+    with pytest.raises(ValueError):
+        serialization.dumps(response)
+
+
+def test_plain_values_are_encoded_like_jsonable_encoder():
+    content = {"tier": UserTier.PRO, "at": datetime(2024, 1, 2), "price": Decimal("1.50"), "items": (1, None)}
+
+    assert serialization.dumps(content) == b'{"tier":"pro","at":"2024-01-02T00:00:00","price":1.5,"items":[1,null]}'
@@ -0,0 +1,48 @@
+"""Tests for sharded multi-process signal generation."""
+
+import numpy as np
+import pandas as pd
+
+from investment_system.pipeline.analyze import generate_signals
+from investment_system.pipeline.shard import (
+    analyze_sharded,
+    generate_signals_sharded,
+    pack_prices,
+    split_shards,
+)
+
+
+def test_pack_prices_groups_symbols_in_order(market):
+    # Shuffle rows to make sure packing restores the per-symbol date order
+    df = market.prices(3).sample(frac=1, random_state=1)
+    arrays, ranges = pack_prices(df)
+
+    assert [r[0] for r in ranges] == list(pd.unique(df['symbol']))
+    assert ranges[-1][2] == len(df)
+    for _, start, stop in ranges:
+        assert np.all(np.diff(arrays['date'][start:stop]) > 0)
+
+
+def test_split_shards_covers_all_symbols(market):
+    _, ranges = pack_prices(market.prices(10))
+    shards = split_shards(ranges, 4)
+
+    assert [r for shard in shards for r in shard] == ranges
+
+
+def test_sharded_signals_match_single_process(market):
+    df = market.prices(60)
+
+    expected = generate_signals(df)
+    sharded = generate_signals_sharded(df, workers=2)
+
+    assert sharded == expected
+
+
+def test_analyze_sharded_returns_signal_per_symbol(market):
+    df = market.prices(60)
+
+    signals = analyze_sharded(df, "technical", workers=2)
+
+    assert [s.symbol for s in signals] == list(pd.unique(df['symbol']))
+    assert all(s.signal in ("buy", "sell", "hold") for s in signals)
@@ -0,0 +1,281 @@
+"""Tests for the signal service."""
+
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from investment_system.core import indicators
+from investment_system.core.analyzers import AIEnhancedAnalyzer, MomentumAnalyzer, TechnicalAnalyzer
+from investment_system.core.contracts import AIHookResponse, SignalRequest, User, UserTier
+from investment_system.db.store import StoreManager
+from investment_system.infrastructure.cache import CacheManager
+from investment_system.services.signal_service import TIER_ANALYZERS, SignalAggregator, SignalService
+from investment_system.services.usage_service import UsageMeter
+
+
+pytestmark = pytest.mark.usefixtures("fresh_cache")
+
+
+@pytest.fixture(autouse=True)
+def usage_meter(tmp_path, monkeypatch):
+    """Meter usage into a temporary database."""
+    monkeypatch.setattr("investment_system.db.store.DATABASE_URL", f"sqlite:///{tmp_path}/usage.db")
+    meter = UsageMeter(store=StoreManager())
+    monkeypatch.setattr("investment_system.services.usage_service._usage_meter", meter)
+    yield meter
+    meter.close()
+
+
+def passthrough(request):
+    return AIHookResponse(hook_id=request.hook_id, processed_data={}, modifications_made=False, confidence=1.0)
+
+
+def test_analyzers_are_pooled_per_tier_and_config():
+    service = SignalService()
+
+    pro = service._get_analyzer(UserTier.PRO)
+
+    assert service._get_analyzer(UserTier.PRO) is pro
+    assert service._get_analyzer(UserTier.ENTERPRISE) is not pro
+    assert service._get_analyzer(UserTier.PRO, long_window=20) is not pro
+    assert service._get_analyzer(UserTier.PRO, long_window=20).long_window == 20
+
+
+def test_hook_changes_rebind_pooled_analyzers_once():
+    service = SignalService()
+    before = service._get_analyzer(UserTier.FREE)
+
+    service.register_ai_hook("signal_override", passthrough)
+    service.register_ai_hook("signal_override", passthrough)
+    after = service._get_analyzer(UserTier.FREE)
+
+    assert after is not before
+    assert {name: [entry.handler for entry in entries] for name, entries in after.hooks._handlers.items()} == {
+        "signal_override": [passthrough]
+    }
+    assert service._get_analyzer(UserTier.FREE) is after
+
+
+def test_aggregator_matches_per_source_signals(market):
+    universe = [market.columnar(symbol, n_days=80, seed=i) for i, symbol in enumerate(["AAPL", "MSFT", "NVDA"])]
+    sources = [(TechnicalAnalyzer(), 2.0), (MomentumAnalyzer(), 1.0), (AIEnhancedAnalyzer(), 1.0)]
+    aggregator = SignalAggregator()
+    for source, weight in sources:
+        aggregator.add_source(source, weight)
+
+    aggregated = aggregator.aggregate_many(universe)
+
+    assert [s.symbol for s in aggregated] == ["AAPL", "MSFT", "NVDA"]
+    for market_data, signal in zip(universe, aggregated):
+        singles = [(source.analyze(market_data), weight) for source, weight in sources]
+        votes = {}
+        for single, weight in singles:
+            votes[single.signal] = votes.get(single.signal, 0) + weight
+        assert signal.signal == max(votes, key=votes.get)
+        assert signal.confidence == pytest.approx(sum(s.confidence * w for s, w in singles) / 4.0, abs=1e-4)
+        assert signal.indicators["rsi"] == pytest.approx(sum(s.indicators["rsi"] for s, _ in singles) / 3)
+        single = aggregator.aggregate(market_data)
+        assert (single.signal, single.confidence, single.indicators) == (signal.signal, signal.confidence, signal.indicators)
+
+
+def test_aggregator_computes_shared_indicators_once(monkeypatch, market):
+    calls = []
+    rolling_mean = indicators._rolling_mean
+    monkeypatch.setattr(indicators, "_rolling_mean", lambda *args: calls.append(args[1:]) or rolling_mean(*args))
+    aggregator = SignalAggregator()
+    aggregator.add_source(TechnicalAnalyzer())
+    aggregator.add_source(TechnicalAnalyzer(rsi_oversold=20))
+
+    aggregator.aggregate_many([market.columnar("AAPL"), market.columnar("MSFT", seed=4)])
+
+    # SMA 20/50 once each, RSI gain/loss means once each
+    assert len(calls) == 4
+
+
+def test_overlapping_requests_reuse_cached_symbols(monkeypatch, usage_meter, market):
+    universe = {symbol: market.columnar(symbol, seed=i) for i, symbol in enumerate(["AAPL", "MSFT", "NVDA", "SPY"])}
+    fetched = []
+
+    def fake_fetch_prices(symbols, lookback_days):
+        fetched.append(list(symbols))
+        return pd.concat([universe[s].frame().assign(symbol=s) for s in symbols], ignore_index=True)
+
+    monkeypatch.setattr("investment_system.services.signal_service.fetch_prices", fake_fetch_prices)
+    user = User(id="u1", email="u1@example.com", tier=UserTier.PRO, api_key="key")
+    service = SignalService()
+    written = []
+    insert_usage_events = usage_meter.store.insert_usage_events
+    monkeypatch.setattr(usage_meter.store, "insert_usage_events",
+                        lambda events: written.extend(events) or insert_usage_events(events))
+
+    first = asyncio.run(service.generate_signals(SignalRequest(symbols=["AAPL", "MSFT"]), user))
+    second = asyncio.run(service.generate_signals(SignalRequest(symbols=["AAPL", "MSFT", "NVDA"]), user))
+    third = asyncio.run(service.generate_signals(SignalRequest(symbols=["NVDA", "AAPL"]), user))
+
+    assert fetched == [["AAPL", "MSFT", "SPY"], ["NVDA"]]
+    assert (first.cached, second.cached, third.cached) == (False, False, True)
+
+    # Same as computing the whole request from scratch
+    fresh = asyncio.run(SignalService().generate_signals(SignalRequest(symbols=["AAPL", "MSFT", "NVDA"]), user))
+    exclude = {'created_at'}
+    assert [s.dict(exclude=exclude) for s in second.signals] == [s.dict(exclude=exclude) for s in fresh.signals]
+    assert [s.symbol for s in third.signals] == ["NVDA", "AAPL"]
+
+    # Fully cached responses are not billed
+    usage = usage_meter.usage_stats("u1")
+    assert (usage.api_calls, usage.unique_symbols) == (2, 3)
+    assert usage.signals_generated == len(first.signals) + len(second.signals)
+    assert usage.data_points_fetched == 5 * 120
+    assert [(e['endpoint'], e['method']) for e in written] == [("/signals", "POST")] * 2
+
+
+def test_tiers_with_the_same_analyzer_share_cached_signals(monkeypatch, market):
+    universe = {symbol: market.columnar(symbol, seed=i) for i, symbol in enumerate(["AAPL", "MSFT", "SPY"])}
+    fetched = []
+
+    def fake_fetch_prices(symbols, lookback_days):
+        fetched.append(list(symbols))
+        return pd.concat([universe[s].frame().assign(symbol=s) for s in symbols], ignore_index=True)
+
+    monkeypatch.setattr("investment_system.services.signal_service.fetch_prices", fake_fetch_prices)
+    monkeypatch.setitem(TIER_ANALYZERS, UserTier.PRO, "technical")
+    service = SignalService()
+    request = SignalRequest(symbols=["AAPL", "MSFT"])
+
+    def signals_for(tier):
+        user = User(id=tier.value, email=f"{tier.value}@example.com", tier=tier, api_key="key")
+        return asyncio.run(service.generate_signals(request, user)).signals
+
+    free = signals_for(UserTier.FREE)
+    starter = signals_for(UserTier.STARTER)
+    pro = signals_for(UserTier.PRO)
+
+    assert fetched == [["AAPL", "MSFT", "SPY"]]
+    assert [s.signal for s in free] == [s.signal for s in starter] == [s.signal for s in pro]
+    # Tier decoration is applied after the cache and does not leak into it
+    assert all(s.reasoning for s in pro)
+    assert not any(s.reasoning for s in signals_for(UserTier.FREE))
+
+
+def test_slow_fetch_does_not_block_the_event_loop(monkeypatch, market):
+    universe = {symbol: market.columnar(symbol, seed=i) for i, symbol in enumerate(["AAPL", "MSFT", "SPY"])}
+
+    def slow_fetch_prices(symbols, lookback_days):
+        time.sleep(0.3)  # network and rate-limit sleeps
+        return pd.concat([universe[s].frame().assign(symbol=s) for s in symbols], ignore_index=True)
+
+    monkeypatch.setattr("investment_system.services.signal_service.fetch_prices", slow_fetch_prices)
+    user = User(id="u1", email="u1@example.com", tier=UserTier.FREE, api_key="key")
+    service = SignalService()
+
+    async def scenario():
+        ticks = []
+
+        async def heartbeat():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        response = await service.generate_signals(SignalRequest(symbols=["AAPL", "MSFT"]), user)
+        beat.cancel()
+        return response, ticks
+
+    response, ticks = asyncio.run(scenario())
+
+    assert [s.symbol for s in response.signals] == ["AAPL", "MSFT"]
+    assert len(ticks) > 10
+    assert max(np.diff(ticks)) < 0.15
+
+
+def test_identical_concurrent_requests_compute_once(monkeypatch, market):
+    universe = {symbol: market.columnar(symbol, seed=i) for i, symbol in enumerate(["AAPL", "MSFT", "SPY"])}
+    fetched = []
+
+    def slow_fetch_prices(symbols, lookback_days):
+        fetched.append(list(symbols))
+        time.sleep(0.1)
+        return pd.concat([universe[s].frame().assign(symbol=s) for s in symbols], ignore_index=True)
+
+    monkeypatch.setattr("investment_system.services.signal_service.fetch_prices", slow_fetch_prices)
+    service = SignalService()
+    users = [User(id=f"u{i}", email=f"u{i}@example.com", tier=UserTier.FREE, api_key="key") for i in range(8)]
+
+    async def scenario():
+        return await asyncio.gather(*[
+            service.generate_signals(SignalRequest(symbols=["MSFT", "AAPL"]), user) for user in users
+        ])
+
+    responses = asyncio.run(scenario())
+
+    assert fetched == [["MSFT", "AAPL", "SPY"]]
+    exclude = {'created_at'}
+    first = [s.dict(exclude=exclude) for s in responses[0].signals]
+    assert all([s.dict(exclude=exclude) for s in r.signals] == first for r in responses)
+
+
+def test_expected_value_does_not_depend_on_the_other_symbols(monkeypatch, market):
+    universe = {symbol: market.columnar(symbol, seed=i) for i, symbol in enumerate(["AAPL", "MSFT", "XOM", "SPY"])}
+
+    def fake_fetch_prices(symbols, lookback_days):
+        return pd.concat([universe[s].frame().assign(symbol=s) for s in symbols], ignore_index=True)
+
+    monkeypatch.setattr("investment_system.services.signal_service.fetch_prices", fake_fetch_prices)
+    user = User(id="u1", email="u1@example.com", tier=UserTier.PRO, api_key="key")
+
+    def aapl_expected_value(symbols):
+        monkeypatch.setattr("investment_system.infrastructure.cache._cache_instance", CacheManager())
+        response = asyncio.run(SignalService().generate_signals(SignalRequest(symbols=symbols), user))
+        return next(s.expected_value for s in response.signals if s.symbol == "AAPL")
+
+    alone = aapl_expected_value(["AAPL"])
+
+    assert alone is not None
+    assert aapl_expected_value(["AAPL", "MSFT"]) == alone
+    assert aapl_expected_value(["XOM", "AAPL"]) == alone
+    assert aapl_expected_value(["MSFT", "XOM", "AAPL"]) == alone
+
+
+def other_passthrough(request):
+    return passthrough(request)
+
+
+def test_signal_cache_keys_identify_the_hook_set():
+    workers = [SignalService(), SignalService()]
+    workers[0].register_ai_hook("signal_override", passthrough)
+    workers[1].register_ai_hook("signal_override", other_passthrough)
+    restarted = SignalService()
+    restarted.register_ai_hook("signal_override", passthrough)
+    with_timeout = SignalService()
+    with_timeout.register_ai_hook("signal_override", passthrough, timeout=0.5)
+
+    keys = [service._analyzer_cache_key(UserTier.FREE) for service in [*workers, restarted, with_timeout]]
+
+    assert keys[0] == keys[2]
+    assert len({keys[0], keys[1], keys[3], SignalService()._analyzer_cache_key(UserTier.FREE)}) == 4
+
+
+def make_threshold_hook(threshold):
+    def hook(request):
+        return passthrough(request)
+    return hook
+
+
+def test_configured_hooks_without_a_cache_key_are_not_shared():
+    strict, loose = SignalService(), SignalService()
+    strict.register_ai_hook("confidence_adjustment", make_threshold_hook(0.9))
+    loose.register_ai_hook("confidence_adjustment", make_threshold_hook(0.1))
+    assert strict._analyzer_cache_key(UserTier.FREE) != loose._analyzer_cache_key(UserTier.FREE)
+
+    # Closures that name their configuration are shared across services
+    keyed = []
+    for _ in range(2):
+        hook = make_threshold_hook(0.9)
+        hook.cache_key = "threshold-0.9"
+        service = SignalService()
+        service.register_ai_hook("confidence_adjustment", hook)
+        keyed.append(service._analyzer_cache_key(UserTier.FREE))
+    assert keyed[0] == keyed[1]
@@ -0,0 +1,138 @@
+"""Tests for request coalescing."""
+
+import asyncio
+
+from investment_system.infrastructure.cache import CacheManager
+from investment_system.infrastructure.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    async def scenario():
+        return await asyncio.gather(*[flight.do("watchlist", compute) for _ in range(10)])
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats == {'leaders': 1, 'followers': 9, 'remote_hits': 0}
+
+
+def test_followers_get_the_leaders_exception():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("fetch failed")
+
+    async def scenario():
+        return await asyncio.gather(*[flight.do("k", compute) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert [str(r) for r in results] == ["fetch failed"] * 3
+    assert flight._inflight == {}
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "signals"
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("k", compute))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do("k", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    leader, follower = asyncio.run(scenario())
+
+    assert isinstance(leader, asyncio.CancelledError)
+    assert follower == "signals"
+    assert flight.stats['leaders'] == 1
+
+
+def test_leader_does_not_release_a_lock_it_no_longer_holds():
+    cache = CacheManager()
+    worker = SingleFlight(cache)
+    lock_key = cache._make_key("singleflight", "k")
+
+    async def compute():
+        # Our lock expired and another worker took it
+        cache.set(lock_key, "other-worker", ttl=30)
+        return "computed"
+
+    assert asyncio.run(worker.do("k", compute, load=lambda: None)) == "computed"
+    assert cache.get(lock_key) == "other-worker"
+
+
+def test_workers_sharing_a_cache_compute_once():
+    cache = CacheManager()
+    workers = [SingleFlight(cache, poll_interval=0.01), SingleFlight(cache, poll_interval=0.01)]
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        cache.set("result", "signals")
+        return "signals"
+
+    async def scenario():
+        return await asyncio.gather(*[
+            worker.do("watchlist", compute, load=lambda: cache.get("result")) for worker in workers
+        ])
+
+    assert asyncio.run(scenario()) == ["signals", "signals"]
+    assert len(calls) == 1
+    assert workers[1].stats['remote_hits'] == 1
+    assert not cache.exists(cache._make_key("singleflight", "watchlist"))
+
+
+def test_worker_computes_itself_when_lock_holder_stores_nothing():
+    cache = CacheManager()
+    worker = SingleFlight(cache, lock_ttl=1, poll_interval=0.01)
+    cache.add(cache._make_key("singleflight", "k"), "other-worker", ttl=1)
+
+    async def compute():
+        return "computed"
+
+    async def release_lock():
+        await asyncio.sleep(0.05)
+        cache.delete(cache._make_key("singleflight", "k"))
+
+    async def scenario():
+        result, _ = await asyncio.gather(worker.do("k", compute, load=lambda: None), release_lock())
+        return result
+
+    assert asyncio.run(scenario()) == "computed"
+    assert worker.stats['leaders'] == 1
+
+
+def test_workers_share_a_result_the_leader_could_not_store():
+    cache = CacheManager()
+    workers = [SingleFlight(cache, poll_interval=0.01), SingleFlight(cache, poll_interval=0.01)]
+    calls = []
+
+    async def compute():
+        # e.g. no data for the symbol: nothing lands where load() looks
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {}
+
+    async def scenario():
+        return await asyncio.gather(*[worker.do("unfetchable", compute, load=lambda: None) for worker in workers])
+
+    assert asyncio.run(scenario()) == [{}, {}]
+    assert len(calls) == 1
+    assert workers[1].stats['remote_hits'] == 1
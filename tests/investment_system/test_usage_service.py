@@ -0,0 +1,143 @@
+"""Tests for write-behind usage metering."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from investment_system.core.cardinality import HyperLogLog
+from investment_system.db.store import StoreManager
+from investment_system.services.usage_service import UsageMeter, billing_period
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Store backed by a temporary database."""
+    monkeypatch.setattr("investment_system.db.store.DATABASE_URL", f"sqlite:///{tmp_path}/usage.db")
+    return StoreManager()
+
+
+class UnavailableStore:
+    def insert_usage_events(self, events):
+        raise ConnectionError("database is down")
+
+    def merge_usage_sketches(self, sketches):
+        raise ConnectionError("database is down")
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_recording_does_not_write_until_a_threshold(store):
+    meter = UsageMeter(store=store, batch_size=100, flush_interval=60)
+
+    meter.record("u1", "/signals", "GET", ["AAPL", "MSFT"], signals=2, data_points=240)
+
+    assert meter.pending == 1
+    assert store.get_usage_totals("u1", *billing_period())['api_calls'] == 0
+    meter.close()
+    assert meter.pending == 0
+    assert store.get_usage_totals("u1", *billing_period())['api_calls'] == 1
+
+
+def test_concurrent_records_are_all_counted(store):
+    meter = UsageMeter(store=store, batch_size=100_000, flush_interval=60)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: meter.record("u1", "/signals", "POST", [f"S{i % 7}"]), range(4000)))
+
+    assert meter.stats['recorded'] == meter.pending == 4000
+    assert meter.flush() == 4000
+    meter.close()
+
+def test_batch_size_triggers_one_bulk_write(store):
+    meter = UsageMeter(store=store, batch_size=3, flush_interval=60)
+
+    for symbol in ["AAPL", "MSFT", "NVDA"]:
+        meter.record("u1", "/signals", "GET", [symbol])
+
+    wait_until(lambda: meter.stats['flushed'] == 3)
+    assert meter.stats['flushes'] == 1
+    meter.close()
+
+
+def test_interval_flushes_a_partial_batch(store):
+    meter = UsageMeter(store=store, batch_size=100, flush_interval=0.05)
+
+    meter.record("u1", "/signals", "GET", ["AAPL"])
+
+    wait_until(lambda: meter.stats['flushed'] == 1)
+    assert store.get_usage_totals("u1", *billing_period())['api_calls'] == 1
+    meter.close()
+
+
+def test_usage_stats_aggregate_the_period(store):
+    meter = UsageMeter(store=store, flush_interval=60)
+    store.insert_usage_events([dict(
+        user_id="u1", endpoint="/signals", method="GET", units=1, symbols="IBM",
+        signals=1, data_points=10, status_code=200, created_at=datetime(2020, 1, 1)
+    )])
+    ibm = HyperLogLog()
+    ibm.add("IBM")
+    store.merge_usage_sketches({("u1", datetime(2020, 1, 1), datetime(2020, 2, 1)): ibm})
+    meter.record("u1", "/signals", "GET", ["AAPL", "MSFT"], signals=2, data_points=240)
+    meter.record("u1", "/signals", "GET", ["MSFT", "NVDA"], signals=1, data_points=240)
+    meter.record("u2", "/signals", "GET", ["TSLA"], signals=1, data_points=120)
+
+    usage = meter.usage_stats("u1")
+
+    assert (usage.period_start, usage.period_end) == billing_period()
+    assert usage.api_calls == 2
+    assert usage.unique_symbols == 3
+    assert usage.signals_generated == 3
+    assert usage.data_points_fetched == 480
+    assert meter.usage_stats("u1", datetime(2020, 1, 1), datetime(2020, 2, 1)).unique_symbols == 1
+    meter.close()
+
+
+def test_distinct_symbols_merge_across_workers(store):
+    workers = [UsageMeter(store=store, flush_interval=60) for _ in range(2)]
+    workers[0].record("u1", "/signals", "GET", ["AAPL", "MSFT"])
+    workers[1].record("u1", "/signals", "GET", ["MSFT", "NVDA", "TSLA"])
+
+    assert [worker.unique_symbols("u1") for worker in workers] == [2, 3]
+    for worker in workers:
+        worker.flush()
+    assert [worker.unique_symbols("u1") for worker in workers] == [2, 4]
+
+    # Merging is idempotent: merging a known sketch again changes nothing
+    workers[0].record("u1", "/signals", "GET", ["AAPL"])
+    workers[0].flush()
+    assert workers[0].unique_symbols("u1") == 4
+
+    workers[0].record("u1", "/signals", "GET", ["IBM"])
+    assert workers[0].usage_stats("u1").unique_symbols == 5
+    assert workers[1].unique_symbols("u1") == 4  # Until it flushes again
+    assert workers[0].unique_symbols("u2") == 0
+    for worker in workers:
+        worker.close()
+
+
+def test_failed_flush_keeps_the_newest_events():
+    meter = UsageMeter(store=UnavailableStore(), flush_interval=60, max_pending=2)
+    for symbol in ["AAPL", "MSFT", "NVDA"]:
+        meter.record("u1", "/signals", "GET", [symbol])
+
+    assert meter.flush() == 0
+
+    assert meter.pending == 2
+    assert meter.stats['dropped'] == 1
+    assert [event['symbols'] for event in meter._pending] == ["MSFT", "NVDA"]
+    meter._pending.clear()
+    meter._dirty.clear()
+    meter.close()
+
+
+def test_billing_period_is_the_calendar_month():
+    assert billing_period(datetime(2024, 12, 31, 23, 59)) == (datetime(2024, 12, 1), datetime(2025, 1, 1))
+    assert billing_period(datetime(2024, 2, 10)) == (datetime(2024, 2, 1), datetime(2024, 3, 1))